@@ -1,208 +1,345 @@
-from PyQt5.QtWidgets import QWidget, QApplication, QGraphicsOpacityEffect, QLabel
-from PyQt5.QtCore import QPropertyAnimation, QPoint, QEasingCurve, QSequentialAnimationGroup
-from PyQt5.QtGui import QPixmap
-from scipy.signal import argrelextrema
-from numpy import greater, less, linspace
+from PyQt5.QtWidgets import QWidget, QApplication
+from PyQt5.QtCore import QTimer, QRectF, QPointF, Qt, pyqtSignal
+from PyQt5.QtGui import QPainter, QPixmap, QPen, QBrush, QColor, QPolygonF, QTransform
 import sys
-from scipy.integrate import odeint
-import matplotlib.pyplot as plt
+import pyqtgraph as pg
+from numpy import searchsorted, rint, unique, arange, repeat, tile, full, concatenate, column_stack, abs as npabs
+from solveMSD import simulate
+from playbackMSD import (FrameTrack, PlaybackClock, PIXELS_PER_METRE, ZERO_OFFSET, SCENE_SIZE, WALL_X, WALL_WIDTH, MASS_SIZE,
+                         MASS_Y, SPRING_Y, DAMPER_Y, SPRING_COILS, DAMPER_LEAD, DAMPER_LENGTH)
+
+#Turning point markers are drawn this far above the mass
+MARKER_HEIGHT = 12
 
 class AnimationWidget(QWidget):
-    def __init__(self, m, k, b, x0, v0, t, solverOutput):
+    #Plays a precomputed FrameTrack of the solver output. A single timer ticks at the frame rate and
+    #each tick only looks up the frame for the current playback time, so long runs cost no more per
+    #frame than short ones and playback can run at any speed or jump to any time.
+    #The whole scene is painted by paintEvent on this one widget: the static parts (wall, x = 0 line)
+    #are cached in a pixmap, the spring, damper and mass are drawn from the current mass position.
+    #Antialiasing is most of the cost of a frame, so only the cached pixmaps are antialiased: the mass is
+    #a sprite rendered once per widget size, the linkages are drawn without it.
+    #Given the run's EventTable, the latest maximum and minimum reached are marked above the mass.
+    timeChanged = pyqtSignal(float)
+    finished = pyqtSignal()
+
+    def __init__(self, m, k, b, x0, v0, t, solverOutput, velocities=None, fps=60, clock=None, events=None):
         super().__init__()
 
-        self.minimaTimeIndices = []
-        self.maximaTimeIndices = []
-        x0input = int(100 * x0)
+        self.t = t
+        self.solverOutput = solverOutput
+        self.velocities = velocities
+        #The clock may be shared with other views of the playback position (timer label, graph cursors)
+        self.clock = clock if clock is not None else PlaybackClock()
+        self.playbackTime = 0.0 #seconds of simulated time shown
+
+        #Turning points from the event table: times, kinds and mass positions in scene pixels
+        self.turnTimes, self.turnKinds, self.turnPositions = [], [], []
+        if events is not None:
+            turns = [index for index, kind in enumerate(events.kind) if kind != "zero crossing"]
+            self.turnTimes = events.t[turns]
+            self.turnKinds = [events.kind[index] for index in turns]
+            self.turnPositions = rint(events.x[turns] * PIXELS_PER_METRE + ZERO_OFFSET).astype(int).tolist()
+        self.turnCount = 0 #turning points reached at playbackTime
+        self.markers = [] #mass positions of the latest maximum and minimum reached
+
+        self.massPosition = ZERO_OFFSET
+        self.background = None
+        self.massSprite = None
+        self.linkagePen = QPen(Qt.darkGray, 2)
+        self.massBrush = QBrush(Qt.red)
+        #Spring coils as a zigzag from x = 0 to 1, scaled to the current spring length when drawn
+        self.springShape = QPolygonF([QPointF((i + 0.5) / (2 * SPRING_COILS), 12 if i % 2 else -12)
+                                      for i in range(2 * SPRING_COILS)])
+        self.springShape.prepend(QPointF(0, 0))
+        self.springShape.append(QPointF(1, 0))
+
+        self.resize(SCENE_SIZE, SCENE_SIZE)
+
+        self.frameTimer = QTimer(self)
+        self.frameTimer.setTimerType(Qt.PreciseTimer)
+        self.frameTimer.timeout.connect(self.advanceFrame)
+        self.setFrameRate(fps)
 
-        self.createWall()
-        self.createZeroPoint()
+    def deleteMass(self):
+        self.stopAnimation()
 
-        self.resize(600, 600)
-        self.child = QWidget(self)
-        self.child.setStyleSheet("background-color:red;border-radius:15px;")
-        self.child.resize(100, 100)
-        self.child.move(QPoint(x0input + 300, 300))
+    def createTrack(self, fps):
+        return FrameTrack(self.t, self.solverOutput, self.velocities, fps=fps)
 
-        self.animationGroup = QSequentialAnimationGroup()
-        
-        output = solverOutput
-        self.minima = self.findMinima(output, t)
-        self.maxima = self.findMaxima(output, t)
-        startingDirectionResult = self.determineStartingDirection(output)
+    def setFrameRate(self, fps):
+        self.track = self.createTrack(fps)
+        self.clock.setDuration(self.track.duration)
+        self.frameTimer.setInterval(max(1, int(round(1000 / fps))))
+        self.showFrame()
 
-        # plot = plt.plot(t, output)
-        # plt.show()
+    def setSpeed(self, speed):
+        self.clock.setSpeed(speed)
 
-        self.createAnimations(self.minima, self.maxima, self.minimaTimeIndices, self.maximaTimeIndices, startingDirectionResult, t, x0input)
-        
-    def deleteMass(self):
-        self.child.deleteLater()
-    
-    def startAnimation(self):
-        self.animationGroup.start()
-
-    def findMinima(self, solverOutput, t):
-        #argrelextrema returns the indices of all local min/max (depending on what is specified, here I used "less" from numpy) in an array. 
-        #The first list comprehension creates an array of the values specified by those indices, thus giving the values of the local minima.
-        #The second list comprehension turns the array into a list
-        #The findMaxima function works the exact same way, but with np.greater
-        indices = argrelextrema(solverOutput, less)
-
-        minimaArray = [solverOutput[i] for i in indices]
-        minima = [100 * i for i in minimaArray[0]]
-
-        timeIndicesArray = [i for i in indices]
-        self.minimaTimeIndices = [i for i in timeIndicesArray[0]]
-
-        return minima
-    
-    def findMaxima(self, solverOutput, t):
-        indices = argrelextrema(solverOutput, greater)
-
-        maximaArray = [solverOutput[i] for i in indices]
-        maxima = [100 * i for i in maximaArray[0]]
-
-        timeIndicesArray = [i for i in indices]
-        self.maximaTimeIndices = [i for i in timeIndicesArray[0]]
-        return maxima
-
-    def determineStartingDirection(self, solverOutput):
-        minimaIndices = argrelextrema(solverOutput, less)
-        firstMinima = minimaIndices[0][0]
-        maximaIndices = argrelextrema(solverOutput, greater)
-        firstMaxima = maximaIndices[0][0]
-        
-        #This determines whether a maxima or minima appears first in the position output.
-        # If a maxima appears first, it returns True; if a minima is first then it returns False
-        if firstMaxima < firstMinima:
-            return True
-        elif firstMinima < firstMaxima:
-            return False 
-        
-    def createAnimations(self, minima, maxima, minimaTimeIndices, maximaTimeIndices, direction, t, x0input):
-        offset = 300 #horizontal offset to place block roughly in the middle of the screen
-        if direction == True: #Means that the mass is moving in the +x direction, and the first peak will be a maxima
-            for i in range(len(minima)):  #I used the length of minima here because in the True case it will either be 1 shorter or the same length as maxima
-                a = 1
-                b = 0
-                timeRange1 = int((t[maximaTimeIndices[0]] - t[0]) * 1000) #Multiplied by 1000 to convert to milliseconds for .setDuration()
-                timeRange2 = int(abs((t[minimaTimeIndices[0]] - t[maximaTimeIndices[0]])) * 1000)
-
-        elif direction == False: #Means that the mass is moving in the -x direction, and the first peak will be a minima
-            a = 0
-            b = 1
-            timeRange1 = int((t[minimaTimeIndices[0]] - t[0]) * 1000) #Multiplied by 1000 to convert to milliseconds for .setDuration()
-            timeRange2 = int(abs((t[maximaTimeIndices[0]] - t[minimaTimeIndices[0]])) * 1000)
-
-            for i in range(len(maxima)):
-                animation1 = QPropertyAnimation(self.child, b"pos")
-                animation1.setEasingCurve(QEasingCurve.InOutCubic) 
-
-                animation2 = QPropertyAnimation(self.child, b"pos")
-                animation2.setEasingCurve(QEasingCurve.InOutCubic)
-
-                animationHold = [None, None]
-                animationHold[a] = animation1
-                animationHold[b] = animation2 
-
-                if i != 0:
-                    # animation1.setStartValue(QPoint(x0input + offset, 300))
-                    #Divided by 1000 to convert to milliseconds for .setDuration
-                    timeRange1 = int((abs(t[minimaTimeIndices[i]] - t[maximaTimeIndices[i-1]])) * 1000)
-                    timeRange2 = int((abs(t[maximaTimeIndices[i]] - t[minimaTimeIndices[i]])) * 1000)  
-
-                endValue1 = int(minima[i] + offset)
-                animation1.setEndValue(QPoint(endValue1, 300))
-                animation1.setDuration(timeRange1)
-
-                endValue2 = int(maxima[i] + offset)
-                animation2.setEndValue(QPoint(endValue2, 300))
-                animation2.setDuration(timeRange2)
-
-                self.animationGroup.addAnimation(animationHold[0])
-                self.animationGroup.addAnimation(animationHold[1])
- 
-                # print("minima[{}]= ".format(i), minima[i])
-                # print("maxima[{}]= ".format(i), maxima[i])
-
-    def createWall(self):
-        wall = QWidget(self)
-        wall.setStyleSheet("background-color:black;")
-        wall.resize(10, 600)
-        wall.move(QPoint(90, 0))
-
-        springAndDamperLabel = QLabel(self)
-        SDImage = QPixmap('SpringAndDamper.png')
-        springAndDamperLabel.setPixmap(SDImage)
-        springAndDamperLabel.resize(SDImage.width(), SDImage.height())
-        springAndDamperLabel.move(QPoint(100, 250)) 
-    
-    def createZeroPoint(self):
-        zeroLabel = QLabel("x=0", self)
-        zeroLabel.move(QPoint(285, 195))
-        for i in range(20):
-            wall = QWidget(self)
-            wall.setStyleSheet("background-color:gray;")
-            wall.resize(1, 20)
-            effect = QGraphicsOpacityEffect(wall)
-            effect.setOpacity(0.7)
-            spacing = 10
-            yPoint = 30 * i
-            wall.move(QPoint(300, yPoint))
-                
-                
-
-    def ODEsolver(self, m, k, b, x0, v0, t):
-        
-        def dSdx(x, S):
-            x, v = S
-            return [v,
-                    (-b*v + k*(-x))/m]
-
-        S0 = (x0, v0)
-        #time analyzed, from [first input] seconds
-        #to [second input] seconds, with [third input] number of points
-
-        sol = odeint(dSdx, y0=S0, t=t, tfirst=True)
-        sol_x = sol.T[0] #horizontal position
-        sol_v = sol.T[1] #velocity
-        sol_a = ((-b*sol_v + k*(-sol_x))/m) #acceleration
-
-        return sol_x
+    def duration(self):
+        return self.track.duration
 
+    def isRunning(self):
+        return self.frameTimer.isActive()
+
+    def startAnimation(self):
+        self.clock.start()
+        self.frameTimer.start()
+        self.showFrame()
+
+    def stopAnimation(self):
+        self.frameTimer.stop()
+        self.clock.pause()
+
+    def seek(self, time):
+        #Scrubbing: show the frame at `time`, playback continues from there if it is running
+        self.clock.seek(time)
+        self.showFrame()
+
+    def advanceFrame(self):
+        #Playback time comes from the clock, so late ticks skip frames instead of slowing down
+        self.showFrame()
+        if self.clock.isFinished():
+            self.frameTimer.stop()
+            self.clock.pause()
+            self.finished.emit()
+
+    def showFrame(self):
+        self.playbackTime = self.clock.time()
+        #Only the strip holding the markers, spring, damper and mass is repainted, from the wall to
+        #whichever of the old and new mass positions is further right, or across the scene when a new
+        #turning point moves a marker
+        position = self.track.positionAt(self.playbackTime)
+        turnCount = int(searchsorted(self.turnTimes, self.playbackTime, side="right")) if len(self.turnTimes) else 0
+        if position != self.massPosition or turnCount != self.turnCount:
+            right = max(position, self.massPosition) + MASS_SIZE + 2
+            if turnCount != self.turnCount:
+                right = SCENE_SIZE
+                self.turnCount = turnCount
+                self.markers = self.latestTurns(turnCount)
+            self.massPosition = position
+            scale = self.sceneScale()
+            top = MASS_Y - MARKER_HEIGHT - 6
+            self.update(int(WALL_X * scale), int(top * scale),
+                        int((right - WALL_X) * scale) + 2, int((MASS_Y + MASS_SIZE + 2 - top) * scale) + 2)
+        self.timeChanged.emit(self.playbackTime)
+
+    def latestTurns(self, count):
+        #Positions of the last maximum and the last minimum among the first `count` turning points
+        markers = []
+        for kind in ["maximum", "minimum"]:
+            for index in range(count - 1, -1, -1):
+                if self.turnKinds[index] == kind:
+                    markers.append(self.turnPositions[index])
+                    break
+        return markers
+
+    def sceneScale(self):
+        return min(self.width(), self.height()) / SCENE_SIZE
+
+    def resizeEvent(self, event):
+        self.background = None
+        self.massSprite = None
+        super().resizeEvent(event)
+
+    def createSprite(self, width, height, radius):
+        #Antialiased rounded mass of width x height scene pixels, in widget pixels
+        scale = self.sceneScale()
+        sprite = QPixmap(int(width * scale) + 2, int(height * scale) + 2)
+        sprite.fill(Qt.transparent)
+        painter = QPainter(sprite)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self.massBrush)
+        painter.drawRoundedRect(QRectF(0, 0, width * scale, height * scale), radius * scale, radius * scale)
+        painter.end()
+        return sprite
+
+    def createBackground(self):
+        #Wall, dashed x = 0 line and damper cylinder, rendered once per widget size
+        self.background = QPixmap(self.size())
+        self.background.fill(self.palette().window().color())
+        painter = QPainter(self.background)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.scale(self.sceneScale(), self.sceneScale())
+
+        painter.fillRect(QRectF(WALL_X, 0, WALL_WIDTH, SCENE_SIZE), Qt.black)
+
+        zeroPen = QPen(QColor(128, 128, 128, 180), 1, Qt.CustomDashLine)
+        zeroPen.setDashPattern([20, 10])
+        painter.setPen(zeroPen)
+        painter.drawLine(QPointF(ZERO_OFFSET, 0), QPointF(ZERO_OFFSET, SCENE_SIZE))
+        painter.setPen(Qt.black)
+        painter.drawText(QPointF(ZERO_OFFSET - 15, 190), "x=0")
+
+        left = WALL_X + WALL_WIDTH
+        painter.setPen(self.linkagePen)
+        painter.drawLine(QPointF(left, DAMPER_Y), QPointF(left + DAMPER_LEAD, DAMPER_Y))
+        painter.drawPolyline(QPolygonF([QPointF(left + DAMPER_LEAD + DAMPER_LENGTH, DAMPER_Y - 12),
+                                        QPointF(left + DAMPER_LEAD, DAMPER_Y - 12),
+                                        QPointF(left + DAMPER_LEAD, DAMPER_Y + 12),
+                                        QPointF(left + DAMPER_LEAD + DAMPER_LENGTH, DAMPER_Y + 12)]))
+        painter.end()
+
+    def paintEvent(self, event):
+        if self.background is None:
+            self.createBackground()
+        if self.massSprite is None:
+            self.massSprite = self.createSprite(MASS_SIZE, MASS_SIZE, 15)
+        painter = QPainter(self)
+        painter.drawPixmap(event.rect(), self.background, event.rect())
+        scale = self.sceneScale()
+        painter.scale(scale, scale)
+
+        left = WALL_X + WALL_WIDTH
+        right = self.massPosition
+        painter.setPen(self.linkagePen)
+        self.drawSpring(painter, left, right)
+        self.drawDamper(painter, left, right)
+
+        painter.resetTransform()
+        painter.drawPixmap(QPointF(right * scale, MASS_Y * scale), self.massSprite)
+        painter.scale(scale, scale)
+
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(Qt.darkGray)
+        for marker in self.markers:
+            centre = marker + MASS_SIZE / 2
+            painter.drawPolygon(QPolygonF([QPointF(centre - 6, MASS_Y - MARKER_HEIGHT - 4), QPointF(centre + 6, MASS_Y - MARKER_HEIGHT - 4),
+                                           QPointF(centre, MASS_Y - 4)]))
+        painter.end()
+
+    def drawSpring(self, painter, left, right):
+        #The coils are a unit zigzag stretched between short straight leads by one transform
+        lead = 10
+        coils = QTransform(right - left - 2 * lead, 0, 0, 1, left + lead, SPRING_Y).map(self.springShape)
+        coils.prepend(QPointF(left, SPRING_Y))
+        coils.append(QPointF(right, SPRING_Y))
+        painter.drawPolyline(coils)
+
+    def drawDamper(self, painter, left, right):
+        #The cylinder is part of the background, only the piston and its rod to the mass move
+        pistonX = min(max(right - 40, left + DAMPER_LEAD + 4), left + DAMPER_LEAD + DAMPER_LENGTH - 4)
+        painter.drawLine(QPointF(pistonX, DAMPER_Y - 10), QPointF(pistonX, DAMPER_Y + 10))
+        painter.drawLine(QPointF(pistonX, DAMPER_Y), QPointF(right, DAMPER_Y))
+
+
+#Chain scene: masses sit evenly between the left wall and CHAIN_RIGHT (a right wall when the last mass is
+#tied to one), above them the displacement of every mass is drawn as a transverse profile
+CHAIN_RIGHT = 560
+CHAIN_MASS_HEIGHT = 60
+PROFILE_Y = 150
+PROFILE_HEIGHT = 80
+#Links are drawn as zigzag springs while masses are at least this far apart (scene pixels), else as lines
+SPRING_SPACING = 30
+
+class ChainAnimationWidget(AnimationWidget):
+    #Plays back a chainMSD.ChainResult. Every mass moves by the same scale, chosen so that neighbours
+    #never overlap; with thousands of masses that motion is below a pixel, so the profile of all the
+    #displacements, scaled to the peak of the run, shows the waves travelling along the chain. The
+    #masses, links and profile are each drawn as one path, so a frame costs a few vectorized calls.
+    def __init__(self, chain, t, x, v=None, fps=60, clock=None):
+        self.chain = chain
+        count = len(chain)
+        self.spacing = (CHAIN_RIGHT - WALL_X - WALL_WIDTH) / (count + 1)
+        self.massWidth = min(max(self.spacing / 2, 1.0), MASS_SIZE)
+        self.restCentres = WALL_X + WALL_WIDTH + self.spacing * arange(1, count + 1)
+        self.peak = float(npabs(x).max()) or 1.0
+        self.frameShown = None
+        super().__init__(chain.masses, chain.springs, chain.dampers, x[:, 0], None if v is None else v[:, 0],
+                         t, x, v, fps=fps, clock=clock)
+
+    def createTrack(self, fps):
+        scale = min(PIXELS_PER_METRE, self.spacing / (4 * self.peak))
+        return FrameTrack(self.t, self.solverOutput, self.velocities, fps=fps, scale=scale,
+                          offset=(self.restCentres - self.massWidth / 2)[:, None])
+
+    def showFrame(self):
+        self.playbackTime = self.clock.time()
+        index = self.track.frameIndex(self.playbackTime)
+        if index != self.frameShown:
+            self.frameShown = index
+            scale = self.sceneScale()
+            top = PROFILE_Y - PROFILE_HEIGHT - 4
+            self.update(0, int(top * scale), self.width(), int((MASS_Y + CHAIN_MASS_HEIGHT + 4 - top) * scale) + 2)
+        self.timeChanged.emit(self.playbackTime)
+
+    def createBackground(self):
+        #Walls and the profile's zero line, rendered once per widget size
+        self.background = QPixmap(self.size())
+        self.background.fill(self.palette().window().color())
+        painter = QPainter(self.background)
+        painter.scale(self.sceneScale(), self.sceneScale())
+        painter.fillRect(QRectF(WALL_X, MASS_Y - 40, WALL_WIDTH, CHAIN_MASS_HEIGHT + 80), Qt.black)
+        if self.chain.endSpring > 0 or self.chain.endDamper > 0:
+            painter.fillRect(QRectF(CHAIN_RIGHT, MASS_Y - 40, WALL_WIDTH, CHAIN_MASS_HEIGHT + 80), Qt.black)
+        zeroPen = QPen(QColor(128, 128, 128, 180), 1, Qt.CustomDashLine)
+        zeroPen.setDashPattern([20, 10])
+        painter.setPen(zeroPen)
+        painter.drawLine(QPointF(WALL_X + WALL_WIDTH, PROFILE_Y), QPointF(CHAIN_RIGHT, PROFILE_Y))
+        painter.setPen(Qt.black)
+        painter.drawText(QPointF(WALL_X, PROFILE_Y - PROFILE_HEIGHT - 10),
+                         "displacement of {} masses, peak {:.3g} m".format(len(self.chain), self.peak))
+        painter.end()
+
+    def paintEvent(self, event):
+        if self.background is None:
+            self.createBackground()
+        painter = QPainter(self)
+        painter.drawPixmap(event.rect(), self.background, event.rect())
+        scale = self.sceneScale()
+        painter.scale(scale, scale)
+
+        index = self.track.frameIndex(self.playbackTime)
+        edges = self.track.positions[:, index]
+        #Links from the left wall through every mass, to the right wall if there is one
+        painter.setPen(self.linkagePen)
+        tied = self.chain.endSpring > 0 or self.chain.endDamper > 0
+        lefts = concatenate([[WALL_X + WALL_WIDTH], edges + self.massWidth])
+        rights = concatenate([edges, [CHAIN_RIGHT]]) if tied else edges
+        lefts = lefts[:rights.shape[0]]
+        if self.spacing >= SPRING_SPACING:
+            for left, right in zip(lefts, rights):
+                self.drawSpring(painter, left, right)
+        elif self.spacing * scale < 2:
+            #The links are shorter than the masses are wide on screen and merge into one line
+            painter.drawLine(QPointF(lefts[0], SPRING_Y), QPointF(rights[-1], SPRING_Y))
+        else:
+            painter.drawPath(pg.arrayToQPath(column_stack([lefts, rights]).ravel(), full(2 * lefts.shape[0], SPRING_Y),
+                                             connect="pairs"))
+
+        if self.massWidth >= 4:
+            if self.massSprite is None:
+                self.massSprite = self.createSprite(self.massWidth, CHAIN_MASS_HEIGHT, 4)
+            painter.resetTransform()
+            for edge in edges:
+                painter.drawPixmap(QPointF(edge * scale, MASS_Y * scale), self.massSprite)
+            painter.scale(scale, scale)
+        else:
+            #Each mass is a vertical stroke, masses within the same pixel column are drawn once
+            centres = unique(rint((edges + self.massWidth / 2) * scale)) / scale
+            painter.setPen(QPen(self.massBrush.color(), self.massWidth))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPath(pg.arrayToQPath(repeat(centres, 2), tile([MASS_Y, MASS_Y + CHAIN_MASS_HEIGHT], centres.shape[0]),
+                                             connect="pairs"))
+
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(Qt.blue, 1.5))
+        painter.setBrush(Qt.NoBrush)
+        profile = PROFILE_Y - PROFILE_HEIGHT * self.track.displacements[:, index] / self.peak
+        painter.drawPath(pg.arrayToQPath(self.restCentres, profile))
+        painter.end()
 
 
 if __name__ == '__main__':
-    def ODEsolver(m, k, b, x0, v0, t):
-        
-        def dSdx(x, S):
-            x, v = S
-            return [v,
-                    (-b*v + k*(-x))/m]
-
-        S0 = (x0, v0)
-        #time analyzed, from [first input] seconds
-        #to [second input] seconds, with [third input] number of points
-
-        sol = odeint(dSdx, y0=S0, t=t, tfirst=True)
-        sol_x = sol.T[0] #horizontal position
-        sol_v = sol.T[1] #velocity
-        sol_a = ((-b*sol_v + k*(-sol_x))/m) #acceleration
-
-        return sol_x
-    
     m = .1
     k = 25
     b = 0.1
     x0 = 1
     v0 = 0
-    t = linspace(0, 10, 1000)
-    output = ODEsolver(m, k, b, x0, v0, t)
+    result = simulate(m, k, b, x0, v0)
     app = QApplication(sys.argv)
-    window = AnimationWidget(m, k, b, x0, v0, t, output)
+    window = AnimationWidget(m, k, b, x0, v0, result.t, result.x, result.v, events=result.events)
     window.show()
     window.startAnimation()
     sys.exit(app.exec_())
-
-    
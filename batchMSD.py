@@ -0,0 +1,198 @@
+#Batch solver for many (m, k, b, x0, v0) parameter sets at once. Like solveMSD, this module is
+#headless and only needs numpy (plus scipy for the numerical methods).
+from numpy import (asarray, broadcast_arrays, empty, meshgrid, concatenate, inf, nan, abs as npabs, where, sign, log, errstate,
+                   sqrt, maximum)
+from solveMSD import (analyticSolution, propagate, acceleration, energies, autoSettings, SolverSettings, IVP_METHODS,
+                      DEFAULT_EVAL_TIME, DEFAULT_NUM_POINTS)
+
+BATCH_METHODS = ["analytic", "odeint"] + IVP_METHODS + ["auto", "propagator"]
+#Rows evaluated together by the closed form and the propagator, keeps the temporaries small and cache friendly
+ANALYTIC_CHUNK_SIZE = 256
+
+def parameterGrid(m, k, b, x0, v0):
+    #Cartesian product of the given values, flattened to five 1D arrays of equal length
+    grids = meshgrid(*[asarray(value, dtype=float).ravel() for value in (m, k, b, x0, v0)], indexing="ij")
+    return tuple(grid.ravel() for grid in grids)
+
+def broadcastParameters(m, k, b, x0, v0):
+    return tuple(value.ravel() for value in broadcast_arrays(*[asarray(value, dtype=float) for value in (m, k, b, x0, v0)]))
+
+
+class BatchResult:
+    #Trajectories of N parameter sets on a shared time grid. x and v are (N, T) blocks,
+    #acceleration and energies are computed from them on request to keep memory down.
+    #forceLaw is the nonlinear forceLawMSD.ForceLaw the batch was solved with, None for the linear system.
+    def __init__(self, m, k, b, x0, v0, t, x, v, method, forceLaw=None):
+        self.m, self.k, self.b, self.x0, self.v0 = m, k, b, x0, v0
+        self.t = t
+        self.x = x
+        self.v = v
+        self.method = method
+        self.forceLaw = forceLaw
+
+    def __len__(self):
+        return self.x.shape[0]
+
+    @property
+    def a(self):
+        if self.forceLaw is not None:
+            return self.forceLaw.acceleration(self.m[:, None], self.k[:, None], self.b[:, None], self.x, self.v)
+        return acceleration(self.m[:, None], self.k[:, None], self.b[:, None], self.x, self.v)
+
+    def energies(self, columns=slice(None)):
+        #Kinetic, potential and total energy of the time steps `columns` (all of them by default)
+        x, v = self.x[:, columns], self.v[:, columns]
+        if self.forceLaw is not None:
+            kineticEnergy = .5 * self.m[:, None] * v**2
+            potentialEnergy = self.forceLaw.potentialEnergy(self.k[:, None], x)
+            return kineticEnergy, potentialEnergy, kineticEnergy + potentialEnergy
+        return energies(self.m[:, None], self.k[:, None], x, v)
+
+
+def batchSolve(m, k, b, x0, v0, t=None, method="analytic", settings=None, out=None, forceLaw=None):
+    #Solves every parameter set (inputs are broadcast against each other and flattened to N rows)
+    #on the time grid t, which defaults to the grid of settings (or 0-10 s with 1000 points).
+    #"analytic" evaluates the closed form in row chunks, "odeint" and the solve_ivp methods integrate
+    #all rows as one stacked state vector with a vectorized right hand side and a sparse Jacobian.
+    #"auto" picks one solve_ivp method and tolerances for the whole batch (see solveMSD.autoSettings).
+    #"propagator" steps every row with its exact expm(A dt), one batched product per doubling of the grid.
+    #out may be a preallocated (x, v) pair of (N, T) arrays to write into. A nonlinear forceLaw
+    #(forceLawMSD.ForceLaw) swaps the right hand side and Jacobian of the stacked solvers for its generated
+    #vectorized ones; it needs "odeint", a solve_ivp method or "auto" (for the law linearized at rest).
+    if method not in BATCH_METHODS:
+        raise ValueError("Unknown batch method '{}', expected one of {}".format(method, BATCH_METHODS))
+    forceLaw = forceLaw if forceLaw is not None and not forceLaw.isLinear() else None
+    if forceLaw is not None and method in ("analytic", "propagator"):
+        raise ValueError("The {} batch method is exact for the linear system only, use odeint, a solve_ivp "
+                         "method or auto with a nonlinear force law".format(method))
+    settings = settings if settings is not None else SolverSettings(evalTime=DEFAULT_EVAL_TIME, numPoints=DEFAULT_NUM_POINTS)
+    m, k, b, x0, v0 = broadcastParameters(m, k, b, x0, v0)
+    t = asarray(t, dtype=float) if t is not None else settings.timeGrid()
+    N = m.shape[0]
+    if method == "auto":
+        linearK, linearB = forceLaw.linearization(k, b) if forceLaw is not None else (k, b)
+        settings = autoSettings(m, linearK, linearB, x0, v0, settings)
+        method = settings.method
+
+    if out is None:
+        x = empty((N, t.shape[0]))
+        v = empty((N, t.shape[0]))
+    else:
+        x, v = out
+
+    if method == "analytic":
+        for start in range(0, N, ANALYTIC_CHUNK_SIZE):
+            rows = slice(start, start + ANALYTIC_CHUNK_SIZE)
+            x[rows], v[rows], _ = analyticSolution(m[rows], k[rows], b[rows], x0[rows], v0[rows], t)
+    elif method == "propagator":
+        for start in range(0, N, ANALYTIC_CHUNK_SIZE):
+            rows = slice(start, start + ANALYTIC_CHUNK_SIZE)
+            x[rows], v[rows] = propagate(m[rows], k[rows], b[rows], x0[rows], v0[rows], t)
+    elif method == "odeint":
+        x[...], v[...] = _odeintStacked(m, k, b, x0, v0, t, settings, forceLaw)
+    else:
+        x[...], v[...] = _solveIVPStacked(m, k, b, x0, v0, t, method, settings, forceLaw)
+
+    return BatchResult(m, k, b, x0, v0, t, x, v, method, forceLaw)
+
+def _odeintStacked(m, k, b, x0, v0, t, settings, forceLaw=None):
+    from scipy.integrate import odeint
+    #Interleaved state (x_0, v_0, x_1, v_1, ...) makes the Jacobian tridiagonal, so LSODA can use
+    #its banded solver (ml = mu = 1) if it switches to the stiff method
+    N = m.shape[0]
+    if forceLaw is not None:
+        stackedAcceleration, _ = forceLaw.stackedFunctions(m, k, b)
+        def dSdx(time, S):
+            S = S.reshape(N, 2)
+            dS = empty((N, 2))
+            dS[:, 0] = S[:, 1]
+            dS[:, 1] = stackedAcceleration(S[:, 0], S[:, 1])
+            return dS.ravel()
+    else:
+        def dSdx(time, S):
+            S = S.reshape(N, 2)
+            dS = empty((N, 2))
+            dS[:, 0] = S[:, 1]
+            dS[:, 1] = (-b*S[:, 1] + k*(-S[:, 0]))/m
+            return dS.ravel()
+
+    S0 = concatenate([x0[:, None], v0[:, None]], axis=1).ravel()
+    sol = odeint(dSdx, y0=S0, t=t, tfirst=True, ml=1, mu=1,
+                 h0=settings.firstStep, hmin=settings.minStep, hmax=settings.maxStep, **settings.tolerances())
+    sol = sol.reshape(t.shape[0], N, 2)
+    return sol[:, :, 0].T, sol[:, :, 1].T
+
+def _solveIVPStacked(m, k, b, x0, v0, t, method, settings, forceLaw=None):
+    from scipy.integrate import solve_ivp
+    from scipy.sparse import diags, identity, bmat
+    #Stacked state (x_0 ... x_N-1, v_0 ... v_N-1)
+    N = m.shape[0]
+    options = {}
+    if forceLaw is not None:
+        #The nonlinear Jacobian changes with the state, only its sparsity pattern is fixed
+        stackedAcceleration, stackedJacobian = forceLaw.stackedFunctions(m, k, b)
+        def dSdx(time, S):
+            x, v = S[:N], S[N:]
+            return concatenate([v, stackedAcceleration(x, v)])
+        if method in ("Radau", "BDF"):
+            def jacobian(time, S):
+                dx, dv = stackedJacobian(S[:N], S[N:])
+                return bmat([[None, identity(N)], [diags(dx), diags(dv)]], format="csc")
+            options["jac"] = jacobian
+    else:
+        def dSdx(time, S):
+            x, v = S[:N], S[N:]
+            return concatenate([v, (-b*v + k*(-x))/m])
+        if method in ("Radau", "BDF"):
+            options["jac"] = bmat([[None, identity(N)],
+                                   [diags(-k/m), diags(-b/m)]], format="csc")
+
+    #solve_ivp controls the RMS error over all 2N components, which lets a single row drift up to
+    #sqrt(2N) times further than it would when solved alone. Tightening the tolerances (the settings'
+    #or solve_ivp's defaults) by that factor keeps every row as accurate as an individual solve_ivp run.
+    scale = (2 * N) ** 0.5
+    rtol = settings.rtol if settings.rtol > 0 else 1e-3
+    atol = settings.atol if settings.atol > 0 else 1e-6
+    firstStep = settings.firstStep if settings.firstStep > 0 else None
+    maxStep = settings.maxStep if settings.maxStep > 0 else inf
+    sol = solve_ivp(dSdx, y0=concatenate([x0, v0]), t_span=(t[0], t[-1]), t_eval=t, method=method,
+                    first_step=firstStep, max_step=maxStep, rtol=rtol / scale, atol=atol / scale, **options)
+    if not sol.success:
+        raise RuntimeError("solve_ivp failed on the stacked batch: {}".format(sol.message))
+    return sol.y[:N], sol.y[N:]
+
+
+#Per-row summary metrics of a BatchResult, each returns an array of length N
+def settlingTime(batch, band=0.02):
+    #Time after which |x| stays within band * max|x|, nan if it has not settled by the end of the grid.
+    #A last sample inside the band says nothing on its own (it may sit on a zero crossing), so like
+    #solveMSD.settlingTime the row only counts as settled when the amplitude sqrt(2E/k) = sqrt(x^2 + m*v^2/k)
+    #at the end of the grid is inside the band too. Rows without a spring (k <= 0) have no such bound.
+    amplitude = npabs(batch.x).max(axis=1)
+    limit = band * amplitude
+    outside = npabs(batch.x) > limit[:, None]
+    T = batch.t.shape[0]
+    lastOutside = T - 1 - outside[:, ::-1].argmax(axis=1)
+    settled = batch.t[(lastOutside + 1).clip(max=T - 1)]
+    totalEnergy = batch.energies([-1])[2][:, 0]
+    spring = batch.k > 0
+    envelope = sqrt((2 * totalEnergy / where(spring, batch.k, 1.0)).clip(min=0))
+    envelopeInside = spring & (maximum(envelope, npabs(batch.x[:, -1])) <= limit)
+    return where(~outside.any(axis=1), batch.t[0], where(envelopeInside, settled, nan))
+
+def peakOvershoot(batch):
+    #Largest excursion past x = 0 on the opposite side from x0, as a percentage of |x0|
+    direction = sign(batch.x0)
+    with errstate(divide="ignore", invalid="ignore"):
+        overshoot = (-(batch.x * direction[:, None])).max(axis=1).clip(min=0) / npabs(batch.x0) * 100
+    return where(batch.x0 != 0, overshoot, nan)
+
+def energyDecayRate(batch):
+    #Average exponential decay rate of the total energy over the grid, ln(E_start / E_end) / duration (1/s)
+    kineticEnergy, potentialEnergy, totalEnergy = batch.energies([0, -1])
+    with errstate(divide="ignore", invalid="ignore"):
+        return log(totalEnergy[:, 0] / totalEnergy[:, 1]) / (batch.t[-1] - batch.t[0])
+
+METRICS = {"Settling Time (s)": settlingTime,
+           "Peak Overshoot (%)": peakOvershoot,
+           "Energy Decay Rate (1/s)": energyDecayRate}
@@ -0,0 +1,54 @@
+#Chain benchmark: solves uniform chains of N masses (the last one displaced) with the modal solution and
+#every solve_ivp method, and for Radau and BDF also without the sparse analytic Jacobian (solve_ivp then
+#estimates a dense 2N x 2N one by finite differences, only run up to --dense-limit masses). Reports the
+#wall time, the RHS and Jacobian evaluations and the error against the modal solution.
+#Usage: python benchmarks/benchChain.py [--sizes 10,100,1000] [--dense-limit 200]
+import argparse
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from numpy import zeros, abs as npabs
+from scipy.integrate import solve_ivp
+from solveMSD import SolverSettings, IVP_METHODS, IMPLICIT_METHODS
+from chainMSD import uniformChain, simulateChain
+
+def solveDense(chain, x0, v0, method, settings, t):
+    #The same solve without the Jacobian
+    A = chain.stateMatrix()
+    sol = solve_ivp(lambda time, S: A @ S, y0=list(x0) + list(v0), t_span=(t[0], t[-1]), t_eval=t, method=method)
+    return sol.y[:len(chain)], int(sol.nfev), int(sol.njev)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modal and solve_ivp solves of N mass chains")
+    parser.add_argument("--sizes", default="10,100,1000", help="chain lengths")
+    parser.add_argument("--dense-limit", type=int, default=200, help="largest chain solved without the sparse Jacobian")
+    parser.add_argument("--eval-time", type=float, default=10, help="simulated seconds")
+    args = parser.parse_args()
+
+    settings = SolverSettings(evalTime=args.eval_time)
+    print("{:>6} {:<16} {:>10} {:>8} {:>6} {:>10}".format("masses", "solver", "time (ms)", "nfev", "njev", "x error"))
+    for count in [int(size) for size in args.sizes.split(",")]:
+        chain = uniformChain(count, 1.25, 25, 0.1)
+        x0 = zeros(count)
+        x0[-1] = 1.0
+        v0 = zeros(count)
+        start = time.perf_counter()
+        exact = simulateChain(chain, x0, v0, "modal", settings)
+        print("{:>6} {:<16} {:>10.2f} {:>8} {:>6} {:>10}".format(count, "modal", 1000 * (time.perf_counter() - start), 0, 0, ""))
+        for method in IVP_METHODS:
+            start = time.perf_counter()
+            result = simulateChain(chain, x0, v0, method, settings)
+            elapsed = time.perf_counter() - start
+            print("{:>6} {:<16} {:>10.2f} {:>8} {:>6} {:>10.2e}".format(count, method, 1000 * elapsed, result.solverStats["nfev"],
+                                                                    result.solverStats["njev"], npabs(result.x - exact.x).max()))
+            if method in IMPLICIT_METHODS and count <= args.dense_limit:
+                start = time.perf_counter()
+                x, nfev, njev = solveDense(chain, x0, v0, method, settings, exact.t)
+                elapsed = time.perf_counter() - start
+                print("{:>6} {:<16} {:>10.2f} {:>8} {:>6} {:>10.2e}".format(count, method + ", no jac", 1000 * elapsed, nfev, njev,
+                                                                        npabs(x - exact.x).max()))
+
+if __name__ == '__main__':
+    main()
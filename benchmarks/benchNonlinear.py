@@ -0,0 +1,101 @@
+#Nonlinear force law benchmark. Compares the linear fast paths (closed form, propagator and the linear
+#right hand side) with each nonlinear law: the cost of one right hand side call for the generic law
+#(ForceLaw.acceleration on every call, the branching a hand written RHS would do), the generated RHS and
+#the numba compiled one; single runs with odeint and solve_ivp (time, RHS evaluations, time per
+#evaluation); and batches of --rows parameter sets solved as one stacked state against the linear batch.
+#Usage: python benchmarks/benchNonlinear.py [--repeats N] [--rows 1000]
+import argparse
+import os
+import sys
+import time
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from numpy import array, linspace
+from solveMSD import SolverSettings, NUMBA_AVAILABLE, simulate, makeDerivative
+from batchMSD import batchSolve
+from forceLawMSD import ForceLaw
+
+m, k, b, x0, v0 = 1.25, 25, 0.1, 1.0, 0.0
+LAWS = {"hardening": ForceLaw("hardening", 2.0),
+        "softening": ForceLaw("softening", 0.2),
+        "quadratic drag": ForceLaw(damper="quadratic"),
+        "smooth friction": ForceLaw(friction="smooth", frictionForce=1.0, smoothing=0.01),
+        "stick-slip": ForceLaw(friction="stick-slip", frictionForce=1.0)}
+
+def best(function, repeats):
+    #Fastest of `repeats` calls, in seconds, and the last return value
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = function()
+        times.append(time.perf_counter() - start)
+    return min(times), value
+
+def genericDerivative(forceLaw):
+    def dSdx(t, S):
+        return [S[1], float(forceLaw.acceleration(m, k, b, S[0], S[1]))]
+    return dSdx
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nonlinear force laws against the linear fast path")
+    parser.add_argument("--repeats", type=int, default=5, help="the fastest of this many solves is reported")
+    parser.add_argument("--rows", type=int, default=1000, help="parameter sets per batch")
+    args = parser.parse_args()
+    if not NUMBA_AVAILABLE:
+        print("numba is not installed, the compiled variants are skipped\n")
+
+    S = array([x0, 0.5])
+    calls = 100000
+    print("single RHS call (us)")
+    print("{:<16} {:>10} {:>10} {:>10}".format("law", "generic", "generated", "numba"))
+    linear = [makeDerivative(m, k, b)] + ([makeDerivative(m, k, b, compiled=True)] if NUMBA_AVAILABLE else [])
+    row = ["{:>10}".format("")]
+    for dSdx in linear:
+        dSdx(0.0, S)
+        row.append("{:>10.3f}".format(1e6 * timeit.timeit(lambda: dSdx(0.0, S), number=calls) / calls))
+    print("{:<16} {}".format("linear", " ".join(row)))
+    for name, forceLaw in LAWS.items():
+        variants = [genericDerivative(forceLaw), forceLaw.derivative(m, k, b, direction=1.0)]
+        if NUMBA_AVAILABLE:
+            variants.append(forceLaw.derivative(m, k, b, compiled=True, direction=1.0))
+        cells = []
+        for dSdx in variants:
+            dSdx(0.0, S) #compiles the numba kernel outside the timing
+            cells.append(1e6 * timeit.timeit(lambda: dSdx(0.0, S), number=calls // 10) / (calls // 10))
+        print("{:<16} {}".format(name, " ".join("{:>10.3f}".format(cell) for cell in cells)))
+
+    print("\nsingle runs, 10 s, rtol 1e-8")
+    print("{:<16} {:<18} {:>10} {:>8} {:>12}".format("law", "solver", "time (ms)", "nfev", "us per nfev"))
+    linearSolvers = [("analytic", SolverSettings("analytic", sampling="fixed")),
+                     ("propagator", SolverSettings("propagator", sampling="fixed"))]
+    numerical = []
+    for compiled in [False, True] if NUMBA_AVAILABLE else [False]:
+        suffix = ", numba" if compiled else ""
+        numerical += [("odeint" + suffix, SolverSettings("odeint", rtol=1e-8, atol=1e-10, sampling="fixed", compiled=compiled)),
+                      ("DOP853" + suffix, SolverSettings("solve_ivp", method="DOP853", rtol=1e-8, atol=1e-10,
+                                                         sampling="fixed", compiled=compiled)),
+                      ("Radau" + suffix, SolverSettings("solve_ivp", method="Radau", rtol=1e-8, atol=1e-10,
+                                                        sampling="fixed", compiled=compiled))]
+    for name, forceLaw in [("linear", None)] + list(LAWS.items()):
+        for solverName, settings in (linearSolvers if forceLaw is None else []) + numerical:
+            simulate(m, k, b, x0, v0, settings, forceLaw=forceLaw)
+            elapsed, result = best(lambda: simulate(m, k, b, x0, v0, settings, forceLaw=forceLaw), args.repeats)
+            nfev = result.solverStats.get("nfev", 0)
+            perCall = "{:>12.2f}".format(1e6 * elapsed / nfev) if nfev else "{:>12}".format("")
+            print("{:<16} {:<18} {:>10.2f} {:>8} {}".format(name, solverName, 1000 * elapsed, nfev, perCall))
+
+    print("\nbatches of {} parameter sets (k from 10 to 40), 10 s, 1000 points".format(args.rows))
+    print("{:<16} {:<10} {:>10} {:>14}".format("law", "method", "time (ms)", "us per row"))
+    springs = linspace(10, 40, args.rows)
+    settings = SolverSettings(sampling="fixed")
+    batchLaws = [(name, forceLaw) for name, forceLaw in LAWS.items() if not forceLaw.isStickSlip()]
+    for name, forceLaw in [("linear", None)] + batchLaws:
+        methods = ["analytic", "propagator", "odeint", "RK45"] if forceLaw is None else ["odeint", "RK45"]
+        for method in methods:
+            elapsed, _ = best(lambda: batchSolve(m, springs, b, x0, v0, method=method, settings=settings, forceLaw=forceLaw),
+                              max(1, args.repeats // 2))
+            print("{:<16} {:<10} {:>10.1f} {:>14.2f}".format(name, method, 1000 * elapsed, 1e6 * elapsed / args.rows))
+
+if __name__ == '__main__':
+    main()
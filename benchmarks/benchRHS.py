@@ -0,0 +1,74 @@
+#Right hand side benchmark. Compares the original setup (dSdx without a Jacobian, so Radau, BDF and
+#LSODA's stiff mode estimate it by finite differences) with the analytic Jacobian, with the analytic
+#Jacobian plus vectorized=True, and with the numba compiled dSdx when numba is installed. Reports the
+#cost of a single RHS call and, for odeint and every solve_ivp method, the time per solve, the RHS and
+#Jacobian evaluations and the time per RHS evaluation (the per-step overhead).
+#Usage: python benchmarks/benchRHS.py [--repeats N] [--regime underdamped|stiff]
+import argparse
+import os
+import sys
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from numpy import array
+from scipy.integrate import odeint, solve_ivp
+from solveMSD import SolverSettings, IVP_METHODS, NUMBA_AVAILABLE, makeDerivative
+
+#m, k, b, x0, v0, evaluation time (s)
+REGIMES = {"underdamped": (1.25, 25, 0.1, 1.0, 0, 10),
+           "stiff": (0.001, 1e3, 50, 1.0, 0, 2)}
+
+def solve(m, k, b, x0, v0, settings, jacobian=True, vectorized=False):
+    #The solver calls simulate() makes, without building the SimulationResult. Returns (nfev, njev).
+    dSdx = makeDerivative(m, k, b, settings.compiled)
+    if settings.solver == "odeint":
+        options = settings.odeintOptions(m, k, b)
+        if not jacobian:
+            del options["Dfun"]
+        sol, info = odeint(dSdx, y0=(x0, v0), t=settings.timeGrid(), full_output=True, **options)
+        return int(info["nfe"][-1]), int(info["nje"][-1])
+    options = settings.solveIVPOptions(m, k, b)
+    if not jacobian:
+        options.pop("jac", None)
+    sol = solve_ivp(dSdx, y0=(x0, v0), t_span=(0, settings.evalTime), vectorized=vectorized, **options)
+    return int(sol.nfev), int(sol.njev)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call and per-solve cost of the right hand side variants")
+    parser.add_argument("--repeats", type=int, default=5, help="the fastest of this many solves is reported")
+    parser.add_argument("--regime", choices=list(REGIMES), default="underdamped")
+    args = parser.parse_args()
+    m, k, b, x0, v0, evalTime = REGIMES[args.regime]
+
+    #name, compiled RHS, analytic Jacobian, vectorized
+    variants = [("no jac", False, False, False), ("jac", False, True, False), ("jac, vectorized", False, True, True)]
+    derivatives = [("python", makeDerivative(m, k, b))]
+    if NUMBA_AVAILABLE:
+        variants.append(("numba, jac", True, True, False))
+        derivatives.append(("numba", makeDerivative(m, k, b, compiled=True)))
+    else:
+        print("numba is not installed, the compiled variant is skipped\n")
+
+    S = array([x0, v0])
+    calls = 100000
+    print("single RHS call")
+    for name, dSdx in derivatives:
+        dSdx(0.0, S)
+        print("  {:<8} {:>8.3f} us".format(name, 1e6 * timeit.timeit(lambda: dSdx(0.0, S), number=calls) / calls))
+
+    print("\n{} regime (m={}, k={}, b={}, {} s)".format(args.regime, m, k, b, evalTime))
+    print("{:<8} {:<16} {:>10} {:>8} {:>6} {:>12}".format("solver", "variant", "time (ms)", "nfev", "njev", "us per nfev"))
+    for method in ["odeint"] + IVP_METHODS:
+        for name, compiled, jacobian, vectorized in variants:
+            if method == "odeint" and vectorized:
+                continue
+            solver = "odeint" if method == "odeint" else "solve_ivp"
+            settings = SolverSettings(solver=solver, method=method if solver == "solve_ivp" else "RK45",
+                                      evalTime=evalTime, compiled=compiled)
+            run = lambda: solve(m, k, b, x0, v0, settings, jacobian, vectorized)
+            nfev, njev = run()
+            elapsed = min(timeit.repeat(run, number=1, repeat=max(1, args.repeats)))
+            print("{:<8} {:<16} {:>10.2f} {:>8} {:>6} {:>12.2f}".format(method, name, 1000 * elapsed, nfev, njev, 1e6 * elapsed / nfev))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#Rendering benchmark for the animation tab: the painted AnimationWidget canvas against the previous
+#widget-per-element scene (20 dash widgets with opacity effects, a styled wall and a styled mass widget
+#moved through the layout every frame). Reports CPU time per frame and the sustained frame rate when
+#every frame is shown and its pending paint events are processed straight away. The widget scene paints
+#no spring or damper, so for one mass it is the cheaper of the two; --masses compares chains of styled
+#mass widgets, one moved per mass every frame, with the ChainAnimationWidget canvas.
+#Usage: QT_QPA_PLATFORM=offscreen python benchmarks/benchRender.py [--frames N] [--masses 10,100,1000,5000]
+import argparse
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QGraphicsOpacityEffect
+from PyQt5.QtCore import QPoint
+from numpy import zeros
+from solveMSD import simulate
+from chainMSD import uniformChain, simulateChain
+from animateMSD import AnimationWidget, ChainAnimationWidget
+
+class WidgetSceneAnimation(QWidget):
+    #The scene as it was built before the painted canvas, kept here as the benchmark baseline
+    def __init__(self, positions):
+        super().__init__()
+        self.positions = positions
+        self.resize(600, 600)
+        wall = QWidget(self)
+        wall.setStyleSheet("background-color:black;")
+        wall.resize(10, 600)
+        wall.move(QPoint(90, 0))
+        zeroLabel = QLabel("x=0", self)
+        zeroLabel.move(QPoint(285, 195))
+        for i in range(20):
+            dash = QWidget(self)
+            dash.setStyleSheet("background-color:gray;")
+            dash.resize(1, 20)
+            effect = QGraphicsOpacityEffect(dash)
+            effect.setOpacity(0.7)
+            dash.move(QPoint(300, 30 * i))
+        self.child = QWidget(self)
+        self.child.setStyleSheet("background-color:red;border-radius:15px;")
+        self.child.resize(100, 100)
+
+    def showFrameIndex(self, index):
+        self.child.move(QPoint(int(self.positions[index]), 300))
+
+
+class WidgetChainAnimation(QWidget):
+    #The widget scene grown to a chain: one styled widget per mass, at the canvas' mass positions
+    def __init__(self, positions, massWidth):
+        super().__init__()
+        self.positions = positions
+        self.resize(600, 600)
+        wall = QWidget(self)
+        wall.setStyleSheet("background-color:black;")
+        wall.resize(10, 600)
+        wall.move(QPoint(90, 0))
+        self.masses = []
+        for _ in range(positions.shape[0]):
+            mass = QWidget(self)
+            mass.setStyleSheet("background-color:red;border-radius:4px;")
+            mass.resize(max(1, int(massWidth)), 60)
+            self.masses.append(mass)
+
+    def showFrameIndex(self, index):
+        for mass, position in zip(self.masses, self.positions[:, index]):
+            mass.move(QPoint(int(position), 300))
+
+
+def measure(name, widget, showFrame, frames, app):
+    widget.show()
+    app.processEvents()
+    cpuStart = time.process_time()
+    wallStart = time.perf_counter()
+    for frame in range(frames):
+        showFrame(frame)
+        app.processEvents()
+    cpu = time.process_time() - cpuStart
+    wall = time.perf_counter() - wallStart
+    widget.hide()
+    print("{:<22} {:>10.3f} {:>10.1f}".format(name, 1000 * cpu / frames, frames / wall))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU per frame and sustained fps of the animation scene")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--masses", default="10,100,1000,5000", help="comma separated chain lengths")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    result = simulate(1.25, 25, 0.1, 1.0, 0)
+    canvas = AnimationWidget(1.25, 25, 0.1, 1.0, 0, result.t, result.x, result.v, fps=60)
+    frameTimes = canvas.track.frameTimes - canvas.track.startTime
+    widgets = WidgetSceneAnimation(canvas.track.positions)
+
+    print("{} frames".format(args.frames))
+    print("{:<22} {:>10} {:>10}".format("scene", "CPU ms/fr", "fps"))
+    measure("widget per element", widgets, lambda frame: widgets.showFrameIndex(frame % len(canvas.track)), args.frames, app)
+    measure("painted canvas", canvas, lambda frame: canvas.seek(frameTimes[frame % len(canvas.track)]), args.frames, app)
+
+    for count in [int(value) for value in args.masses.split(",")]:
+        chain = uniformChain(count, 1.0, 25.0, 0.1)
+        x0 = zeros(count)
+        x0[0] = 0.1
+        result = simulateChain(chain, x0, zeros(count))
+        canvas = ChainAnimationWidget(chain, result.t, result.x, result.v, fps=60)
+        frameTimes = canvas.track.frameTimes - canvas.track.startTime
+        widgets = WidgetChainAnimation(canvas.track.positions, canvas.massWidth)
+        frames = max(20, args.frames * 10 // count)
+        print("\n{} masses, {} frames".format(count, frames))
+        measure("widget per mass", widgets, lambda frame: widgets.showFrameIndex(frame % len(canvas.track)), frames, app)
+        measure("chain canvas", canvas, lambda frame: canvas.seek(frameTimes[frame % len(canvas.track)]), frames, app)
+
+if __name__ == '__main__':
+    main()
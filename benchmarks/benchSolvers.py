@@ -0,0 +1,97 @@
+#Solver benchmark: times odeint, every solve_ivp method, the "auto" choice and the expm propagator on representative (m, k, b) regimes, from a
+#lightly damped oscillator to stiff systems (high k, low m), and reports the wall time, the right hand
+#side and Jacobian evaluations and the error against the closed form at the solver's own time points.
+#Results are printed as a table and can be written as JSON to track them across versions.
+#Usage: python benchmarks/benchSolvers.py [--repeats N] [--json out.json] [--compare previous.json]
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import numpy
+import scipy
+from numpy import median
+from solveMSD import SolverSettings, IVP_METHODS, DEFAULT_ACCURACY, simulate, stiffnessRatio
+
+#name, m, k, b, x0, v0, evaluation time (s)
+REGIMES = [("underdamped", 1.25, 25, 0.1, 1.0, 0, 10),
+           ("near critical", 1.0, 25, 9.9, 1.0, 0, 10),
+           ("overdamped", 1.0, 25, 50, 1.0, 0, 10),
+           ("stiff spring", 0.01, 1e4, 0.1, 1.0, 0, 2),
+           ("stiff overdamped", 0.001, 1e3, 50, 1.0, 0, 2)]
+
+def configurations(evalTime, firstStep, maxStep, accuracy):
+    options = {"firstStep": firstStep, "maxStep": maxStep, "evalTime": evalTime}
+    return ([SolverSettings(solver="odeint", **options)]
+            + [SolverSettings(solver="solve_ivp", method=method, **options) for method in IVP_METHODS]
+            + [SolverSettings(solver="auto", accuracy=accuracy, **options)]
+            + [SolverSettings(solver="propagator", **options)])
+
+def benchmark(regime, settings, repeats):
+    name, m, k, b, x0, v0, evalTime = regime
+    #The untimed first run pays for the scipy import and any other one-off setup
+    simulate(m, k, b, x0, v0, settings)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = simulate(m, k, b, x0, v0, settings)
+        times.append(time.perf_counter() - start)
+    positionError, velocityError = result.analyticError()
+    return {"regime": name, "m": m, "k": k, "b": b, "x0": x0, "v0": v0, "evalTime": evalTime,
+            "stiffnessRatio": float(stiffnessRatio(m, k, b)),
+            "solver": settings.solver, "method": settings.method if settings.solver == "solve_ivp" else "",
+            "selectedMethod": result.settings.method if settings.solver == "auto" else "",
+            "wallTime": float(median(times)), "wallTimeMin": float(min(times)),
+            "nfev": result.solverStats.get("nfev"), "njev": result.solverStats.get("njev"),
+            "steps": result.solverStats.get("steps"),
+            "maxPositionError": positionError, "maxVelocityError": velocityError}
+
+def environment():
+    return {"python": platform.python_version(), "numpy": numpy.__version__, "scipy": scipy.__version__,
+            "platform": platform.platform(), "processor": platform.machine(), "cpuCount": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wall time, RHS evaluations and accuracy of every solver")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per case, the median time is reported")
+    parser.add_argument("--first-step", type=float, default=0, help="h0 / first_step for every case, 0 = solver default")
+    parser.add_argument("--max-step", type=float, default=0, help="hmax / max_step for every case, 0 = no limit")
+    parser.add_argument("--accuracy", type=float, default=DEFAULT_ACCURACY, help="target accuracy of the auto solver")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="earlier --json output to compare wall times against")
+    args = parser.parse_args()
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as file:
+            previous = {(row["regime"], row["solver"], row["method"]): row for row in json.load(file)["results"]}
+
+    results = []
+    print("{:<17} {:>9} {:<16} {:>10} {:>8} {:>6} {:>7} {:>10} {:>10}{}".format(
+        "regime", "stiffness", "solver", "time (ms)", "nfev", "njev", "steps", "x error", "v error",
+        " {:>8}".format("vs prev") if previous else ""))
+    for regime in REGIMES:
+        for settings in configurations(regime[-1], args.first_step, args.max_step, args.accuracy):
+            row = benchmark(regime, settings, max(1, args.repeats))
+            results.append(row)
+            label = row["method"] or row["solver"]
+            if row["selectedMethod"]:
+                label = "auto ({})".format(row["selectedMethod"])
+            comparison = ""
+            if previous:
+                earlier = previous.get((row["regime"], row["solver"], row["method"]))
+                comparison = " {:>7.2f}x".format(row["wallTime"] / earlier["wallTime"]) if earlier else " {:>8}".format("new")
+            print("{:<17} {:>9.3g} {:<16} {:>10.2f} {:>8} {:>6} {:>7} {:>10.2e} {:>10.2e}{}".format(
+                row["regime"], row["stiffnessRatio"], label, 1000 * row["wallTime"], row["nfev"], row["njev"],
+                row["steps"], row["maxPositionError"], row["maxVelocityError"], comparison))
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"environment": environment(), "repeats": args.repeats, "firstStep": args.first_step,
+                       "maxStep": args.max_step, "accuracy": args.accuracy, "results": results}, file, indent=1)
+
+if __name__ == '__main__':
+    main()
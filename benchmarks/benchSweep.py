@@ -0,0 +1,45 @@
+#Scaling benchmark for sweepMSD: solves the same sweep with 1, 2, 4 ... workers and reports the
+#speedup and parallel efficiency against the single worker run.
+#Usage: python benchmarks/benchSweep.py [--points N] [--chunk-size C] [--max-workers W]
+import argparse
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from numpy import linspace
+from solveMSD import SolverSettings, IVP_METHODS
+from batchMSD import parameterGrid
+from sweepMSD import runSweep
+
+def main():
+    parser = argparse.ArgumentParser(description="Process pool scaling of a solve_ivp parameter sweep")
+    parser.add_argument("--points", type=int, default=20, help="values per parameter axis (points^2 * 5 parameter sets)")
+    parser.add_argument("--chunk-size", type=int, default=25)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    m, k, b, x0, v0 = parameterGrid(linspace(0.1, 10, args.points), linspace(0.1, 100, args.points),
+                                    linspace(0, 1, 5), 1.0, 0)
+    settingsList = [SolverSettings(solver="solve_ivp", method=method) for method in IVP_METHODS]
+
+    workerCounts = []
+    workers = 1
+    while workers < args.max_workers:
+        workerCounts.append(workers)
+        workers *= 2
+    workerCounts.append(args.max_workers)
+
+    print("{} parameter sets x {} methods, chunk size {}".format(m.shape[0], len(settingsList), args.chunk_size))
+    print("{:>8} {:>10} {:>8} {:>11}".format("workers", "time (s)", "speedup", "efficiency"))
+    baseline = None
+    for workers in workerCounts:
+        start = time.perf_counter()
+        result = runSweep(m, k, b, x0, v0, settingsList, workers=workers, chunkSize=args.chunk_size)
+        elapsed = time.perf_counter() - start
+        result.release()
+        baseline = baseline if baseline is not None else elapsed
+        speedup = baseline / elapsed
+        print("{:>8} {:>10.3f} {:>8.2f} {:>10.0%}".format(workers, elapsed, speedup, speedup / workers))
+
+if __name__ == '__main__':
+    main()
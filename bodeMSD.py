@@ -0,0 +1,169 @@
+from PyQt5.QtWidgets import QWidget, QGroupBox, QGridLayout, QHBoxLayout, QLabel, QComboBox, QLineEdit
+from PyQt5.QtCore import Qt
+import pyqtgraph as pg
+from numpy import meshgrid, full, isfinite, log10, nan
+from frequencyMSD import frequencyResponse, RESPONSE_METRICS, DEFAULT_FREQUENCY_COUNT
+from heatmapMSD import PARAMETERS, MapAxesMixin
+
+#Only m, k and b enter the transfer function
+MAP_PARAMETERS = {label: value for label, value in PARAMETERS.items() if value[0] in ("m", "k", "b")}
+
+class FrequencyResponseWidget(MapAxesMixin, QWidget):
+    #Bode plot of the system on the Main tab and a resonance map over two of m, k and b. Both come from
+    #the closed form transfer function, so they are redrawn straight away whenever refresh() is called.
+    mapParameters = MAP_PARAMETERS
+
+    def __init__(self, currentParameters):
+        super().__init__()
+        self.currentParameters = currentParameters
+
+        self.createBodeGroupBox()
+        self.createResonanceMapGroupBox()
+
+        layout = QGridLayout()
+        layout.addWidget(self.bodeGroupBox, 0, 0)
+        layout.addWidget(self.resonanceMapGroupBox, 0, 1)
+        layout.setColumnStretch(0, 3)
+        layout.setColumnStretch(1, 2)
+        self.setLayout(layout)
+
+    def createBodeGroupBox(self):
+        self.bodeGroupBox = QGroupBox(title="Bode Plot")
+
+        self.magnitudeGraph = pg.PlotWidget()
+        self.magnitudeGraph.showGrid(x=True, y=True)
+        self.magnitudeGraph.setLogMode(x=True)
+        self.magnitudeGraph.setLabel('left', 'Magnitude', units='dB')
+        self.magnitudeLine = self.magnitudeGraph.plot([], [])
+        self.peakMarker = self.magnitudeGraph.plot([], [], pen=None, symbol='o', symbolSize=8, symbolBrush='r', symbolPen=None)
+        #Log mode axes take positions in decades
+        self.bandwidthLine = pg.InfiniteLine(pos=0, angle=90, movable=False, pen=pg.mkPen('m', width=1, style=Qt.DashLine))
+        self.magnitudeGraph.getPlotItem().addItem(self.bandwidthLine, ignoreBounds=True)
+
+        self.phaseGraph = pg.PlotWidget()
+        self.phaseGraph.showGrid(x=True, y=True)
+        self.phaseGraph.setLogMode(x=True)
+        self.phaseGraph.setLabel('left', 'Phase', units='deg')
+        self.phaseGraph.setLabel('bottom', 'Frequency', units='Hz')
+        self.phaseGraph.setXLink(self.magnitudeGraph)
+        self.phaseLine = self.phaseGraph.plot([], [])
+
+        resonanceFrequencyLabel = QLabel("Resonance Frequency (Hz):")
+        self.resonanceFrequencyOutput = QLabel("")
+        self.resonanceFrequencyOutput.setStyleSheet("font-weight: bold")
+        peakLabel = QLabel("Resonance Peak:")
+        peakLabel.setToolTip("Largest |X/F| and how far it rises above the static gain 1/k")
+        self.peakOutput = QLabel("")
+        self.peakOutput.setStyleSheet("font-weight: bold")
+        bandwidthLabel = QLabel("Bandwidth (Hz):")
+        bandwidthLabel.setToolTip("Frequency where |X/F| has fallen 3 dB below the static gain")
+        self.bandwidthOutput = QLabel("")
+        self.bandwidthOutput.setStyleSheet("font-weight: bold")
+        pointsLabel = QLabel("Points:")
+        self.pointsInput = QLineEdit(str(DEFAULT_FREQUENCY_COUNT))
+        self.pointsInput.editingFinished.connect(self.refresh)
+
+        attributesLayout = QHBoxLayout()
+        attributesLayout.addWidget(resonanceFrequencyLabel)
+        attributesLayout.addWidget(self.resonanceFrequencyOutput)
+        attributesLayout.addStretch(1)
+        attributesLayout.addWidget(peakLabel)
+        attributesLayout.addWidget(self.peakOutput)
+        attributesLayout.addStretch(1)
+        attributesLayout.addWidget(bandwidthLabel)
+        attributesLayout.addWidget(self.bandwidthOutput)
+        attributesLayout.addStretch(1)
+        attributesLayout.addWidget(pointsLabel)
+        attributesLayout.addWidget(self.pointsInput)
+
+        layout = QGridLayout()
+        layout.addWidget(self.magnitudeGraph, 0, 0)
+        layout.addWidget(self.phaseGraph, 1, 0)
+        layout.addLayout(attributesLayout, 2, 0)
+        self.bodeGroupBox.setLayout(layout)
+
+    def createResonanceMapGroupBox(self):
+        self.resonanceMapGroupBox = QGroupBox(title="Resonance Map")
+
+        self.xAxisInputs = self.createAxisInputs("Mass (kg)", 200)
+        self.yAxisInputs = self.createAxisInputs("Damping Ratio, b", 200)
+        for parameterInput, minInput, maxInput, stepsInput in [self.xAxisInputs, self.yAxisInputs]:
+            for control in [minInput, maxInput, stepsInput]:
+                control.editingFinished.connect(self.refreshMap)
+            parameterInput.currentIndexChanged.connect(self.refreshMap)
+        self.metricInput = QComboBox()
+        self.metricInput.addItems(list(RESPONSE_METRICS))
+        self.metricInput.currentIndexChanged.connect(self.refreshMap)
+
+        self.mapGraph = pg.PlotWidget()
+        self.mapImage = pg.ImageItem()
+        self.mapGraph.addItem(self.mapImage)
+        self.colorBar = pg.ColorBarItem(colorMap=pg.colormap.get("viridis"), interactive=False)
+        self.colorBar.setImageItem(self.mapImage, insert_in=self.mapGraph.getPlotItem())
+        #The Main tab's values of the two mapped parameters
+        self.mapMarker = self.mapGraph.plot([], [], pen=None, symbol='+', symbolSize=12, symbolPen='w')
+
+        layout = QGridLayout()
+        self.addAxisInputs(layout)
+        layout.addWidget(QLabel("Metric:"), 2, 0)
+        layout.addWidget(self.metricInput, 2, 1, 1, 3)
+        layout.addWidget(self.mapGraph, 3, 0, 1, 8)
+        layout.setRowStretch(3, 1)
+        self.resonanceMapGroupBox.setLayout(layout)
+
+    def refresh(self):
+        #Redraws the Bode plot and the map for the parameters on the Main tab
+        try:
+            parameters = self.currentParameters()
+            count = max(2, int(float(self.pointsInput.text())))
+        except ValueError:
+            return
+        m, k, b = parameters["m"], parameters["k"], parameters["b"]
+        response = frequencyResponse(m, k, b, count=count)
+        frequencies = response.frequencies
+        self.magnitudeLine.setData(frequencies, response.magnitude[0])
+        self.phaseLine.setData(frequencies, response.phase[0])
+
+        resonanceFrequency = float(response.resonanceFrequency[0])
+        peakGain = float(response.peakGain[0])
+        amplification = float(response.amplification[0])
+        bandwidth = float(response.bandwidth[0])
+        self.resonanceFrequencyOutput.setText("{:.5f}".format(resonanceFrequency) if resonanceFrequency > 0 else "none")
+        peak = "{:.3e} m/N".format(peakGain) if isfinite(peakGain) else "unbounded"
+        if isfinite(amplification):
+            peak += " (x{:.3g})".format(amplification)
+        self.peakOutput.setText(peak)
+        self.bandwidthOutput.setText("{:.5f}".format(bandwidth) if isfinite(bandwidth) else "n/a")
+        if resonanceFrequency > 0 and isfinite(peakGain):
+            self.peakMarker.setData([resonanceFrequency], [20 * log10(peakGain)])
+        else:
+            self.peakMarker.setData([], [])
+        self.bandwidthLine.setVisible(bool(isfinite(bandwidth) and bandwidth > 0))
+        if self.bandwidthLine.isVisible():
+            self.bandwidthLine.setValue(log10(bandwidth))
+        self.refreshMap()
+
+    def refreshMap(self):
+        #The whole grid is one vectorized closed form evaluation
+        try:
+            parameters = self.currentParameters()
+            xKey, xValues = self.axisValues(self.xAxisInputs)
+            yKey, yValues = self.axisValues(self.yAxisInputs)
+        except ValueError:
+            return
+        #Cell (i, j) of the image is xValues[i], yValues[j]
+        xGrid, yGrid = meshgrid(xValues, yValues, indexing="ij")
+        grids = {key: full(xGrid.shape, parameters[key]) for key in ("m", "k", "b")}
+        grids[xKey] = xGrid
+        grids[yKey] = yGrid
+        metric = self.metricInput.currentText()
+        values = RESPONSE_METRICS[metric](grids["m"], grids["k"], grids["b"])
+        values = values.astype(float)
+        values[~isfinite(values)] = nan
+
+        self.showValues(self.mapImage, self.colorBar, values)
+        self.placeImage(self.mapImage, xValues, yValues)
+        self.mapMarker.setData([parameters[xKey]], [parameters[yKey]])
+        self.mapGraph.setLabel('bottom', self.xAxisInputs[0].currentText())
+        self.mapGraph.setLabel('left', self.yAxisInputs[0].currentText())
+        self.mapGraph.setTitle(metric)
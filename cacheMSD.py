@@ -0,0 +1,127 @@
+#Bounded LRU cache of SimulationResults keyed on the physics, the solver settings, the forcing and the force law,
+#optionally persisted to disk between sessions. Headless like solveMSD.
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from solveMSD import SolverSettings, simulate
+
+DEFAULT_MAX_BYTES = 256 * 1024**2
+
+def cacheKey(m, k, b, x0, v0, settings, forcing=None, forceLaw=None):
+    settings = settings if settings is not None else SolverSettings()
+    forced = forcing is not None and forcing.isActive()
+    nonlinear = forceLaw is not None and not forceLaw.isLinear()
+    #The method only matters to solve_ivp, the point count only to fixed grids (a free linear solve_ivp or
+    #"auto" run returns the solver's own steps, forced and nonlinear ones are sampled on the fixed grid),
+    #the sampling tolerance only to adaptive grids and the accuracy only to "auto", which chooses the
+    #method and tolerances itself
+    adaptive = settings.sampling == "adaptive"
+    method = settings.method if settings.solver == "solve_ivp" else None
+    ownSteps = settings.solver in ("solve_ivp", "auto") and not forced and not nonlinear
+    numPoints = settings.numPoints if not adaptive and not ownSteps else None
+    samplingTolerance = settings.samplingTolerance if adaptive else None
+    accuracy = settings.accuracy if settings.solver == "auto" else None
+    key = (float(m), float(k), float(b), float(x0), float(v0), settings.solver, method,
+           settings.firstStep, settings.minStep, settings.maxStep, settings.evalTime, numPoints,
+           settings.rtol, settings.atol, accuracy, settings.sampling, samplingTolerance)
+    #Free response keys of the linear system are left as they were, so a saved cache stays valid
+    if forced:
+        key = key + forcing.key()
+    if nonlinear:
+        key = key + ("forceLaw",) + forceLaw.key()
+    return key
+
+def resultBytes(result):
+    arrays = [result.t, result.x, result.v, result.a,
+              result.kineticEnergy, result.potentialEnergy, result.totalEnergy]
+    return sum(getattr(array, "nbytes", 0) for array in arrays)
+
+
+class ResultCache:
+    #Least recently used results are evicted once the arrays held exceed maxBytes. All methods are
+    #safe to call from worker threads.
+    def __init__(self, maxBytes=DEFAULT_MAX_BYTES, path=None):
+        self.maxBytes = maxBytes
+        self.path = path
+        self.entries = OrderedDict()
+        self.currentBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        with self.lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        size = resultBytes(result)
+        with self.lock:
+            if key in self.entries:
+                self.currentBytes -= resultBytes(self.entries.pop(key))
+            if size > self.maxBytes:
+                return
+            self.entries[key] = result
+            self.currentBytes += size
+            while self.currentBytes > self.maxBytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.currentBytes -= resultBytes(evicted)
+                self.evictions += 1
+
+    def simulate(self, m, k, b, x0, v0, settings=None, forcing=None, forceLaw=None):
+        #solveMSD.simulate with memoization
+        key = cacheKey(m, k, b, x0, v0, settings, forcing, forceLaw)
+        result = self.get(key)
+        if result is None:
+            result = simulate(m, k, b, x0, v0, settings, forcing, forceLaw)
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.currentBytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self.entries), "bytes": self.currentBytes, "maxBytes": self.maxBytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hitRate": self.hits / lookups if lookups else 0.0}
+
+    def save(self, path=None):
+        path = path if path is not None else self.path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            entries = list(self.entries.items())
+        #Written to a temporary file first so an interrupted save never leaves a truncated cache
+        temporaryPath = path + ".tmp"
+        with open(temporaryPath, "wb") as file:
+            pickle.dump(entries, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaryPath, path)
+
+    def load(self, path=None):
+        #Entries are added oldest first so the saved LRU order is kept. An unreadable file is ignored.
+        path = path if path is not None else self.path
+        try:
+            with open(path, "rb") as file:
+                entries = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return
+        for key, result in entries:
+            self.put(key, result)
@@ -0,0 +1,180 @@
+#Chains of N masses joined by springs and dampers: M x'' + C x' + K x = 0 with a diagonal mass matrix and
+#tridiagonal stiffness and damping matrices. Link i joins mass i - 1 to mass i, link 0 joins the first mass
+#to the left wall, and an optional end link joins the last mass to a right wall. A chain of one mass is
+#the system of solveMSD. Solved either exactly by modal decomposition or by solve_ivp on the stacked
+#state (x_0 ... x_N-1, v_0 ... v_N-1) with a sparse right hand side and a sparse analytic Jacobian.
+#Headless like solveMSD, only needs numpy (scipy for the matrices, the modes and solve_ivp).
+from numpy import (asarray, broadcast_to, concatenate, column_stack, zeros, sqrt, pi, full, errstate, einsum, linspace,
+                   abs as npabs)
+from numpy.linalg import lstsq
+from solveMSD import SolverSettings, IVP_METHODS, IMPLICIT_METHODS, analyticSolution
+
+CHAIN_SOLVERS = ["modal"] + IVP_METHODS
+#Damping counts as proportional when C = alpha M + beta K fits every entry to this relative accuracy
+PROPORTIONAL_TOLERANCE = 1e-10
+#Masses evaluated together when the modal coordinates are mapped back, keeps the temporaries small
+MODAL_CHUNK_SIZE = 256
+
+class Chain:
+    #masses (N), springs and dampers (N, link i ends at mass i), endSpring and endDamper for a right wall
+    #(0 leaves the last mass free). Scalars are repeated for every mass.
+    def __init__(self, masses, springs, dampers, endSpring=0.0, endDamper=0.0):
+        masses = asarray(masses, dtype=float).ravel()
+        count = masses.shape[0]
+        self.masses = masses
+        self.springs = broadcast_to(asarray(springs, dtype=float), (count,)).copy()
+        self.dampers = broadcast_to(asarray(dampers, dtype=float), (count,)).copy()
+        self.endSpring = float(endSpring)
+        self.endDamper = float(endDamper)
+        if count == 0 or (masses <= 0).any():
+            raise ValueError("A chain needs at least one mass and every mass must be positive")
+        self._modes = None
+
+    def __len__(self):
+        return self.masses.shape[0]
+
+    def linkDiagonals(self, links, end):
+        #Main and upper diagonals of the tridiagonal matrix of a set of links (stiffness or damping)
+        following = concatenate([links[1:], [end]])
+        return links + following, -links[1:]
+
+    def matrices(self):
+        #Sparse mass, damping and stiffness matrices (CSR)
+        from scipy.sparse import diags
+        matrices = [diags(self.masses, format="csr")]
+        for links, end in ((self.dampers, self.endDamper), (self.springs, self.endSpring)):
+            main, upper = self.linkDiagonals(links, end)
+            matrices.append(diags([upper, main, upper], [-1, 0, 1], shape=(len(self), len(self)), format="csr"))
+        return tuple(matrices)
+
+    def stateMatrix(self):
+        #Sparse 2N x 2N Jacobian [[0, I], [-M^-1 K, -M^-1 C]] of the stacked state, with 5N - 4 nonzeros
+        from scipy.sparse import bmat, diags, identity
+        M, C, K = self.matrices()
+        inverseMass = diags(1 / self.masses)
+        return bmat([[None, identity(len(self))], [-inverseMass @ K, -inverseMass @ C]], format="csr")
+
+    def proportionalDamping(self):
+        #(alpha, beta) with C = alpha M + beta K, or None when the damping is not proportional and the
+        #modes do not decouple
+        stiffnessMain, stiffnessUpper = self.linkDiagonals(self.springs, self.endSpring)
+        dampingMain, dampingUpper = self.linkDiagonals(self.dampers, self.endDamper)
+        #One equation per nonzero entry: the diagonal and the upper diagonal (M has none there)
+        design = column_stack([concatenate([self.masses, zeros(len(self) - 1)]), concatenate([stiffnessMain, stiffnessUpper])])
+        target = concatenate([dampingMain, dampingUpper])
+        (alpha, beta), *_ = lstsq(design, target, rcond=None)
+        if npabs(design @ [alpha, beta] - target).max() > PROPORTIONAL_TOLERANCE * npabs(target).max():
+            return None
+        return alpha, beta
+
+    def modes(self):
+        #(angular frequencies (rad/s), mass normalized mode shapes (N, N), modal damping (1/s)), lowest
+        #mode first. K phi = w^2 M phi is solved as the symmetric tridiagonal M^-1/2 K M^-1/2, so the
+        #decomposition is O(N^2). Cached, the chain is not meant to be changed once built.
+        if self._modes is None:
+            from scipy.linalg import eigh_tridiagonal
+            damping = self.proportionalDamping()
+            if damping is None:
+                raise ValueError("The modes only decouple with proportional damping (C = alpha M + beta K), "
+                                 "use a solve_ivp method for this chain")
+            main, upper = self.linkDiagonals(self.springs, self.endSpring)
+            rootMass = sqrt(self.masses)
+            eigenvalues, vectors = eigh_tridiagonal(main / self.masses, upper / (rootMass[:-1] * rootMass[1:]))
+            eigenvalues = eigenvalues.clip(min=0) #rigid body modes can come out as -1e-16
+            alpha, beta = damping
+            self._modes = (sqrt(eigenvalues), vectors / rootMass[:, None], alpha + beta * eigenvalues)
+        return self._modes
+
+    def naturalFrequencies(self):
+        #Undamped natural frequency (Hz) of every mode, lowest first; O(N^2) without the mode shapes and
+        #for any damping
+        from scipy.linalg import eigvalsh_tridiagonal
+        main, upper = self.linkDiagonals(self.springs, self.endSpring)
+        rootMass = sqrt(self.masses)
+        eigenvalues = eigvalsh_tridiagonal(main / self.masses, upper / (rootMass[:-1] * rootMass[1:]))
+        return sqrt(eigenvalues.clip(min=0)) / (2 * pi)
+
+    def dampingRatios(self):
+        #Damping ratio of every mode (proportional damping only)
+        frequencies, _, damping = self.modes()
+        with errstate(divide="ignore", invalid="ignore"):
+            return damping / (2 * frequencies)
+
+    def key(self):
+        return (self.masses.tobytes(), self.springs.tobytes(), self.dampers.tobytes(), self.endSpring, self.endDamper)
+
+
+def uniformChain(count, m, k, b, fixedEnd=False):
+    #count equal masses and links; with fixedEnd the last mass is tied to a right wall by one more link
+    return Chain(full(count, float(m)), k, b, endSpring=k if fixedEnd else 0.0, endDamper=b if fixedEnd else 0.0)
+
+
+class ChainResult:
+    #Trajectories of every mass: x and v are (N, T) blocks. Acceleration and energies are computed on
+    #request to keep memory down.
+    def __init__(self, chain, settings, t, x, v, solverStats=None):
+        self.chain = chain
+        self.settings = settings
+        self.t = t
+        self.x = x
+        self.v = v
+        self.solverStats = solverStats if solverStats is not None else {}
+
+    def __len__(self):
+        return len(self.chain)
+
+    @property
+    def a(self):
+        M, C, K = self.chain.matrices()
+        return -(K @ self.x + C @ self.v) / self.chain.masses[:, None]
+
+    def energies(self):
+        #Kinetic, potential (stored in the springs) and total energy over time, each of length T
+        M, C, K = self.chain.matrices()
+        kineticEnergy = 0.5 * einsum("i,it,it->t", self.chain.masses, self.v, self.v)
+        potentialEnergy = 0.5 * einsum("it,it->t", self.x, K @ self.x)
+        return kineticEnergy, potentialEnergy, kineticEnergy + potentialEnergy
+
+
+def modalSolution(chain, x0, v0, t):
+    #Exact response: every mode is a single mass-spring-damper with unit mass, stiffness w^2 and
+    #damping alpha + beta w^2, solved by the closed form and mapped back through the mode shapes
+    frequencies, shapes, damping = chain.modes()
+    #Mass normalized shapes: phi^T M phi = I, so the modal coordinates are phi^T M x
+    q0 = shapes.T @ (chain.masses * x0)
+    dq0 = shapes.T @ (chain.masses * v0)
+    q, dq, _ = analyticSolution(1.0, frequencies**2, damping, q0, dq0, t)
+    x = zeros((len(chain), t.shape[0]))
+    v = zeros((len(chain), t.shape[0]))
+    for start in range(0, len(chain), MODAL_CHUNK_SIZE):
+        rows = slice(start, start + MODAL_CHUNK_SIZE)
+        x[rows] = shapes[rows] @ q
+        v[rows] = shapes[rows] @ dq
+    return x, v
+
+def simulateChain(chain, x0, v0, solver="modal", settings=None):
+    #x0 and v0 are per mass (scalars are repeated). solver is "modal" or a solve_ivp method; the output
+    #grid is the fixed numPoints grid of settings.
+    if solver not in CHAIN_SOLVERS:
+        raise ValueError("Unknown chain solver '{}', expected one of {}".format(solver, CHAIN_SOLVERS))
+    settings = settings if settings is not None else SolverSettings()
+    x0, v0 = [broadcast_to(asarray(value, dtype=float), (len(chain),)) for value in (x0, v0)]
+    t = linspace(0, settings.evalTime, settings.numPoints)
+    if solver == "modal":
+        x, v = modalSolution(chain, x0, v0, t)
+        return ChainResult(chain, settings, t, x, v, {"nfev": 0, "njev": 0})
+
+    from scipy.integrate import solve_ivp
+    #The right hand side is one sparse product; the implicit methods get the same matrix as their
+    #constant Jacobian, so their Newton iterations factorize a sparse 2N x 2N matrix
+    A = chain.stateMatrix()
+    def dSdx(time, S):
+        return A @ S
+    options = {"jac": A} if solver in IMPLICIT_METHODS else {}
+    sol = solve_ivp(dSdx, y0=concatenate([x0, v0]), t_span=(t[0], t[-1]), t_eval=t, method=solver,
+                    first_step=settings.firstStep if settings.firstStep > 0 else None,
+                    max_step=settings.maxStep if settings.maxStep > 0 else float("inf"), **settings.tolerances(), **options)
+    if not sol.success:
+        raise RuntimeError("solve_ivp failed on the chain: {}".format(sol.message))
+    N = len(chain)
+    return ChainResult(chain, settings, t, sol.y[:N], sol.y[N:], {"nfev": int(sol.nfev), "njev": int(sol.njev)})
@@ -0,0 +1,161 @@
+from PyQt5.QtWidgets import (QWidget, QGroupBox, QGridLayout, QHBoxLayout, QLabel, QComboBox, QLineEdit,
+                             QPushButton, QCheckBox)
+from PyQt5.QtCore import QThreadPool, QRectF
+import pyqtgraph as pg
+from numpy import zeros, arange
+from chainMSD import CHAIN_SOLVERS, uniformChain, simulateChain
+from animateMSD import ChainAnimationWidget
+from playbackMSD import PlaybackClock
+from workersMSD import Worker
+
+#Masses the initial displacement and velocity from the Main tab are given to
+EXCITATIONS = ["last mass", "first mass", "all masses"]
+
+def solveChain(chain, x0, v0, solver, settings):
+    #Runs in a pool thread: the trajectories and the natural frequencies of every mode
+    return simulateChain(chain, x0, v0, solver, settings), chain.naturalFrequencies()
+
+
+class ChainWidget(QWidget):
+    #A chain of equal masses, springs and dampers built from the Main tab's m, k and b. The run is solved
+    #on a pool thread and shown as a space-time map of every mass's displacement, the natural frequencies
+    #of all modes and an animation of the whole chain. The evaluation time, point count and tolerances come
+    #from the ODE Options tab.
+    def __init__(self, currentParameters, solverSettings):
+        super().__init__()
+        self.currentParameters = currentParameters
+        self.solverSettings = solverSettings
+        self.chain = None #kept between runs so its modes are only decomposed once
+        self.animation = None
+        self.playbackClock = PlaybackClock()
+        self.generation = 0
+
+        self.createControlsGroupBox()
+        self.createGraphGroupBox()
+        self.animationGroupBox = QGroupBox(title="Animation")
+        self.animationLayout = QGridLayout()
+        self.animationGroupBox.setLayout(self.animationLayout)
+
+        layout = QGridLayout()
+        layout.addWidget(self.controlsGroupBox, 0, 0, 1, 2)
+        layout.addWidget(self.graphGroupBox, 1, 0)
+        layout.addWidget(self.animationGroupBox, 1, 1)
+        layout.setRowStretch(1, 1)
+        layout.setColumnStretch(0, 3)
+        layout.setColumnStretch(1, 2)
+        self.setLayout(layout)
+
+    def createControlsGroupBox(self):
+        self.controlsGroupBox = QGroupBox(title="Chain")
+
+        self.countInput = QLineEdit("10")
+        self.fixedEndCheckBox = QCheckBox("Fixed Right End")
+        self.fixedEndCheckBox.setToolTip("Tie the last mass to a right wall with one more spring and damper")
+        self.excitationInput = QComboBox()
+        self.excitationInput.addItems(EXCITATIONS)
+        self.solverInput = QComboBox()
+        self.solverInput.addItems(CHAIN_SOLVERS)
+        self.solverInput.setToolTip("modal: exact, by decomposing the chain into its modes (proportional damping)")
+        self.runButton = QPushButton("Run")
+        self.runButton.clicked.connect(self.startRun)
+        self.startButton = QPushButton("Start")
+        self.startButton.clicked.connect(self.startAnimation)
+        self.statusOutput = QLabel("")
+
+        layout = QHBoxLayout()
+        layout.addWidget(QLabel("Masses:"))
+        layout.addWidget(self.countInput)
+        layout.addWidget(self.fixedEndCheckBox)
+        layout.addWidget(QLabel("Initial Conditions On:"))
+        layout.addWidget(self.excitationInput)
+        layout.addWidget(QLabel("Solver:"))
+        layout.addWidget(self.solverInput)
+        layout.addWidget(self.statusOutput, 1)
+        layout.addWidget(self.runButton)
+        layout.addWidget(self.startButton)
+        self.controlsGroupBox.setLayout(layout)
+
+    def createGraphGroupBox(self):
+        self.graphGroupBox = QGroupBox(title="Graphs")
+
+        self.spaceTimeGraph = pg.PlotWidget()
+        self.spaceTimeGraph.setLabel('bottom', 'Time', units='s')
+        self.spaceTimeGraph.setLabel('left', 'Mass')
+        self.spaceTimeImage = pg.ImageItem()
+        self.spaceTimeGraph.addItem(self.spaceTimeImage)
+        self.colorBar = pg.ColorBarItem(colorMap=pg.colormap.get("CET-D1"), interactive=False, label="Displacement (m)")
+        self.colorBar.setImageItem(self.spaceTimeImage, insert_in=self.spaceTimeGraph.getPlotItem())
+        self.cursor = pg.InfiniteLine(pos=0, angle=90, movable=False, pen=pg.mkPen('y', width=1))
+        self.spaceTimeGraph.getPlotItem().addItem(self.cursor, ignoreBounds=True)
+
+        self.modeGraph = pg.PlotWidget()
+        self.modeGraph.showGrid(x=True, y=True)
+        self.modeGraph.setLabel('bottom', 'Mode')
+        self.modeGraph.setLabel('left', 'Natural Frequency', units='Hz')
+        self.modeLine = self.modeGraph.plot([], [], pen=None, symbol='o', symbolSize=4, symbolBrush='c', symbolPen=None)
+
+        layout = QGridLayout()
+        layout.addWidget(self.spaceTimeGraph, 0, 0)
+        layout.addWidget(self.modeGraph, 1, 0)
+        layout.setRowStretch(0, 2)
+        layout.setRowStretch(1, 1)
+        self.graphGroupBox.setLayout(layout)
+
+    def startRun(self):
+        try:
+            parameters = self.currentParameters()
+            settings = self.solverSettings()
+            count = max(1, int(float(self.countInput.text())))
+        except ValueError as error:
+            self.statusOutput.setText(str(error))
+            return
+        chain = uniformChain(count, parameters["m"], parameters["k"], parameters["b"], self.fixedEndCheckBox.isChecked())
+        if self.chain is not None and self.chain.key() == chain.key():
+            chain = self.chain
+        self.chain = chain
+
+        x0 = zeros(count)
+        v0 = zeros(count)
+        excited = {"last mass": slice(count - 1, count), "first mass": slice(0, 1), "all masses": slice(None)}
+        x0[excited[self.excitationInput.currentText()]] = parameters["x0"]
+        v0[excited[self.excitationInput.currentText()]] = parameters["v0"]
+
+        #A newer run makes the results of any earlier one stale
+        self.generation += 1
+        generation = self.generation
+        self.statusOutput.setText("solving {} masses...".format(count))
+        worker = Worker(solveChain, chain, x0, v0, self.solverInput.currentText(), settings)
+        worker.signals.result.connect(lambda output, generation=generation: self.showRun(generation, *output))
+        worker.signals.error.connect(self.statusOutput.setText)
+        QThreadPool.globalInstance().start(worker)
+
+    def showRun(self, generation, result, frequencies):
+        if generation != self.generation:
+            return
+        self.result = result
+        #Image rows are masses' displacements over time; x runs along time, y along the chain
+        peak = float(abs(result.x).max()) or 1.0
+        self.spaceTimeImage.setImage(result.x.T, autoLevels=False)
+        self.colorBar.setLevels((-peak, peak))
+        duration = result.t[-1] - result.t[0]
+        self.spaceTimeImage.setRect(QRectF(result.t[0], 0.5, duration, len(result)))
+        self.modeLine.setData(arange(1, frequencies.shape[0] + 1), frequencies)
+        stats = ", {} RHS evaluations".format(result.solverStats["nfev"]) if result.solverStats.get("nfev") else ""
+        self.statusOutput.setText("{} masses, modes {:.4g} - {:.4g} Hz{}".format(
+            len(result), frequencies[0], frequencies[-1], stats))
+        self.createAnimationWidget()
+
+    def createAnimationWidget(self):
+        if self.animation is not None:
+            self.animation.deleteMass()
+            self.animationLayout.removeWidget(self.animation)
+            self.animation.deleteLater()
+        self.playbackClock.seek(0)
+        self.animation = ChainAnimationWidget(self.result.chain, self.result.t, self.result.x, self.result.v,
+                                              clock=self.playbackClock)
+        self.animation.timeChanged.connect(self.cursor.setValue)
+        self.animationLayout.addWidget(self.animation, 0, 0)
+
+    def startAnimation(self):
+        if self.animation is not None:
+            self.animation.startAnimation()
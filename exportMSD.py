@@ -0,0 +1,253 @@
+#Offline export of the animation to a GIF or a PNG image sequence, rendered without Qt by a small NumPy
+#rasterizer. Frames are rendered and encoded in worker processes and written out in order as they
+#arrive, so only a handful of frames are ever in memory.
+#Usage: python exportMSD.py --m 1.25 --k 25 --b 0.1 --x0 1 --output run.gif [--fps 30] [--workers N]
+import argparse
+import os
+import struct
+import zlib
+from multiprocessing import Pool
+from numpy import zeros, full, uint8, arange, ceil, linspace, rint, hstack
+from solveMSD import SolverSettings, SOLVERS, IVP_METHODS, simulate
+from playbackMSD import (FrameTrack, ZERO_OFFSET, SCENE_SIZE, WALL_X, WALL_WIDTH, MASS_SIZE, MASS_Y,
+                         SPRING_Y, DAMPER_Y, SPRING_COILS, DAMPER_LEAD, DAMPER_LENGTH)
+
+#Palette indices used by the rasterizer and the colours written to the files
+BACKGROUND, BLACK, GRAY, RED = range(4)
+PALETTE = [(239, 239, 239), (0, 0, 0), (128, 128, 128), (255, 0, 0)]
+
+class FrameRenderer:
+    #Draws the animation scene as an array of palette indices, scene pixels scaled by `scale`
+    def __init__(self, scale=1.0):
+        self.scale = float(scale)
+        self.size = int(round(SCENE_SIZE * self.scale))
+        #Rows that change between frames: the spring, the damper and the mass
+        self.stripTop = max(0, int(min(MASS_Y, SPRING_Y - 14, DAMPER_Y - 14) * self.scale))
+        self.stripBottom = min(self.size, int(ceil(max(MASS_Y + MASS_SIZE, SPRING_Y + 14, DAMPER_Y + 14) * self.scale)) + 1)
+        self.background = self.createBackground()
+        self.massMask = self.createMassMask()
+
+    def s(self, value):
+        return int(rint(value * self.scale))
+
+    def drawLine(self, image, x0, y0, x1, y1, color, width=2):
+        #Scene coordinates; the segment is sampled once per pixel along its longer axis
+        x0, y0, x1, y1 = [value * self.scale for value in (x0, y0, x1, y1)]
+        samples = int(max(abs(x1 - x0), abs(y1 - y0))) + 2
+        xs = rint(linspace(x0, x1, samples)).astype(int)
+        ys = rint(linspace(y0, y1, samples)).astype(int)
+        thickness = max(1, int(rint(width * self.scale)))
+        for dx in range(thickness):
+            for dy in range(thickness):
+                image[(ys + dy).clip(0, self.size - 1), (xs + dx).clip(0, self.size - 1)] = color
+
+    def createBackground(self):
+        image = full((self.size, self.size), BACKGROUND, dtype=uint8)
+        image[:, self.s(WALL_X):self.s(WALL_X + WALL_WIDTH)] = BLACK
+        #Dashed x = 0 line, 20 px dashes every 30 px
+        for top in range(0, SCENE_SIZE, 30):
+            image[self.s(top):self.s(top + 20), self.s(ZERO_OFFSET)] = GRAY
+        left = WALL_X + WALL_WIDTH
+        self.drawLine(image, left, DAMPER_Y, left + DAMPER_LEAD, DAMPER_Y, GRAY)
+        self.drawLine(image, left + DAMPER_LEAD, DAMPER_Y - 12, left + DAMPER_LEAD + DAMPER_LENGTH, DAMPER_Y - 12, GRAY)
+        self.drawLine(image, left + DAMPER_LEAD, DAMPER_Y + 12, left + DAMPER_LEAD + DAMPER_LENGTH, DAMPER_Y + 12, GRAY)
+        self.drawLine(image, left + DAMPER_LEAD, DAMPER_Y - 12, left + DAMPER_LEAD, DAMPER_Y + 12, GRAY)
+        return image
+
+    def createMassMask(self):
+        #Square with rounded corners of radius 15 scene pixels
+        size = self.s(MASS_SIZE)
+        radius = 15 * self.scale
+        centre = arange(size) + 0.5
+        dx = (radius - centre).clip(min=0) + (centre - (size - radius)).clip(min=0)
+        return dx[None, :]**2 + dx[:, None]**2 <= radius**2
+
+    def render(self, position):
+        #position is the left edge of the mass in scene pixels, as stored in FrameTrack.positions
+        image = self.background.copy()
+        left = WALL_X + WALL_WIDTH
+        right = position
+
+        lead = 10
+        length = right - left - 2 * lead
+        points = [(left, SPRING_Y), (left + lead, SPRING_Y)]
+        points += [(left + lead + length * (i + 0.5) / (2 * SPRING_COILS), SPRING_Y + (12 if i % 2 else -12))
+                   for i in range(2 * SPRING_COILS)]
+        points += [(right - lead, SPRING_Y), (right, SPRING_Y)]
+        for (xa, ya), (xb, yb) in zip(points[:-1], points[1:]):
+            self.drawLine(image, xa, ya, xb, yb, GRAY)
+
+        pistonX = min(max(right - 40, left + DAMPER_LEAD + 4), left + DAMPER_LEAD + DAMPER_LENGTH - 4)
+        self.drawLine(image, pistonX, DAMPER_Y - 10, pistonX, DAMPER_Y + 10, GRAY)
+        self.drawLine(image, pistonX, DAMPER_Y, right, DAMPER_Y, GRAY)
+
+        top = self.s(MASS_Y)
+        leftEdge = self.s(position)
+        mask = self.massMask[:, max(0, -leftEdge):max(0, self.size - leftEdge)]
+        region = image[top:top + mask.shape[0], max(0, leftEdge):max(0, leftEdge) + mask.shape[1]]
+        region[mask[:region.shape[0], :region.shape[1]]] = RED
+        return image
+
+
+def lzwCompress(indices, minCodeSize=2):
+    #GIF flavoured LZW: variable code size from minCodeSize + 1 up to 12 bits, packed LSB first
+    clearCode = 1 << minCodeSize
+    endCode = clearCode + 1
+    codeSize = minCodeSize + 1
+    maxCode = endCode
+    table = {}
+    output = bytearray()
+    bitBuffer = 0
+    bitCount = 0
+
+    def emit(code, size):
+        nonlocal bitBuffer, bitCount
+        bitBuffer |= code << bitCount
+        bitCount += size
+        while bitCount >= 8:
+            output.append(bitBuffer & 0xFF)
+            bitBuffer >>= 8
+            bitCount -= 8
+
+    emit(clearCode, codeSize)
+    data = bytes(indices)
+    prefix = data[0]
+    for symbol in data[1:]:
+        key = (prefix << 8) | symbol
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        emit(prefix, codeSize)
+        maxCode += 1
+        table[key] = maxCode
+        if maxCode >= (1 << codeSize):
+            codeSize += 1
+        if maxCode == 4095:
+            emit(clearCode, codeSize)
+            table = {}
+            codeSize = minCodeSize + 1
+            maxCode = endCode
+        prefix = symbol
+    emit(prefix, codeSize)
+    emit(endCode, codeSize)
+    if bitCount:
+        output.append(bitBuffer & 0xFF)
+    return bytes(output)
+
+def gifSubBlocks(data):
+    return b"".join(bytes([len(data[i:i + 255])]) + data[i:i + 255] for i in range(0, len(data), 255)) + b"\x00"
+
+def gifFrame(image, top, delay):
+    #Graphic control extension (no disposal, so later frames only need to cover the rows that change),
+    #image descriptor and the compressed rows of `image`, placed at row `top`
+    height, width = image.shape
+    control = b"\x21\xF9\x04" + struct.pack("<BHBB", 0x04, delay, 0, 0)
+    descriptor = b"\x2C" + struct.pack("<HHHHB", 0, top, width, height, 0)
+    return control + descriptor + b"\x02" + gifSubBlocks(lzwCompress(image.tobytes()))
+
+def gifHeader(width, height):
+    palette = b"".join(bytes(colour) for colour in PALETTE)
+    screen = struct.pack("<HHBBB", width, height, 0xF1, BACKGROUND, 0) #global colour table of 4 entries
+    loop = b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00"
+    return b"GIF89a" + screen + palette + loop
+
+def pngBytes(image):
+    #8 bit palette PNG, every row with filter type 0
+    height, width = image.shape
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+    rows = hstack([zeros((height, 1), dtype=uint8), image]).tobytes()
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0))
+            + chunk(b"PLTE", b"".join(bytes(colour) for colour in PALETTE))
+            + chunk(b"IDAT", zlib.compress(rows, 6)) + chunk(b"IEND", b""))
+
+def frameDelays(frameCount, fps):
+    #GIF delays are in hundredths of a second; rounding the running total keeps the clip in time
+    edges = rint(arange(frameCount + 1) * 100 / fps).astype(int)
+    return edges[1:] - edges[:-1]
+
+
+#Worker process state, set once per process by _initRenderer
+_renderer = {}
+
+def _initRenderer(positions, scale, imageFormat, delays):
+    _renderer.update(renderer=FrameRenderer(scale), positions=positions, format=imageFormat, delays=delays)
+
+def _encodeFrame(index):
+    renderer = _renderer["renderer"]
+    image = renderer.render(_renderer["positions"][index])
+    if _renderer["format"] == "png":
+        return pngBytes(image)
+    delay = int(_renderer["delays"][index])
+    if index == 0:
+        return gifFrame(image, 0, delay)
+    return gifFrame(image[renderer.stripTop:renderer.stripBottom], renderer.stripTop, delay)
+
+
+def exportAnimation(t, x, path, v=None, fps=30, speed=1.0, scale=0.5, workers=None, progress=None):
+    #Renders the trajectory x(t) and writes it to `path`: a .gif file, or otherwise a directory that
+    #receives frame_00000.png, frame_00001.png ... Returns the number of frames written.
+    track = FrameTrack(t, x, v, fps=fps / speed)
+    frameCount = len(track)
+    imageFormat = "gif" if path.lower().endswith(".gif") else "png"
+    initArgs = (track.positions, scale, imageFormat, frameDelays(frameCount, fps))
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    if workers <= 1:
+        _initRenderer(*initArgs)
+        frames = map(_encodeFrame, range(frameCount))
+        pool = None
+    else:
+        pool = Pool(workers, initializer=_initRenderer, initargs=initArgs)
+        frames = pool.imap(_encodeFrame, range(frameCount), chunksize=4)
+
+    try:
+        if imageFormat == "gif":
+            size = FrameRenderer(scale).size
+            with open(path, "wb") as file:
+                file.write(gifHeader(size, size))
+                for index, frame in enumerate(frames):
+                    file.write(frame)
+                    if progress is not None:
+                        progress(index + 1, frameCount)
+                file.write(b"\x3B")
+        else:
+            os.makedirs(path, exist_ok=True)
+            for index, frame in enumerate(frames):
+                with open(os.path.join(path, "frame_{:05d}.png".format(index)), "wb") as file:
+                    file.write(frame)
+                if progress is not None:
+                    progress(index + 1, frameCount)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return frameCount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the mass-spring-damper animation to a GIF or PNG frames")
+    parser.add_argument("--m", type=float, default=1.25, help="mass (kg)")
+    parser.add_argument("--k", type=float, default=25, help="spring constant (N/m)")
+    parser.add_argument("--b", type=float, default=0.1, help="damping")
+    parser.add_argument("--x0", type=float, default=1.0, help="initial position (m)")
+    parser.add_argument("--v0", type=float, default=0.0, help="initial velocity (m/s)")
+    parser.add_argument("--solver", choices=SOLVERS, default="analytic")
+    parser.add_argument("--method", choices=IVP_METHODS, default="RK45", help="solve_ivp method")
+    parser.add_argument("--eval-time", type=float, default=10, help="simulated seconds")
+    parser.add_argument("--output", required=True, help="a .gif file, or a directory for PNG frames")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed")
+    parser.add_argument("--scale", type=float, default=0.5, help="output size relative to the 600 px scene")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: all cores)")
+    args = parser.parse_args()
+
+    settings = SolverSettings(solver=args.solver, method=args.method, evalTime=args.eval_time)
+    result = simulate(args.m, args.k, args.b, args.x0, args.v0, settings)
+    frames = exportAnimation(result.t, result.x, args.output, v=result.v, fps=args.fps, speed=args.speed,
+                             scale=args.scale, workers=args.workers)
+    print("Wrote {} frames to {}".format(frames, args.output))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+#Nonlinear force laws of the spring and the damper, and dry (Coulomb) friction between the mass and the
+#ground: m*x'' = F(t) - spring(x) - damper(v) - friction(v) with
+#  spring: "linear" k*x, or the cubic (Duffing) k*x*(1 + epsilon*x^2), "hardening" for epsilon > 0 and
+#          "softening" for epsilon < 0, where nonlinearity = |epsilon| (1/m^2)
+#  damper: "linear" b*v, or "quadratic" drag b*v*|v| (b is then in N s^2/m^2)
+#  friction: "none"; "smooth" frictionForce*tanh(v / smoothing), a regularized Coulomb law the solvers can
+#          step through; or "stick-slip", the exact law: frictionForce*sign(v) while sliding, and a mass at
+#          rest stays stuck as long as the other forces stay within frictionForce (solveMSD.integrateStickSlip)
+#A law only knows its shape; m, k and b still come from the System Variables. The right hand side and
+#its Jacobian are generated from source with only the terms the law has, so a step pays for no unused
+#terms and no branches, and are compiled with numba when asked for and installed. Headless like
+#solveMSD, only needs numpy (and numba for the compiled kernels).
+import math
+from numpy import asarray, empty_like, abs as npabs, tanh, sign, where
+from solveMSD import NUMBA_AVAILABLE
+
+SPRING_LAWS = ["linear", "hardening", "softening"]
+DAMPER_LAWS = ["linear", "quadratic"]
+FRICTION_LAWS = ["none", "smooth", "stick-slip"]
+DEFAULT_NONLINEARITY = 1.0
+DEFAULT_FRICTION_FORCE = 1.0
+#Velocity (m/s) over which smooth friction turns from -frictionForce to +frictionForce. Small values are
+#close to the exact law but make the system stiff near v = 0.
+DEFAULT_SMOOTHING = 1e-3
+
+#Functions the generated source calls: the builtin abs and math.tanh for single states, their numpy
+#versions for stacked batch states. numba compiles both of the scalar ones.
+SCALAR_NAMESPACE = {"absolute": abs, "tanh": math.tanh}
+ARRAY_NAMESPACE = {"absolute": npabs, "tanh": tanh}
+
+#Kernels compiled by numba, one per combination of terms; built on first use. The generated functions have
+#no file, so numba cannot cache them on disk.
+_compiledKernels = {}
+
+def _generate(name, arguments, body, namespace):
+    #Compiles `body` as the function `name` and returns it; the coefficients are bound through namespace
+    source = "def {}({}):\n{}".format(name, arguments, "".join("    {}\n".format(line) for line in body))
+    code = compile(source, "<forceLawMSD {}>".format(name), "exec")
+    exec(code, namespace)
+    return namespace[name]
+
+
+class ForceLaw:
+    #One of SPRING_LAWS, DAMPER_LAWS and FRICTION_LAWS each, see the top of the module. The default is the
+    #linear system, which simulate() and batchSolve() keep on their linear fast paths.
+    def __init__(self, spring="linear", nonlinearity=DEFAULT_NONLINEARITY, damper="linear", friction="none",
+                 frictionForce=DEFAULT_FRICTION_FORCE, smoothing=DEFAULT_SMOOTHING):
+        if spring not in SPRING_LAWS:
+            raise ValueError("Unknown spring law '{}', expected one of {}".format(spring, SPRING_LAWS))
+        if damper not in DAMPER_LAWS:
+            raise ValueError("Unknown damper law '{}', expected one of {}".format(damper, DAMPER_LAWS))
+        if friction not in FRICTION_LAWS:
+            raise ValueError("Unknown friction law '{}', expected one of {}".format(friction, FRICTION_LAWS))
+        if float(nonlinearity) < 0 or float(frictionForce) < 0:
+            raise ValueError("The nonlinearity and the friction force must not be negative")
+        if float(smoothing) <= 0:
+            raise ValueError("The smoothing velocity must be positive")
+        self.spring = spring
+        self.nonlinearity = float(nonlinearity)
+        self.damper = damper
+        self.friction = friction
+        self.frictionForce = float(frictionForce)
+        self.smoothing = float(smoothing)
+
+    @property
+    def cubic(self):
+        #epsilon of the spring law, signed
+        if self.spring == "linear":
+            return 0.0
+        return self.nonlinearity if self.spring == "hardening" else -self.nonlinearity
+
+    def terms(self):
+        #The laws that actually add something; zero coefficients drop their term
+        spring = "cubic" if self.cubic != 0 else "linear"
+        friction = self.friction if self.frictionForce > 0 else "none"
+        return spring, self.damper, friction
+
+    def isLinear(self):
+        return self.terms() == ("linear", "linear", "none")
+
+    def isStickSlip(self):
+        return self.terms()[2] == "stick-slip"
+
+    #Generated source
+    def forceSource(self):
+        #Spring, damper and friction force in terms of x, v and the coefficients. Sliding friction opposes
+        #the direction of motion of the current stick-slip phase (+1 or -1), which is constant in a phase.
+        spring, damper, friction = self.terms()
+        terms = ["k*x*(1.0 + cubic*x*x)" if spring == "cubic" else "k*x",
+                 "b*v*absolute(v)" if damper == "quadratic" else "b*v"]
+        if friction == "smooth":
+            terms.append("friction*tanh(v/smoothing)")
+        elif friction == "stick-slip":
+            terms.append("direction*friction")
+        return " + ".join(terms)
+
+    def jacobianSource(self):
+        #Derivatives of the acceleration by x and by v
+        spring, damper, friction = self.terms()
+        dx = "-k*(1.0 + 3.0*cubic*x*x)/m" if spring == "cubic" else "-k/m"
+        dv = ["2.0*b*absolute(v)" if damper == "quadratic" else "b"]
+        if friction == "smooth":
+            dv.append("friction/smoothing*(1.0 - tanh(v/smoothing)**2)")
+        return dx, "-({})/m".format(" + ".join(dv))
+
+    def coefficients(self, m, k, b, direction=0.0):
+        return {"m": m, "k": k, "b": b, "cubic": self.cubic, "friction": self.frictionForce,
+                "smoothing": self.smoothing, "direction": float(direction)}
+
+    def derivative(self, m, k, b, compiled=False, forcing=None, direction=0.0):
+        #Right hand side dS/dt = (v, a) for odeint and solve_ivp, like solveMSD.makeDerivative. direction
+        #is the sliding direction of a stick-slip phase. compiled uses a numba kernel when numba is
+        #installed; an active forcing is then added around the kernel.
+        force = forcing.scalar if forcing is not None and forcing.isActive() else None
+        if compiled and NUMBA_AVAILABLE:
+            kernel = self.compiledKernel()
+            coefficients = tuple(float(value) for value in self.coefficients(m, k, b, direction).values())
+            if force is None:
+                def dSdx(t, S):
+                    return kernel(S, *coefficients)
+            else:
+                def dSdx(t, S):
+                    dS = kernel(S, *coefficients)
+                    dS[1] += force(t) / m
+                    return dS
+            return dSdx
+        namespace = dict(SCALAR_NAMESPACE, force=force, **self.coefficients(m, k, b, direction))
+        acceleration = "(force(t) - ({}))/m" if force is not None else "-({})/m"
+        return _generate("dSdx", "t, S", ["x, v = S",
+                                          "return [v, {}]".format(acceleration.format(self.forceSource()))], namespace)
+
+    def compiledKernel(self):
+        #numba kernel(S, m, k, b, cubic, friction, smoothing, direction) of the free right hand side
+        key = self.terms()
+        if key not in _compiledKernels:
+            from numba import njit
+            namespace = dict(SCALAR_NAMESPACE, empty_like=empty_like)
+            kernel = _generate("kernel", "S, " + ", ".join(self.coefficients(0, 0, 0)),
+                               ["x = S[0]", "v = S[1]", "dS = empty_like(S)", "dS[0] = v",
+                                "dS[1] = -({})/m".format(self.forceSource()), "return dS"], namespace)
+            _compiledKernels[key] = njit(kernel)
+        return _compiledKernels[key]
+
+    def jacobian(self, m, k, b):
+        #Jacobian callable for odeint's Dfun and the implicit solve_ivp methods
+        dx, dv = self.jacobianSource()
+        namespace = dict(SCALAR_NAMESPACE, **self.coefficients(m, k, b))
+        return _generate("jacobian", "t, S", ["x, v = S", "return [[0.0, 1.0], [{}, {}]]".format(dx, dv)], namespace)
+
+    def stackedFunctions(self, m, k, b):
+        #(acceleration(x, v), jacobian(x, v)) on stacked arrays of states, for batches; m, k and b may be
+        #arrays of the same length. The Jacobian is the pair of diagonals da/dx and da/dv.
+        if self.isStickSlip():
+            raise ValueError("Stick-slip friction is event based and solved one run at a time, "
+                             "use smooth friction for batches and sweeps")
+        dx, dv = self.jacobianSource()
+        namespace = dict(ARRAY_NAMESPACE, **self.coefficients(m, k, b))
+        acceleration = _generate("acceleration", "x, v", ["return -({})/m".format(self.forceSource())], namespace)
+        #A constant derivative is broadcast so both diagonals have one entry per row
+        jacobian = _generate("jacobian", "x, v", ["return 0.0*x + {}, 0.0*v + {}".format(dx, dv)], namespace)
+        return acceleration, jacobian
+
+    #Vectorized evaluation of the output
+    def springForce(self, k, x):
+        return k * x * (1 + self.cubic * x * x)
+
+    def acceleration(self, m, k, b, x, v, force=0.0):
+        #Acceleration on arrays of states. A stick-slip mass at rest is held by friction up to
+        #frictionForce, so it only accelerates by what the other forces exceed that by.
+        x, v = asarray(x, dtype=float), asarray(v, dtype=float)
+        damper = b * v * npabs(v) if self.damper == "quadratic" else b * v
+        net = force - self.springForce(k, x) - damper
+        if self.friction == "smooth":
+            net = net - self.frictionForce * tanh(v / self.smoothing)
+        elif self.friction == "stick-slip":
+            atRest = net - sign(net) * npabs(net).clip(max=self.frictionForce)
+            net = where(v != 0, net - self.frictionForce * sign(v), atRest)
+        return net / m
+
+    def potentialEnergy(self, k, x):
+        #Energy stored in the spring, the integral of springForce
+        return .5 * k * x**2 + .25 * k * self.cubic * x**4
+
+    def linearization(self, k, b):
+        #Stiffness and damping of the law linearized at rest, for choosing the solver (solveMSD.autoSettings):
+        #quadratic drag has no slope there, smooth friction a steep one
+        damping = b if self.damper == "linear" else 0.0
+        if self.terms()[2] == "smooth":
+            damping = damping + self.frictionForce / self.smoothing
+        return k, damping
+
+    def key(self):
+        #Hashable identity for the result cache
+        return (self.spring, self.cubic, self.damper, self.friction, self.frictionForce, self.smoothing)
+
+    def asDict(self):
+        return {"spring": self.spring, "nonlinearity": self.nonlinearity, "damper": self.damper,
+                "friction": self.friction, "frictionForce": self.frictionForce, "smoothing": self.smoothing}
+
+    def __repr__(self):
+        return "ForceLaw({})".format(", ".join("{}={!r}".format(key, value) for key, value in self.asDict().items()))
+
+
+LINEAR = ForceLaw()
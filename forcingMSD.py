@@ -0,0 +1,162 @@
+#External forcing F(t) acting on the mass, m*x'' + b*x' + k*x = F(t). A Forcing is evaluated two ways:
+#called with an array of times (vectorized, used for the output grid and the linear convolution) and
+#through scalar(t), the per-step lookup the numerical solvers call from the right hand side. Sampled
+#signals are tabulated once on an evenly spaced table so that lookup is an index computation rather
+#than a search. Impulses are ideal (Dirac) kicks of the velocity and are never evaluated as a force.
+#Headless like solveMSD, only needs numpy.
+import math
+import os
+from numpy import asarray, zeros, where, sin, pi, sqrt, inf, interp, linspace, diff, load, loadtxt, ceil, isfinite
+
+FORCING_KINDS = ["none", "step", "impulse", "sinusoid", "chirp", "sampled"]
+#Sampled signals are tabulated with their smallest sample spacing, but never on more points than this
+MAX_TABLE_SIZE = 1000000
+
+class Forcing:
+    #kind is one of FORCING_KINDS. Every signal is 0 before `start` (s).
+    #  step: amplitude (N) from start on
+    #  impulse: a kick of amplitude (N s) at start, the velocity jumps by amplitude / m
+    #  sinusoid: amplitude * sin(2 pi frequency (t - start)), frequency in Hz
+    #  chirp: a sine sweeping linearly from frequency to endFrequency over duration (s), 0 afterwards
+    #  sampled: amplitude * the samples (times, values), linear between them, shifted by start, 0 outside
+    def __init__(self, kind="none", amplitude=1.0, start=0.0, frequency=1.0, endFrequency=10.0, duration=10.0,
+                 times=None, values=None, source=""):
+        if kind not in FORCING_KINDS:
+            raise ValueError("Unknown forcing '{}', expected one of {}".format(kind, FORCING_KINDS))
+        self.kind = kind
+        self.amplitude = float(amplitude)
+        self.start = float(start)
+        self.frequency = float(frequency)
+        self.endFrequency = float(endFrequency)
+        self.duration = float(duration)
+        self.source = source #file the samples were read from, for display and saving
+        if kind == "sampled":
+            if times is None or values is None:
+                raise ValueError("Sampled forcing needs times and values")
+            self._tabulate(asarray(times, dtype=float), asarray(values, dtype=float))
+
+    def _tabulate(self, times, values):
+        if times.ndim != 1 or times.shape != values.shape or times.shape[0] < 2:
+            raise ValueError("Sampled forcing needs two columns of at least two samples")
+        if (diff(times) <= 0).any() or not isfinite(values).all():
+            raise ValueError("Sampled forcing needs increasing times and finite values")
+        self.times = times
+        self.values = values
+        spacing = max(diff(times).min(), (times[-1] - times[0]) / (MAX_TABLE_SIZE - 1))
+        count = int(ceil((times[-1] - times[0]) / spacing)) + 1
+        table = linspace(times[0], times[-1], count)
+        self.tableStart = times[0] + self.start
+        self.tableSpacing = table[1] - table[0]
+        self.tableValues = self.amplitude * interp(table, times, values)
+        #Python lists index faster than arrays for the one value scalar() needs per call
+        self._values = self.tableValues.tolist()
+        self._steps = diff(self.tableValues).tolist() + [0.0]
+        self._inverseSpacing = 1 / self.tableSpacing
+        self._last = count - 1
+
+    def isActive(self):
+        return self.kind != "none" and self.amplitude != 0
+
+    def scalar(self, t):
+        #F(t) for one time, called once per right hand side evaluation
+        kind = self.kind
+        if kind == "sampled":
+            position = (t - self.tableStart) * self._inverseSpacing
+            if position < 0 or position > self._last:
+                return 0.0
+            index = int(position)
+            return self._values[index] + self._steps[index] * (position - index)
+        tau = t - self.start
+        if tau < 0 or kind == "impulse" or kind == "none":
+            return 0.0
+        if kind == "step":
+            return self.amplitude
+        if kind == "sinusoid":
+            return self.amplitude * math.sin(2 * math.pi * self.frequency * tau)
+        if tau > self.duration:
+            return 0.0
+        return self.amplitude * math.sin(self._chirpPhase(tau))
+
+    def __call__(self, t):
+        #F at an array of times. Impulses have no finite value and give 0, see kicks().
+        t = asarray(t, dtype=float)
+        tau = t - self.start
+        if self.kind == "sampled":
+            inside = (t >= self.tableStart) & (t <= self.tableStart + self._last * self.tableSpacing)
+            tableTimes = self.tableStart + self.tableSpacing * linspace(0, self._last, self._last + 1)
+            return where(inside, interp(t, tableTimes, self.tableValues), 0.0)
+        if self.kind in ("none", "impulse"):
+            return zeros(t.shape)
+        if self.kind == "step":
+            return where(tau >= 0, self.amplitude, 0.0)
+        if self.kind == "sinusoid":
+            return where(tau >= 0, self.amplitude * sin(2 * pi * self.frequency * tau), 0.0)
+        return where((tau >= 0) & (tau <= self.duration), self.amplitude * sin(self._chirpPhase(tau)), 0.0)
+
+    def _chirpPhase(self, tau):
+        return 2 * pi * (self.frequency * tau + (self.endFrequency - self.frequency) * tau**2 / (2 * self.duration))
+
+    def kicks(self):
+        #(time, impulse in N s) of every ideal impulse
+        return [(self.start, self.amplitude)] if self.kind == "impulse" and self.amplitude != 0 else []
+
+    def breakpoints(self):
+        #Times where F or its derivative jumps; the numerical solvers integrate up to each of them separately
+        if self.kind == "chirp":
+            return [self.start, self.start + self.duration]
+        if self.kind == "sampled":
+            return [self.tableStart, self.tableStart + self._last * self.tableSpacing]
+        if self.kind == "none":
+            return []
+        return [self.start]
+
+    def spacing(self, tolerance):
+        #Largest output spacing that follows the input to within `tolerance` (relative) with straight lines
+        if self.kind == "sinusoid":
+            return sqrt(8 * tolerance) / (2 * pi * self.frequency) if self.frequency > 0 else inf
+        if self.kind == "chirp":
+            highest = max(abs(self.frequency), abs(self.endFrequency))
+            return sqrt(8 * tolerance) / (2 * pi * highest) if highest > 0 else inf
+        if self.kind == "sampled":
+            return self.tableSpacing
+        return inf
+
+    def key(self):
+        #Hashable identity for the result cache
+        if self.kind == "sampled":
+            return (self.kind, self.amplitude, self.start, self.times.tobytes(), self.values.tobytes())
+        return (self.kind, self.amplitude, self.start, self.frequency, self.endFrequency, self.duration)
+
+    def asDict(self):
+        #JSON friendly description; sampled signals are described by their source file
+        return {"kind": self.kind, "amplitude": self.amplitude, "start": self.start, "frequency": self.frequency,
+                "endFrequency": self.endFrequency, "duration": self.duration, "source": self.source}
+
+    def __repr__(self):
+        return "Forcing({})".format(", ".join("{}={!r}".format(key, value) for key, value in self.asDict().items()))
+
+
+def loadForcing(path, start=0.0, scale=1.0):
+    #Sampled Forcing from a file: .csv/.txt with columns time, force (a header row is skipped), .npy
+    #holding an (n, 2) array, or .npz with arrays "t" and "F"
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npz":
+        with load(path) as data:
+            times, values = data["t"], data["F"]
+    elif extension == ".npy":
+        data = load(path)
+        times, values = data[:, 0], data[:, 1]
+    else:
+        with open(path) as file:
+            firstLine = file.readline()
+        delimiter = "," if "," in firstLine else None
+        try:
+            [float(value) for value in firstLine.replace(",", " ").split()]
+            skip = 0
+        except ValueError:
+            skip = 1
+        data = loadtxt(path, delimiter=delimiter, skiprows=skip, ndmin=2)
+        times, values = data[:, 0], data[:, 1]
+    return Forcing("sampled", amplitude=scale, start=start, times=times, values=values, source=path)
+
+NO_FORCING = Forcing()
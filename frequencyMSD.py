@@ -0,0 +1,98 @@
+#Frequency response of the system from the transfer function H(s) = X(s) / F(s) = 1 / (m s^2 + b s + k),
+#evaluated at s = j 2 pi f. Everything is closed form and vectorized: parameter sets run along the first
+#axis and frequencies along the last, so Bode curves and resonance maps need no time domain simulation.
+#Frequencies are in Hz like systemAttributes. Headless like solveMSD, only needs numpy.
+from numpy import (asarray, broadcast_arrays, empty, logspace, log10, sqrt, pi, where, nan,
+                   arctan2, degrees, errstate, isfinite)
+
+DEFAULT_FREQUENCY_COUNT = 2000
+#Decades shown below the lowest and above the highest natural frequency
+DEFAULT_DECADES = 2
+#Parameter rows evaluated together, keeps the complex temporaries small
+FREQUENCY_CHUNK_SIZE = 256
+
+def transferFunction(m, k, b, frequencies):
+    #H(j 2 pi f) in m/N. m, k and b broadcast against each other; the result has their shape plus a last
+    #axis of len(frequencies).
+    m, k, b = [asarray(value, dtype=float)[..., None] for value in (m, k, b)]
+    omega = 2 * pi * asarray(frequencies, dtype=float)
+    with errstate(divide="ignore", invalid="ignore"):
+        return 1 / (k - m * omega**2 + 1j * b * omega)
+
+def bode(m, k, b, frequencies):
+    #Magnitude (dB re 1 m/N) and phase (degrees, 0 to -180) of H, shapes as in transferFunction. Works on
+    #the real and imaginary parts of the denominator, which is cheaper than complex abs and angle.
+    m, k, b = [asarray(value, dtype=float)[..., None] for value in (m, k, b)]
+    omega = 2 * pi * asarray(frequencies, dtype=float)
+    real = k - m * omega**2
+    imaginary = b * omega
+    with errstate(divide="ignore"):
+        magnitude = -10 * log10(real**2 + imaginary**2)
+    #The imaginary part is never negative, so the phase is already unwrapped
+    return magnitude, -degrees(arctan2(imaginary, real))
+
+def resonance(m, k, b):
+    #Closed form resonance of every parameter set: the frequency of the magnitude peak (Hz), the peak
+    #gain (m/N), the amplification of the peak over the static gain 1/k and the -3 dB bandwidth (Hz),
+    #where |H| falls to 1/sqrt(2) of the static gain. Without a peak (b^2 >= 2 m k) the resonance frequency
+    #is 0 and the peak is the static gain; without a spring the static gain, amplification and bandwidth
+    #are undefined (nan).
+    m, k, b = [asarray(value, dtype=float) for value in (m, k, b)]
+    with errstate(divide="ignore", invalid="ignore"):
+        #d|m s^2 + b s + k|^2 / d omega^2 = 0 at omega^2 = k/m - b^2 / (2 m^2)
+        omegaSquared = (k / m - b**2 / (2 * m**2)).clip(min=0)
+        peakGain = 1 / sqrt((k - m * omegaSquared)**2 + b**2 * omegaSquared)
+        amplification = where(k > 0, peakGain * k, nan)
+        #|H|^2 = 1 / (2 k^2) is a quadratic in omega^2 with one positive root
+        linear = 2 * m * k - b**2
+        bandwidthSquared = (linear + sqrt(linear**2 + 4 * m**2 * k**2)) / (2 * m**2)
+        bandwidth = where(k > 0, sqrt(bandwidthSquared) / (2 * pi), nan)
+    return sqrt(omegaSquared) / (2 * pi), peakGain, amplification, bandwidth
+
+def frequencyGrid(m, k, b, count=DEFAULT_FREQUENCY_COUNT, decades=DEFAULT_DECADES):
+    #Log spaced frequencies (Hz) shared by all the parameter sets, `decades` below the lowest and above the
+    #highest characteristic frequency. That is the natural frequency, or b / (2 pi m) without a spring.
+    m, k, b = [asarray(value, dtype=float) for value in (m, k, b)]
+    with errstate(divide="ignore", invalid="ignore"):
+        corner = where(k > 0, sqrt(k / m), b / m) / (2 * pi)
+    corner = corner[isfinite(corner) & (corner > 0)]
+    low, high = (corner.min(), corner.max()) if corner.size else (1.0, 1.0)
+    return logspace(log10(low) - decades, log10(high) + decades, count)
+
+
+class FrequencyResponse:
+    #Bode data of N parameter sets on shared frequencies: magnitude (dB) and phase (degrees) as (N, F)
+    #blocks, and the resonance attributes as arrays of length N
+    def __init__(self, m, k, b, frequencies, magnitude, phase):
+        self.m, self.k, self.b = m, k, b
+        self.frequencies = frequencies
+        self.magnitude = magnitude
+        self.phase = phase
+        self.resonanceFrequency, self.peakGain, self.amplification, self.bandwidth = resonance(m, k, b)
+
+    def __len__(self):
+        return self.magnitude.shape[0]
+
+
+def frequencyResponse(m, k, b, frequencies=None, count=DEFAULT_FREQUENCY_COUNT):
+    #Bode data of every parameter set (inputs are broadcast and flattened to N rows), on `frequencies`
+    #or a frequencyGrid of `count` points. Rows are evaluated in chunks into preallocated blocks.
+    m, k, b = [value.ravel() for value in broadcast_arrays(*[asarray(value, dtype=float) for value in (m, k, b)])]
+    frequencies = frequencyGrid(m, k, b, count) if frequencies is None else asarray(frequencies, dtype=float)
+    magnitude = empty((m.shape[0], frequencies.shape[0]))
+    phase = empty((m.shape[0], frequencies.shape[0]))
+    for start in range(0, m.shape[0], FREQUENCY_CHUNK_SIZE):
+        rows = slice(start, start + FREQUENCY_CHUNK_SIZE)
+        magnitude[rows], phase[rows] = bode(m[rows], k[rows], b[rows], frequencies)
+    return FrequencyResponse(m, k, b, frequencies, magnitude, phase)
+
+
+def toDecibels(gain):
+    with errstate(divide="ignore"):
+        return 20 * log10(gain)
+
+#Resonance attributes for maps over parameter grids, each maps (m, k, b) arrays to an array
+RESPONSE_METRICS = {"Resonance Frequency (Hz)": lambda m, k, b: resonance(m, k, b)[0],
+                    "Resonance Peak (dB)": lambda m, k, b: toDecibels(resonance(m, k, b)[1]),
+                    "Peak Amplification (dB)": lambda m, k, b: toDecibels(resonance(m, k, b)[2]),
+                    "Bandwidth (Hz)": lambda m, k, b: resonance(m, k, b)[3]}
@@ -0,0 +1,222 @@
+from PyQt5.QtWidgets import (QWidget, QGroupBox, QGridLayout, QHBoxLayout, QLabel, QComboBox,
+                             QLineEdit, QPushButton, QProgressBar, QMessageBox)
+from PyQt5.QtCore import QThreadPool, QRectF
+import pyqtgraph as pg
+from numpy import linspace, full, nan, nanmin, nanmax, isfinite, meshgrid
+from batchMSD import batchSolve, METRICS
+from sweepMSD import batchMethod
+from workersMSD import Worker
+
+#Sweepable parameters with the ranges of the sliders on the Main tab
+PARAMETERS = {"Mass (kg)": ("m", 0.1, 10),
+              "Spring Constant (N/m)": ("k", 0.1, 100),
+              "Damping Ratio, b": ("b", 0, 1),
+              "Initial x Position (m)": ("x0", 0.1, 2),
+              "Starting Velocity (m/s)": ("v0", 0, 10)}
+#Cells solved per worker; small enough that the map fills in visibly, large enough to stay vectorized
+CELLS_PER_CHUNK = 256
+
+def solveCells(parameters, settings, metric, forceLaw=None):
+    #Runs in a pool thread: solves one chunk of cells and reduces each trajectory to the chosen metric
+    batch = batchSolve(parameters["m"], parameters["k"], parameters["b"], parameters["x0"], parameters["v0"],
+                       method=batchMethod(settings), settings=settings, forceLaw=forceLaw)
+    return METRICS[metric](batch)
+
+
+class MapAxesMixin:
+    #Axis inputs and image placement of a map over two parameters, shared by the sweep heat map and the
+    #resonance map (bodeMSD). mapParameters are the parameters the axes offer; the widget keeps the inputs
+    #of its axes in xAxisInputs and yAxisInputs.
+    mapParameters = PARAMETERS
+
+    def createAxisInputs(self, defaultParameter, steps):
+        parameterInput = QComboBox()
+        parameterInput.addItems(list(self.mapParameters))
+        minInput = QLineEdit()
+        maxInput = QLineEdit()
+        stepsInput = QLineEdit()
+        stepsInput.setText(str(steps))
+
+        def resetRange():
+            _, low, high = self.mapParameters[parameterInput.currentText()]
+            minInput.setText(str(low))
+            maxInput.setText(str(high))
+
+        parameterInput.currentIndexChanged.connect(resetRange)
+        parameterInput.setCurrentText(defaultParameter)
+        resetRange()
+        return parameterInput, minInput, maxInput, stepsInput
+
+    def addAxisInputs(self, layout):
+        #One row per axis in the first two rows of a grid layout, 8 columns wide
+        for row, (label, inputs) in enumerate([("x Axis:", self.xAxisInputs), ("y Axis:", self.yAxisInputs)]):
+            parameterInput, minInput, maxInput, stepsInput = inputs
+            layout.addWidget(QLabel(label), row, 0)
+            layout.addWidget(parameterInput, row, 1)
+            layout.addWidget(QLabel("From:"), row, 2)
+            layout.addWidget(minInput, row, 3)
+            layout.addWidget(QLabel("To:"), row, 4)
+            layout.addWidget(maxInput, row, 5)
+            layout.addWidget(QLabel("Steps:"), row, 6)
+            layout.addWidget(stepsInput, row, 7)
+
+    def axisValues(self, inputs):
+        parameterInput, minInput, maxInput, stepsInput = inputs
+        key = self.mapParameters[parameterInput.currentText()][0]
+        steps = max(2, int(float(stepsInput.text())))
+        return key, linspace(float(minInput.text()), float(maxInput.text()), steps)
+
+    def placeImage(self, image, xValues, yValues):
+        #Pixel (i, j) of the image is centred on xValues[i], yValues[j]
+        width = xValues[-1] - xValues[0]
+        height = yValues[-1] - yValues[0]
+        image.setRect(QRectF(xValues[0] - width / (2 * (len(xValues) - 1)),
+                             yValues[0] - height / (2 * (len(yValues) - 1)),
+                             width * len(xValues) / (len(xValues) - 1),
+                             height * len(yValues) / (len(yValues) - 1)))
+
+    def showValues(self, image, colorBar, values):
+        #The colour levels span the finite values, nan cells are left blank
+        finite = values[isfinite(values)]
+        if finite.size:
+            low, high = nanmin(finite), nanmax(finite)
+            colorBar.setLevels((low, high if high > low else low + 1))
+        image.setImage(values, autoLevels=False)
+
+
+class SweepWidget(MapAxesMixin, QWidget):
+    #Sweeps two parameters over a grid and shows one metric per cell as a heat map. The remaining
+    #parameters, the force law (currentForceLaw, optional) and the solver settings are taken from the Main
+    #and ODE Options tabs when Run is pressed.
+    def __init__(self, currentParameters, solverSettings, currentForceLaw=None):
+        super().__init__()
+        self.currentParameters = currentParameters
+        self.solverSettings = solverSettings
+        self.currentForceLaw = currentForceLaw
+        self.threadPool = QThreadPool.globalInstance()
+        self.workers = []
+        self.generation = 0
+
+        self.createControlsGroupBox()
+        self.createHeatMapGroupBox()
+
+        layout = QGridLayout()
+        layout.addWidget(self.controlsGroupBox, 0, 0)
+        layout.addWidget(self.heatMapGroupBox, 1, 0)
+        layout.setRowStretch(1, 1)
+        self.setLayout(layout)
+
+    def createControlsGroupBox(self):
+        self.controlsGroupBox = QGroupBox(title="Sweep")
+        layout = QGridLayout()
+
+        self.xAxisInputs = self.createAxisInputs("Mass (kg)", 50)
+        self.yAxisInputs = self.createAxisInputs("Damping Ratio, b", 50)
+        self.addAxisInputs(layout)
+
+        self.metricInput = QComboBox()
+        self.metricInput.addItems(list(METRICS))
+        self.runButton = QPushButton("Run")
+        self.runButton.clicked.connect(self.startSweep)
+        self.cancelButton = QPushButton("Cancel")
+        self.cancelButton.clicked.connect(self.cancelSweep)
+        self.cancelButton.setEnabled(False)
+        self.progressBar = QProgressBar()
+
+        bottomLayout = QHBoxLayout()
+        bottomLayout.addWidget(QLabel("Metric:"))
+        bottomLayout.addWidget(self.metricInput)
+        bottomLayout.addWidget(self.progressBar, 1)
+        bottomLayout.addWidget(self.runButton)
+        bottomLayout.addWidget(self.cancelButton)
+        layout.addLayout(bottomLayout, 2, 0, 1, 8)
+
+        self.controlsGroupBox.setLayout(layout)
+
+    def createHeatMapGroupBox(self):
+        self.heatMapGroupBox = QGroupBox(title="Heat Map")
+
+        self.heatMapGraph = pg.PlotWidget()
+        self.heatMapImage = pg.ImageItem()
+        self.heatMapGraph.addItem(self.heatMapImage)
+        self.colorBar = pg.ColorBarItem(colorMap=pg.colormap.get("viridis"), interactive=False)
+        self.colorBar.setImageItem(self.heatMapImage, insert_in=self.heatMapGraph.getPlotItem())
+
+        layout = QGridLayout()
+        layout.addWidget(self.heatMapGraph, 0, 0)
+        self.heatMapGroupBox.setLayout(layout)
+
+    def startSweep(self):
+        self.cancelSweep()
+        try:
+            forceLaw = self.currentForceLaw() if self.currentForceLaw is not None else None
+            xKey, xValues = self.axisValues(self.xAxisInputs)
+            yKey, yValues = self.axisValues(self.yAxisInputs)
+            settings = self.solverSettings()
+            fixedParameters = self.currentParameters()
+        except ValueError as error:
+            #Unreadable axis, parameter or solver inputs, as on the Main tab's Run button
+            QMessageBox.warning(self, "Sweep", str(error))
+            return
+        #Results from workers of an earlier sweep are recognised by their generation and dropped
+        self.generation += 1
+        generation = self.generation
+        metric = self.metricInput.currentText()
+
+        #Cell (i, j) of the image is xValues[i], yValues[j]
+        xGrid, yGrid = meshgrid(xValues, yValues, indexing="ij")
+        parameters = {key: full(xGrid.size, value) for key, value in fixedParameters.items()}
+        parameters[xKey] = xGrid.ravel()
+        parameters[yKey] = yGrid.ravel()
+
+        self.values = full(xGrid.shape, nan)
+        self.heatMapImage.setImage(self.values, autoLevels=False)
+        self.placeImage(self.heatMapImage, xValues, yValues)
+        self.heatMapGraph.setLabel('bottom', self.xAxisInputs[0].currentText())
+        self.heatMapGraph.setLabel('left', self.yAxisInputs[0].currentText())
+        self.heatMapGraph.setTitle(metric)
+
+        cellCount = xGrid.size
+        self.progressBar.setMaximum(cellCount)
+        self.progressBar.setValue(0)
+        self.runButton.setEnabled(False)
+        self.cancelButton.setEnabled(True)
+        self.pendingChunks = 0
+
+        for start in range(0, cellCount, CELLS_PER_CHUNK):
+            cells = slice(start, min(start + CELLS_PER_CHUNK, cellCount))
+            chunk = {key: value[cells] for key, value in parameters.items()}
+            worker = Worker(solveCells, chunk, settings, metric, forceLaw)
+            worker.signals.result.connect(lambda values, cells=cells, generation=generation: self.fillCells(generation, cells, values))
+            worker.signals.error.connect(self.sweepFailed)
+            worker.signals.finished.connect(lambda worker=worker, generation=generation: self.chunkFinished(generation, worker))
+            self.workers.append(worker)
+            self.pendingChunks += 1
+            self.threadPool.start(worker)
+
+    def fillCells(self, generation, cells, values):
+        if generation != self.generation:
+            return
+        self.values.reshape(-1)[cells] = values
+        self.showValues(self.heatMapImage, self.colorBar, self.values)
+        self.progressBar.setValue(self.progressBar.value() + cells.stop - cells.start)
+
+    def chunkFinished(self, generation, worker):
+        self.workers.remove(worker)
+        if generation != self.generation:
+            return
+        self.pendingChunks -= 1
+        if self.pendingChunks == 0:
+            self.runButton.setEnabled(True)
+            self.cancelButton.setEnabled(False)
+
+    def sweepFailed(self, message):
+        self.cancelSweep()
+        self.heatMapGraph.setTitle("Sweep failed: {}".format(message))
+
+    def cancelSweep(self):
+        for worker in self.workers:
+            worker.cancel()
+        self.generation += 1
+        self.runButton.setEnabled(True)
+        self.cancelButton.setEnabled(False)
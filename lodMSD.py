@@ -0,0 +1,70 @@
+#Level-of-detail downsampling for plotting long traces. An EnvelopePyramid is built once per trace;
+#level L holds the min and max of every 2^L consecutive samples. view() then serves roughly one bin
+#per pixel of the visible range, so the cost of a redraw depends on the plot width, not on the
+#number of samples.
+from numpy import asarray, minimum, maximum, concatenate, empty, searchsorted, ceil, log2
+
+#Coarsest level kept, in bins
+MIN_BINS = 256
+
+class EnvelopePyramid:
+    def __init__(self, t, y, minBins=MIN_BINS):
+        self.t = asarray(t, dtype=float)
+        self.y = asarray(y, dtype=float)
+        self.levels = [] #(bin centers, bin minima, bin maxima) for bins of 2, 4, 8 ... samples
+        centers, low, high = self.t, self.y, self.y
+        while centers.shape[0] > 2 * minBins:
+            n = centers.shape[0] // 2 * 2
+            nextCenters = (centers[0:n:2] + centers[1:n:2]) / 2
+            nextLow = minimum(low[0:n:2], low[1:n:2])
+            nextHigh = maximum(high[0:n:2], high[1:n:2])
+            if n < centers.shape[0]:
+                #An odd sample at the end becomes a bin of its own
+                nextCenters = concatenate([nextCenters, centers[-1:]])
+                nextLow = concatenate([nextLow, low[-1:]])
+                nextHigh = concatenate([nextHigh, high[-1:]])
+            centers, low, high = nextCenters, nextLow, nextHigh
+            self.levels.append((centers, low, high))
+
+    def __len__(self):
+        return self.t.shape[0]
+
+    def _envelope(self, level, start, stop):
+        #Interleaved (min, max) pairs of bins start:stop, drawn as one vertical stroke per bin
+        centers, low, high = self.levels[level]
+        x = empty(2 * (stop - start))
+        y = empty(2 * (stop - start))
+        x[0::2] = centers[start:stop]
+        x[1::2] = centers[start:stop]
+        y[0::2] = low[start:stop]
+        y[1::2] = high[start:stop]
+        return x, y
+
+    def view(self, tMin, tMax, pixels):
+        #Points to draw for the visible range tMin..tMax on a plot that is `pixels` wide. Samples outside
+        #the range are served from the coarsest level so the curve keeps its full extent while panning.
+        pixels = max(1, int(pixels))
+        start, stop = searchsorted(self.t, [tMin, tMax])
+        start = max(0, start - 1)
+        stop = min(self.t.shape[0], stop + 1)
+        visible = stop - start
+        if not self.levels or len(self) <= 2 * pixels:
+            return self.t, self.y
+
+        #Outside the view: the level with about one bin per pixel over the whole trace
+        coarse = min(len(self.levels) - 1, max(0, int(ceil(log2(len(self) / pixels))) - 1))
+        coarseCenters = self.levels[coarse][0]
+        coarseStart, coarseStop = searchsorted(coarseCenters, [self.t[start], self.t[stop - 1]])
+        beforeX, beforeY = self._envelope(coarse, 0, coarseStart)
+        afterX, afterY = self._envelope(coarse, coarseStop, coarseCenters.shape[0])
+
+        #Inside the view: raw samples if they fit, otherwise the level with about one bin per pixel
+        if visible <= 2 * pixels:
+            insideX, insideY = self.t[start:stop], self.y[start:stop]
+        else:
+            level = min(len(self.levels) - 1, max(0, int(ceil(log2(visible / pixels))) - 1))
+            centers = self.levels[level][0]
+            levelStart, levelStop = searchsorted(centers, [self.t[start], self.t[stop - 1]])
+            insideX, insideY = self._envelope(level, max(0, levelStart - 1), min(centers.shape[0], levelStop + 1))
+
+        return concatenate([beforeX, insideX, afterX]), concatenate([beforeY, insideY, afterY])
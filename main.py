@@ -1,18 +1,52 @@
 from PyQt5.QtWidgets import (QApplication, QLabel, QGridLayout, QGroupBox, 
                              QWidget, QSlider, QLineEdit, QPushButton, 
-                            QHBoxLayout, QTabWidget, QComboBox, QTextEdit)
-from PyQt5.QtCore import Qt, QTimer
+                            QHBoxLayout, QTabWidget, QComboBox, QTextEdit, QCheckBox,
+                             QFileDialog, QInputDialog, QMessageBox)
+from PyQt5.QtCore import Qt, QTimer, QThreadPool
 from PyQt5.QtGui import QFont
 import pyqtgraph as pg
-from numpy import linspace, pi, inf, sqrt
 import sys
-from scipy.integrate import odeint, solve_ivp
+import os
+from numpy import concatenate
 from animateMSD import AnimationWidget
+from heatmapMSD import SweepWidget
+from bodeMSD import FrequencyResponseWidget
+from chainViewMSD import ChainWidget
+from solveMSD import (SolverSettings, DEFAULT_ACCURACY, DEFAULT_SAMPLING_TOLERANCE, SAMPLING_MODES, NUMBA_AVAILABLE,
+                      stiffnessRatio)
+from workersMSD import Worker
+from cacheMSD import ResultCache
+from lodMSD import EnvelopePyramid
+from playbackMSD import PlaybackClock
+from storeMSD import ResultStore, saveRun
+from forcingMSD import Forcing, FORCING_KINDS, loadForcing
+from forceLawMSD import (ForceLaw, SPRING_LAWS, DAMPER_LAWS, FRICTION_LAWS, DEFAULT_NONLINEARITY, DEFAULT_FRICTION_FORCE,
+                         DEFAULT_SMOOTHING)
+
+#Quiet time after the last slider change before a live re-solve starts. Short enough that a slow drag
+#still redraws at about 40 Hz, long enough that a fast one does not queue a solve per pixel
+LIVE_INTERVAL_MS = 25
+#The result cache is written here on exit when "Keep Between Sessions" is checked
+RESULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".msdapplication", "resultCache.pkl")
 
 class MainWindow(QWidget):
     def __init__(self):
         super(MainWindow,self).__init__()
 
+        #Live mode: every slider change restarts liveTimer, so a solve starts on a pool thread once the
+        #inputs have been still for LIVE_INTERVAL_MS. One solve runs at a time and only the newest request
+        #is drawn: a solve that is overtaken is not interrupted (scipy's solvers cannot be stopped midway),
+        #it runs to the end, its result is dropped and the newest inputs are solved right after it.
+        self.liveTimer = QTimer()
+        self.liveTimer.setSingleShot(True)
+        self.liveTimer.timeout.connect(self.startLiveSolve)
+        self.liveWorker = None
+        self.livePending = False
+        self.liveRequest = 0
+
+        #Solver runs are memoized on (m, k, b, x0, v0, solver settings)
+        self.resultCache = ResultCache(path=RESULT_CACHE_PATH)
+
         #Building the main tab
         self.GraphGroupBox()
         x = []
@@ -23,20 +57,35 @@ class MainWindow(QWidget):
         self.energyLine1 = self.energyGraph.plot(x, y, pen='g', name='Kinetic Energy')
         self.energyLine2 = self.energyGraph.plot(x, y, pen='r', name='Potential Energy')
         self.energyLine3 = self.energyGraph.plot(x, y, pen='b', name='Total Energy')
+        #Events located by the solver: extrema, zero crossings and the 2% settling time
+        self.extremaMarkers = self.positionGraph.plot(x, y, pen=None, symbol='o', symbolSize=6, symbolBrush='r', symbolPen=None)
+        self.zeroCrossingMarkers = self.positionGraph.plot(x, y, pen=None, symbol='x', symbolSize=7, symbolBrush='c', symbolPen='c')
+        self.settlingLine = pg.InfiniteLine(pos=0, angle=90, movable=False, pen=pg.mkPen('m', width=1, style=Qt.DashLine))
+        self.settlingLine.hide()
+        self.positionGraph.getPlotItem().addItem(self.settlingLine, ignoreBounds=True)
+
+        #Each trace is drawn from an envelope pyramid, re-served whenever the visible x range changes
+        self.lodPyramids = {}
+        for graph in [self.positionGraph, self.velocityGraph, self.accelerationGraph, self.energyGraph]:
+            self.lodPyramids[graph] = []
+            graph.getPlotItem().sigXRangeChanged.connect(lambda viewBox, xRange, graph=graph: self.refreshLOD(graph))
+            graph.getViewBox().sigResized.connect(lambda viewBox, graph=graph: self.refreshLOD(graph))
 
         self.systemAttributesGroupBox()
         self.systemVariablesGroupBox()
         self.initialConditionsGroupBox()
+        self.forcingGroupBox()
 
         tabwidget = QTabWidget()
         MainLayout = QGridLayout()
 
         w1 = QWidget()
         t1 = QGridLayout()
-        t1.addWidget(self.GraphGroupBox, 0, 0, 1, 2)
+        t1.addWidget(self.GraphGroupBox, 0, 0, 1, 3)
         t1.addWidget(self.systemVariablesGroupBox, 2, 0)
-        t1.addWidget(self.systemAttributesGroupBox, 1, 0, 1, 2)
+        t1.addWidget(self.systemAttributesGroupBox, 1, 0, 1, 3)
         t1.addWidget(self.initialConditionsGroupBox, 2, 1)
+        t1.addWidget(self.forcingGroupBox, 2, 2)
         w1.setLayout(t1)
         tabwidget.addTab(w1,"Main")
         #END MAIN TAB
@@ -45,13 +94,19 @@ class MainWindow(QWidget):
         #Building the ODE tab
         self.createODEintGroupBox()
         self.createSolveIVPGroupBox()
-        self.ODEintGroupBox.setEnabled(True)
-        self.solveIVPGroupBox.setDisabled(True)
+        self.createAnalyticGroupBox()
+        self.createAutoGroupBox()
+        self.createPropagatorGroupBox()
         solverLabel = QLabel("Solver")
         self.solverComboBox = QComboBox()
         self.solverComboBox.insertItem(0, "odeint")
         self.solverComboBox.insertItem(1, "solve_ivp")
+        self.solverComboBox.insertItem(2, "analytic")
+        self.solverComboBox.insertItem(3, "auto")
+        self.solverComboBox.insertItem(4, "propagator")
         self.solverComboBox.currentIndexChanged.connect(self.enableODEWidgets)
+        self.solverComboBox.setCurrentText("auto")
+        self.enableODEWidgets()
         defaultSettingsButton = QPushButton()
         defaultSettingsButton.setText("Default Settings")
         defaultSettingsButton.pressed.connect(self.defaultSettingsButtonPressed)
@@ -62,17 +117,49 @@ class MainWindow(QWidget):
         topLayout.addWidget(solverLabel)
         topLayout.addWidget(self.solverComboBox)
         topLayout.addWidget(defaultSettingsButton)
+        self.compiledCheckBox = QCheckBox("Compiled RHS")
+        self.compiledCheckBox.setEnabled(NUMBA_AVAILABLE)
+        self.compiledCheckBox.setToolTip("Evaluate the right hand side with numba" if NUMBA_AVAILABLE
+                                         else "Needs numba, which is not installed")
+        topLayout.addWidget(self.compiledCheckBox)
+        #Output grid of every solver: numPoints evenly spaced, or sized from the dynamics
+        self.samplingComboBox = QComboBox()
+        self.samplingComboBox.addItems(SAMPLING_MODES)
+        self.samplingComboBox.setCurrentText("adaptive")
+        self.samplingComboBox.setToolTip("adaptive: sample fast motion densely and slow or decayed motion sparsely")
+        self.samplingToleranceInput = QLineEdit()
+        self.samplingToleranceInput.setText("{:g}".format(DEFAULT_SAMPLING_TOLERANCE))
+        self.samplingToleranceInput.setToolTip("Largest error of the lines drawn between adaptive samples, relative to the amplitude")
+        topLayout.addWidget(QLabel("Output Sampling:"))
+        topLayout.addWidget(self.samplingComboBox)
+        topLayout.addWidget(QLabel("Sampling Tolerance:"))
+        topLayout.addWidget(self.samplingToleranceInput)
         topLayout.addStretch(1)
+        self.cacheStatsLabel = QLabel("")
+        clearCacheButton = QPushButton("Clear Cache")
+        clearCacheButton.pressed.connect(self.clearCacheButtonPressed)
+        self.persistCacheCheckBox = QCheckBox("Keep Between Sessions")
+        self.persistCacheCheckBox.setChecked(os.path.exists(RESULT_CACHE_PATH))
+        topLayout.addWidget(self.cacheStatsLabel)
+        topLayout.addWidget(clearCacheButton)
+        topLayout.addWidget(self.persistCacheCheckBox)
+        self.updateCacheStats()
         t2.addWidget(self.ODEintGroupBox, 1, 0)
         t2.addWidget(self.solveIVPGroupBox, 1, 1)
+        t2.addWidget(self.analyticGroupBox, 1, 2)
+        t2.addWidget(self.autoGroupBox, 1, 3)
+        t2.addWidget(self.propagatorGroupBox, 1, 4)
         t2.setColumnStretch(0, 1)
         t2.setColumnStretch(1, 1)
+        t2.setColumnStretch(2, 1)
+        t2.setColumnStretch(3, 1)
+        t2.setColumnStretch(4, 1)
         bottomlayout = QHBoxLayout()
         bottomLabel = QTextEdit()
         bottomLabel.setPlainText("Note: Setting Step Size options to ""0"" will leave the values to be determined automatically by the solver.")
         bottomLabel.setReadOnly(True)
         bottomlayout.addWidget(bottomLabel)
-        t2.addLayout(bottomlayout, 2, 0, 1, 2)
+        t2.addLayout(bottomlayout, 2, 0, 1, 5)
         t2.setRowStretch(0,1)
         t2.setRowStretch(1,3)
         t2.setRowStretch(2,1)
@@ -88,15 +175,34 @@ class MainWindow(QWidget):
     
         startAnimationButton = QPushButton("Start")
         startAnimationButton.pressed.connect(self.startAnimation)
-        startAnimationButton.pressed.connect(self.startTimer)
 
         self.t3 = QGridLayout()
         self.t3.addWidget(startAnimationButton, 1, 1, 1, 1)
 
+        #Playback controls: speed, frame rate and a scrub slider over the whole run
+        self.animationSpeedInput = QComboBox()
+        self.animationSpeedInput.addItems(["0.25x", "0.5x", "1x", "2x", "4x"])
+        self.animationSpeedInput.setCurrentText("1x")
+        self.animationSpeedInput.currentTextChanged.connect(self.animationSpeedChanged)
+        self.frameRateInput = QComboBox()
+        self.frameRateInput.addItems(["30", "60", "120"])
+        self.frameRateInput.setCurrentText("60")
+        self.frameRateInput.currentTextChanged.connect(self.frameRateChanged)
+        self.scrubSlider = QSlider(Qt.Orientation.Horizontal)
+        self.scrubSlider.setMaximum(1000)
+        self.scrubSlider.sliderMoved.connect(self.scrubSliderMoved)
+        playbackLayout = QHBoxLayout()
+        playbackLayout.addWidget(QLabel("Speed:"))
+        playbackLayout.addWidget(self.animationSpeedInput)
+        playbackLayout.addWidget(QLabel("Frame Rate:"))
+        playbackLayout.addWidget(self.frameRateInput)
+        playbackLayout.addWidget(self.scrubSlider, 1)
+        self.t3.addLayout(playbackLayout, 1, 0)
+
+        #The animation, the timer label and the graph cursors all show the time of this one clock
+        self.playbackClock = PlaybackClock()
         self.timerLabel = QLabel("0.00")
         self.timerLabel.setFont(QFont("LCD", 36))
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.updateTimer)
         self.t3.addWidget(self.timerLabel, 0, 1)
 
         self.t3.setRowStretch(0, 5)
@@ -109,6 +215,29 @@ class MainWindow(QWidget):
         #END ANIMATION TAB
 
 
+        #Building the sweep tab
+        self.sweepWidget = SweepWidget(self.currentParameters, self.solverSettings, self.currentForceLaw)
+        tabwidget.addTab(self.sweepWidget, "Sweep")
+        #END SWEEP TAB
+
+
+        #Building the frequency response tab, redrawn whenever m, k or b change on the Main tab
+        self.frequencyResponseWidget = FrequencyResponseWidget(self.currentParameters)
+        for slider in [self.massSlider, self.springSlider, self.damperSlider]:
+            slider.valueChanged.connect(self.frequencyResponseWidget.refresh)
+        for parameterInput in [self.massInput, self.springInput, self.damperInput]:
+            parameterInput.editingFinished.connect(self.frequencyResponseWidget.refresh)
+        self.frequencyResponseWidget.refresh()
+        tabwidget.addTab(self.frequencyResponseWidget, "Frequency Response")
+        #END FREQUENCY RESPONSE TAB
+
+
+        #Building the chain tab
+        self.chainWidget = ChainWidget(self.currentParameters, self.solverSettings)
+        tabwidget.addTab(self.chainWidget, "Chain")
+        #END CHAIN TAB
+
+
         MainLayout.addWidget(tabwidget)
         self.setLayout(MainLayout)
 
@@ -121,17 +250,49 @@ class MainWindow(QWidget):
         b = float(self.damperInput.text())
         x0 = float(self.xPosInput.text())
         v0 = float(self.velocityInput.text())
-        t = linspace(0, float(self.ODEINTevalTimeInput.text()), 1000)
+        t = self.solutionTime
         solverOutput = self.horizontalPositions
         
         if self.animation != None:
             self.animation.deleteMass()
-
-        self.animation = AnimationWidget(m, k, b, x0, v0, t, solverOutput) 
+            self.t3.removeWidget(self.animation)
+            self.animation.deleteLater()
+
+        fps = int(self.frameRateInput.currentText())
+        self.playbackClock.seek(0)
+        self.animation = AnimationWidget(m, k, b, x0, v0, t, solverOutput, self.result.v, fps=fps, clock=self.playbackClock,
+                                         events=self.result.events)
+        self.animation.setSpeed(float(self.animationSpeedInput.currentText().rstrip("x")))
+        self.animation.timeChanged.connect(self.animationTimeChanged)
         self.t3.addWidget(self.animation, 0, 0, 1, 2)
         
     def startAnimation(self):
-        self.animation.startAnimation()
+        if self.animation != None:
+            self.animation.startAnimation()
+
+    def animationSpeedChanged(self, text):
+        if self.animation != None:
+            self.animation.setSpeed(float(text.rstrip("x")))
+
+    def frameRateChanged(self, text):
+        if self.animation != None:
+            self.animation.setFrameRate(int(text))
+
+    def scrubSliderMoved(self, value):
+        if self.animation != None:
+            self.animation.seek(value / self.scrubSlider.maximum() * self.animation.duration())
+
+    def animationTimeChanged(self, time):
+        self.timerLabel.setText("{:.2f}".format(time))
+        for cursor in self.playbackCursors:
+            cursor.setValue(time)
+        if not self.scrubSlider.isSliderDown() and self.animation.duration() > 0:
+            self.scrubSlider.setValue(int(time / self.animation.duration() * self.scrubSlider.maximum()))
+
+    def playbackCursorDragged(self, cursor):
+        #Dragging a cursor on any graph scrubs the animation
+        if self.animation != None:
+            self.animation.seek(cursor.value())
 
     def GraphGroupBox(self):
         self.GraphGroupBox = QGroupBox(title="Graphs")
@@ -164,6 +325,14 @@ class MainWindow(QWidget):
         layout.addWidget(self.energyGraph, 1, 1)
         self.GraphGroupBox.setLayout(layout)
 
+        #Playback cursors, moved by the animation clock
+        self.playbackCursors = []
+        for graph in [self.positionGraph, self.velocityGraph, self.accelerationGraph, self.energyGraph]:
+            cursor = pg.InfiniteLine(pos=0, angle=90, movable=True, pen=pg.mkPen('y', width=1))
+            cursor.sigDragged.connect(self.playbackCursorDragged)
+            graph.getPlotItem().addItem(cursor, ignoreBounds=True)
+            self.playbackCursors.append(cursor)
+
 
     def systemAttributesGroupBox(self):
         self.systemAttributesGroupBox = QGroupBox(title="System Attributes")
@@ -175,11 +344,16 @@ class MainWindow(QWidget):
         self.dampedNatFrequencyOutput = QLabel("")
         self.dampedNatFrequencyOutput.setStyleSheet("font-weight: bold")
         settlingTimeLabel = QLabel("Settling Time (s):")
+        settlingTimeLabel.setToolTip("Time from which the position stays within 2% of its peak, located during the solve")
         self.settlingTimeOutput = QLabel("")
         self.settlingTimeOutput.setStyleSheet("font-weight: bold")
+        samplesLabel = QLabel("Samples:")
+        samplesLabel.setToolTip("Output points of the run and the estimated error of the lines drawn between them")
+        self.samplesOutput = QLabel("")
+        self.samplesOutput.setStyleSheet("font-weight: bold")
 
         startStopButton = QPushButton()
-        buttonConnections = [self.ODEsolver, self.xSliderValue, self.velocitySliderValue, self.massSliderValue, self.springSliderValue, self.damperSliderValue, self.createAnimationWidget]
+        buttonConnections = [self.ODEsolver, self.xSliderValue, self.velocitySliderValue, self.massSliderValue, self.springSliderValue, self.damperSliderValue]
         startStopButton.setText("Run")
         for connection in buttonConnections:
             startStopButton.clicked.connect(connection)
@@ -194,7 +368,22 @@ class MainWindow(QWidget):
         layout.addWidget(settlingTimeLabel)
         layout.addWidget(self.settlingTimeOutput)
         layout.addStretch(1)
+        layout.addWidget(samplesLabel)
+        layout.addWidget(self.samplesOutput)
+        layout.addStretch(1)
+        self.liveCheckBox = QCheckBox("Live")
+        self.liveCheckBox.setToolTip("Re-solve while the sliders are moved")
+        self.liveCheckBox.toggled.connect(self.scheduleLiveSolve)
+        layout.addWidget(self.liveCheckBox)
         layout.addWidget(startStopButton)
+        saveResultButton = QPushButton("Save...")
+        saveResultButton.setToolTip("Save the current run as a result store")
+        saveResultButton.clicked.connect(self.saveResultButtonPressed)
+        openResultButton = QPushButton("Open...")
+        openResultButton.setToolTip("Show a run from a saved result store or sweep")
+        openResultButton.clicked.connect(self.openResultButtonPressed)
+        layout.addWidget(saveResultButton)
+        layout.addWidget(openResultButton)
 
         self.systemAttributesGroupBox.setLayout(layout)
 
@@ -211,6 +400,7 @@ class MainWindow(QWidget):
         self.massSlider.setMaximum(1000)
         self.massSlider.setValue(int(100 * float(self.massInput.text())))
         self.massSlider.valueChanged.connect(self.massInputValue)
+        self.massSlider.valueChanged.connect(self.scheduleLiveSolve)
 
         self.springSlider = QSlider(Qt.Orientation.Horizontal)
         self.springLabel = QLabel("Spring Constant, k (N/m):")
@@ -221,6 +411,7 @@ class MainWindow(QWidget):
         self.springSlider.setMaximum(10000)
         self.springSlider.setValue(int(100 * float(self.springInput.text())))
         self.springSlider.valueChanged.connect(self.springInputValue)
+        self.springSlider.valueChanged.connect(self.scheduleLiveSolve)
 
         self.damperSlider = QSlider(Qt.Orientation.Horizontal)
         self.damperLabel = QLabel("Damping Ratio, b:")
@@ -231,6 +422,7 @@ class MainWindow(QWidget):
         self.damperSlider.setMaximum(100)
         self.damperSlider.setValue(int(100 * float(self.damperInput.text())))
         self.damperSlider.valueChanged.connect(self.damperInputValue)
+        self.damperSlider.valueChanged.connect(self.scheduleLiveSolve)
 
         layout = QGridLayout()
         layout.addWidget(self.massLabel, 4, 0)
@@ -243,6 +435,44 @@ class MainWindow(QWidget):
         layout.addWidget(self.springSlider, 6, 1)
         layout.addWidget(self.springInput, 6, 2)
 
+        #Force laws: the linear ones keep the exact solvers, the others are integrated numerically
+        self.springLawComboBox = QComboBox()
+        self.springLawComboBox.addItems(SPRING_LAWS)
+        self.springLawComboBox.setToolTip("hardening / softening: Duffing spring k*x*(1 +/- epsilon*x^2)")
+        self.nonlinearityInput = QLineEdit("{:g}".format(DEFAULT_NONLINEARITY))
+        self.damperLawComboBox = QComboBox()
+        self.damperLawComboBox.addItems(DAMPER_LAWS)
+        self.damperLawComboBox.setToolTip("quadratic: drag b*v*|v|, b is then the drag coefficient (N s^2/m^2)")
+        self.frictionComboBox = QComboBox()
+        self.frictionComboBox.addItems(FRICTION_LAWS)
+        self.frictionComboBox.setToolTip("Coulomb friction. smooth: tanh(v / smoothing) regularized; "
+                                         "stick-slip: exact, the mass sticks while the other forces stay below the friction force")
+        self.frictionForceInput = QLineEdit("{:g}".format(DEFAULT_FRICTION_FORCE))
+        self.smoothingInput = QLineEdit("{:g}".format(DEFAULT_SMOOTHING))
+        for comboBox in [self.springLawComboBox, self.damperLawComboBox, self.frictionComboBox]:
+            comboBox.currentIndexChanged.connect(self.enableForceLawWidgets)
+            comboBox.currentIndexChanged.connect(self.scheduleLiveSolve)
+        for forceLawInput in [self.nonlinearityInput, self.frictionForceInput, self.smoothingInput]:
+            forceLawInput.editingFinished.connect(self.scheduleLiveSolve)
+
+        springLawLayout = QHBoxLayout()
+        springLawLayout.addWidget(self.springLawComboBox)
+        springLawLayout.addWidget(QLabel("epsilon (1/m^2):"))
+        springLawLayout.addWidget(self.nonlinearityInput)
+        frictionLayout = QHBoxLayout()
+        frictionLayout.addWidget(self.frictionComboBox)
+        frictionLayout.addWidget(QLabel("Force (N):"))
+        frictionLayout.addWidget(self.frictionForceInput)
+        frictionLayout.addWidget(QLabel("Smoothing (m/s):"))
+        frictionLayout.addWidget(self.smoothingInput)
+        layout.addWidget(QLabel("Spring Law:"), 7, 0)
+        layout.addLayout(springLawLayout, 7, 1, 1, 2)
+        layout.addWidget(QLabel("Damper Law:"), 8, 0)
+        layout.addWidget(self.damperLawComboBox, 8, 1, 1, 2)
+        layout.addWidget(QLabel("Friction:"), 9, 0)
+        layout.addLayout(frictionLayout, 9, 1, 1, 2)
+        self.enableForceLawWidgets()
+
         layout.setColumnStretch(0, 2)
         layout.setColumnStretch(1, 6)
         layout.setColumnStretch(2, 1)
@@ -250,6 +480,27 @@ class MainWindow(QWidget):
         self.systemVariablesGroupBox.setLayout(layout)
 
 
+    def enableForceLawWidgets(self):
+        self.nonlinearityInput.setEnabled(self.springLawComboBox.currentText() != "linear")
+        self.frictionForceInput.setEnabled(self.frictionComboBox.currentText() != "none")
+        self.smoothingInput.setEnabled(self.frictionComboBox.currentText() == "smooth")
+
+    def currentForceLaw(self):
+        #ForceLaw chosen in the System Variables group box; raises ValueError for unreadable inputs
+        return ForceLaw(self.springLawComboBox.currentText(), float(self.nonlinearityInput.text()),
+                        self.damperLawComboBox.currentText(), self.frictionComboBox.currentText(),
+                        float(self.frictionForceInput.text()), float(self.smoothingInput.text()))
+
+    def showForceLaw(self, forceLaw):
+        #Puts a stored run's force law into the System Variables group box
+        forceLaw = forceLaw if forceLaw is not None else ForceLaw()
+        self.nonlinearityInput.setText("{:g}".format(forceLaw.nonlinearity))
+        self.frictionForceInput.setText("{:g}".format(forceLaw.frictionForce))
+        self.smoothingInput.setText("{:g}".format(forceLaw.smoothing))
+        self.springLawComboBox.setCurrentText(forceLaw.spring)
+        self.damperLawComboBox.setCurrentText(forceLaw.damper)
+        self.frictionComboBox.setCurrentText(forceLaw.friction)
+
     def initialConditionsGroupBox(self):
         self.initialConditionsGroupBox = QGroupBox(title="Initial Conditions")
 
@@ -265,6 +516,7 @@ class MainWindow(QWidget):
 
         self.xPosSlider.setValue(int(100 * float(self.xPosInput.text())))
         self.xPosSlider.valueChanged.connect(self.xInputValue)
+        self.xPosSlider.valueChanged.connect(self.scheduleLiveSolve)
 
         self.velocitySlider = QSlider(Qt.Orientation.Horizontal)
         self.velocityLabel = QLabel("Starting Velocity (m/s):")
@@ -278,6 +530,7 @@ class MainWindow(QWidget):
         
         self.velocitySlider.setValue(int(100 * float(self.velocityInput.text())))
         self.velocitySlider.valueChanged.connect(self.velocityInputValue)
+        self.velocitySlider.valueChanged.connect(self.scheduleLiveSolve)
 
         layout = QGridLayout()
         layout.addWidget(xPosLabel, 0, 0)
@@ -292,6 +545,99 @@ class MainWindow(QWidget):
 
         self.initialConditionsGroupBox.setLayout(layout)
 
+    def forcingGroupBox(self):
+        self.forcingGroupBox = QGroupBox(title="Forcing")
+        #Samples read with "Load...", scaled by the amplitude input
+        self.loadedForcing = None
+
+        self.forcingComboBox = QComboBox()
+        self.forcingComboBox.addItems(FORCING_KINDS)
+        self.forcingComboBox.currentIndexChanged.connect(self.enableForcingWidgets)
+        self.forcingComboBox.currentIndexChanged.connect(self.scheduleLiveSolve)
+        forcingAmplitudeLabel = QLabel("Amplitude (N, N s):")
+        forcingAmplitudeLabel.setToolTip("Force of a step, sinusoid or chirp, impulse of a kick, scale of loaded samples")
+        self.forcingAmplitudeInput = QLineEdit("1.0")
+        forcingStartLabel = QLabel("Start (s):")
+        self.forcingStartInput = QLineEdit("0")
+        forcingFrequencyLabel = QLabel("Frequency (Hz):")
+        self.forcingFrequencyInput = QLineEdit("1.0")
+        forcingEndFrequencyLabel = QLabel("End Frequency (Hz):")
+        self.forcingEndFrequencyInput = QLineEdit("10.0")
+        forcingDurationLabel = QLabel("Sweep Duration (s):")
+        self.forcingDurationInput = QLineEdit("10.0")
+        for forcingInput in [self.forcingAmplitudeInput, self.forcingStartInput, self.forcingFrequencyInput,
+                      self.forcingEndFrequencyInput, self.forcingDurationInput]:
+            forcingInput.editingFinished.connect(self.scheduleLiveSolve)
+        loadForcingButton = QPushButton("Load...")
+        loadForcingButton.setToolTip("Read sampled forcing from a CSV (time, force), .npy or .npz file")
+        loadForcingButton.clicked.connect(self.loadForcingButtonPressed)
+        self.forcingSourceOutput = QLabel("")
+
+        layout = QGridLayout()
+        layout.addWidget(self.forcingComboBox, 0, 0)
+        layout.addWidget(loadForcingButton, 0, 1)
+        layout.addWidget(self.forcingSourceOutput, 0, 2, 1, 2)
+        layout.addWidget(forcingAmplitudeLabel, 1, 0)
+        layout.addWidget(self.forcingAmplitudeInput, 1, 1)
+        layout.addWidget(forcingStartLabel, 1, 2)
+        layout.addWidget(self.forcingStartInput, 1, 3)
+        layout.addWidget(forcingFrequencyLabel, 2, 0)
+        layout.addWidget(self.forcingFrequencyInput, 2, 1)
+        layout.addWidget(forcingEndFrequencyLabel, 2, 2)
+        layout.addWidget(self.forcingEndFrequencyInput, 2, 3)
+        layout.addWidget(forcingDurationLabel, 3, 0)
+        layout.addWidget(self.forcingDurationInput, 3, 1)
+
+        self.forcingGroupBox.setLayout(layout)
+        self.enableForcingWidgets()
+
+    def enableForcingWidgets(self):
+        kind = self.forcingComboBox.currentText()
+        self.forcingAmplitudeInput.setEnabled(kind != "none")
+        self.forcingStartInput.setEnabled(kind != "none")
+        self.forcingFrequencyInput.setEnabled(kind in ("sinusoid", "chirp"))
+        self.forcingEndFrequencyInput.setEnabled(kind == "chirp")
+        self.forcingDurationInput.setEnabled(kind == "chirp")
+
+    def loadForcingButtonPressed(self):
+        path = QFileDialog.getOpenFileName(self, "Load Forcing", "", "Forcing samples (*.csv *.txt *.npy *.npz)")[0]
+        if not path:
+            return
+        try:
+            self.loadedForcing = loadForcing(path)
+        except (OSError, ValueError, KeyError, IndexError) as error:
+            QMessageBox.warning(self, "Load Forcing", "Could not read {}:\n{}".format(path, error))
+            return
+        self.forcingSourceOutput.setText(os.path.basename(path))
+        self.forcingComboBox.setCurrentText("sampled")
+
+    def currentForcing(self):
+        #Forcing described by the Forcing group box; raises ValueError for unreadable inputs
+        kind = self.forcingComboBox.currentText()
+        options = {"amplitude": float(self.forcingAmplitudeInput.text()), "start": float(self.forcingStartInput.text()),
+                   "frequency": float(self.forcingFrequencyInput.text()),
+                   "endFrequency": float(self.forcingEndFrequencyInput.text()),
+                   "duration": float(self.forcingDurationInput.text())}
+        if kind == "sampled":
+            if self.loadedForcing is None:
+                raise ValueError("Load the forcing samples first")
+            return Forcing(kind, times=self.loadedForcing.times, values=self.loadedForcing.values,
+                           source=self.loadedForcing.source, **options)
+        return Forcing(kind, **options)
+
+    def showForcing(self, forcing):
+        #Puts a stored run's forcing into the Forcing group box
+        forcing = forcing if forcing is not None else Forcing()
+        if forcing.kind == "sampled":
+            self.loadedForcing = Forcing("sampled", times=forcing.times, values=forcing.values, source=forcing.source)
+            self.forcingSourceOutput.setText(os.path.basename(forcing.source))
+        self.forcingAmplitudeInput.setText("{:g}".format(forcing.amplitude))
+        self.forcingStartInput.setText("{:g}".format(forcing.start))
+        self.forcingFrequencyInput.setText("{:g}".format(forcing.frequency))
+        self.forcingEndFrequencyInput.setText("{:g}".format(forcing.endFrequency))
+        self.forcingDurationInput.setText("{:g}".format(forcing.duration))
+        self.forcingComboBox.setCurrentText(forcing.kind)
+
     def xSliderValue(self):
         self.xPosSlider.setValue(int(100 * float(self.xPosInput.text())))
 
@@ -399,23 +745,134 @@ class MainWindow(QWidget):
             j+=1
         
         self.solveIVPGroupBox.setLayout(layout)
+
+    def createAnalyticGroupBox(self):
+        self.analyticGroupBox = QGroupBox("analytic")
+        layout = QGridLayout()
+
+        numPointsLabel = QLabel("Number of Points:")
+        evalTimeLabel = QLabel("Evaluation Time:")
+        odeintErrorLabel = QLabel("odeint Max Error (m):")
+        solveIVPErrorLabel = QLabel("solve_ivp Max Error (m):")
+
+        self.analyticNumPointsInput = QLineEdit()
+        self.analyticNumPointsInput.setText("1000")
+        self.analyticEvalTimeInput = QLineEdit()
+        self.analyticEvalTimeInput.setText("10")
+
+        #The error of each numerical solver against the closed form, updated whenever that solver is run
+        self.odeintErrorOutput = QLabel("")
+        self.odeintErrorOutput.setStyleSheet("font-weight: bold")
+        self.solveIVPErrorOutput = QLabel("")
+        self.solveIVPErrorOutput.setStyleSheet("font-weight: bold")
+
+        widgets = [numPointsLabel, self.analyticNumPointsInput,
+                   evalTimeLabel, self.analyticEvalTimeInput,
+                   odeintErrorLabel, self.odeintErrorOutput,
+                   solveIVPErrorLabel, self.solveIVPErrorOutput]
+
+        i = 0
+        j = 0
+        for widget in widgets:
+            if j == 2:
+                j = 0
+                i+=1
+            layout.addWidget(widget, i, j)
+            j+=1
+
+        self.analyticGroupBox.setLayout(layout)
+
+    def createAutoGroupBox(self):
+        self.autoGroupBox = QGroupBox("auto")
+        layout = QGridLayout()
+
+        accuracyLabel = QLabel("Target Accuracy:")
+        evalTimeLabel = QLabel("Evaluation Time:")
+        methodLabel = QLabel("Selected Method:")
+        stiffnessLabel = QLabel("Stiffness Ratio:")
+        errorLabel = QLabel("Max Error (m):")
+
+        self.autoAccuracyInput = QLineEdit()
+        self.autoAccuracyInput.setText("{:g}".format(DEFAULT_ACCURACY))
+        self.autoAccuracyInput.setToolTip("Largest error allowed, relative to the amplitude of the motion")
+        self.autoEvalTimeInput = QLineEdit()
+        self.autoEvalTimeInput.setText("10")
+
+        #The method and tolerances chosen for the last run, from the eigenvalues of the system
+        self.autoMethodOutput = QLabel("")
+        self.autoMethodOutput.setStyleSheet("font-weight: bold")
+        self.autoStiffnessOutput = QLabel("")
+        self.autoStiffnessOutput.setStyleSheet("font-weight: bold")
+        self.autoErrorOutput = QLabel("")
+        self.autoErrorOutput.setStyleSheet("font-weight: bold")
+
+        widgets = [accuracyLabel, self.autoAccuracyInput,
+                   evalTimeLabel, self.autoEvalTimeInput,
+                   methodLabel, self.autoMethodOutput,
+                   stiffnessLabel, self.autoStiffnessOutput,
+                   errorLabel, self.autoErrorOutput]
+
+        i = 0
+        j = 0
+        for widget in widgets:
+            if j == 2:
+                j = 0
+                i+=1
+            layout.addWidget(widget, i, j)
+            j+=1
+
+        self.autoGroupBox.setLayout(layout)
     
+    def createPropagatorGroupBox(self):
+        #Exact expm(A dt) stepping on an evenly spaced grid (or the evenly spaced pieces of an adaptive one)
+        self.propagatorGroupBox = QGroupBox("propagator")
+        layout = QGridLayout()
+
+        numPointsLabel = QLabel("Number of Points:")
+        evalTimeLabel = QLabel("Evaluation Time:")
+        errorLabel = QLabel("Max Error (m):")
+
+        self.propagatorNumPointsInput = QLineEdit()
+        self.propagatorNumPointsInput.setText("1000")
+        self.propagatorEvalTimeInput = QLineEdit()
+        self.propagatorEvalTimeInput.setText("10")
+        self.propagatorErrorOutput = QLabel("")
+        self.propagatorErrorOutput.setStyleSheet("font-weight: bold")
+
+        widgets = [numPointsLabel, self.propagatorNumPointsInput,
+                   evalTimeLabel, self.propagatorEvalTimeInput,
+                   errorLabel, self.propagatorErrorOutput]
+
+        i = 0
+        j = 0
+        for widget in widgets:
+            if j == 2:
+                j = 0
+                i+=1
+            layout.addWidget(widget, i, j)
+            j+=1
+
+        self.propagatorGroupBox.setLayout(layout)
+
     def disableODEWidgets(self, currentIndex):
         boxes = {"odeint": self.ODEintGroupBox,
-                "solve_ivp": self.solveIVPGroupBox}
-        if currentIndex == "odeint":
-            group = boxes["solve_ivp"]
-        elif currentIndex=="solve_ivp":
-            group = boxes["odeint"]
-        
-        group.setDisabled(True)
+                "solve_ivp": self.solveIVPGroupBox,
+                "analytic": self.analyticGroupBox,
+                "auto": self.autoGroupBox,
+                "propagator": self.propagatorGroupBox}
+        for name, group in boxes.items():
+            if name != currentIndex:
+                group.setDisabled(True)
         # for widget in group.findChildren((QLineEdit, QComboBox)):
         #     widget.setEnabled(False)
             
     def enableODEWidgets(self):
         currentIndex = self.solverComboBox.currentText()
         boxes = {"odeint": self.ODEintGroupBox,
-                "solve_ivp": self.solveIVPGroupBox}
+                "solve_ivp": self.solveIVPGroupBox,
+                "analytic": self.analyticGroupBox,
+                "auto": self.autoGroupBox,
+                "propagator": self.propagatorGroupBox}
         group = boxes[currentIndex]
         group.setEnabled(True)
         # for widget in group.findChildren((QLineEdit, QComboBox)):
@@ -436,109 +893,248 @@ class MainWindow(QWidget):
         self.solveIVPmaxStepSizeInput.setText("0")
         self.solveIVPevalTimeInput.setText("10")
 
-        self.solverComboBox.setCurrentText("odeint")
-        self.enableODEWidgets()
-
-    def updateTimer(self):
-        currentTime = float(self.timerLabel.text())
-        maxTime = float(self.ODEINTevalTimeInput.text())
-        if currentTime != maxTime:
-            nextTime = str("{:.2f}".format(currentTime + 0.01))
-            self.timerLabel.setText(nextTime)
-        else:
-            self.timer.stop()
-
-        self.ODEINTevalTimeInput.text()
+        #Reset the analytic options:
+        self.analyticNumPointsInput.setText("1000")
+        self.analyticEvalTimeInput.setText("10")
 
-    def startTimer(self):
-        self.timer.start(10)
-        self.timerLabel.setText("0.00")
+        #Reset the auto options:
+        self.autoAccuracyInput.setText("{:g}".format(DEFAULT_ACCURACY))
+        self.autoEvalTimeInput.setText("10")
 
-    def ODEsolver(self):
-        m = float(self.massInput.text())
-        k = float(self.springInput.text())
-        b = float(self.damperInput.text())
-        x0 = float(self.xPosInput.text())
-        v0 = float(self.velocityInput.text())
+        #Reset the propagator options:
+        self.propagatorNumPointsInput.setText("1000")
+        self.propagatorEvalTimeInput.setText("10")
 
-        def dSdx(x, S):
-            x, v = S
-            return [v,
-                    (-b*v + k*(-x))/m]
+        #Reset the output sampling:
+        self.samplingComboBox.setCurrentText("adaptive")
+        self.samplingToleranceInput.setText("{:g}".format(DEFAULT_SAMPLING_TOLERANCE))
 
-        S0 = (x0, v0)
-         #time analyzed, from [first input] seconds
-        #to [second input] seconds, with [third input] number of points
+        self.solverComboBox.setCurrentText("auto")
+        self.enableODEWidgets()
 
+    def solverSettings(self):
+        #Collects the options of the currently selected solver on the "ODE Options" tab
         solverSelected = self.solverComboBox.currentText()
         if solverSelected == "odeint":
-
-            firstStepSize = float(self.ODEINTfirstStepSizeInput.text())
-            minStepSize = float(self.ODEINTminStepSizeInput.text())
-            maxStepSize = float(self.ODEINTmaxStepSizeInput.text())
-            evalTime = float(self.ODEINTevalTimeInput.text())
-            if int(evalTime) == 0:
-                evalTime = 10
-                self.ODEINTevalTimeInput.setText("10")
-            t = linspace(0, evalTime, 1000)
-
-            sol = odeint(dSdx, y0=S0, t=t, tfirst=True, h0=firstStepSize, hmin=minStepSize, hmax=maxStepSize)
-            sol_x = sol.T[0] #horizontal position
-            sol_v = sol.T[1] #velocity
-            sol_a = ((-b*sol_v + k*(-sol_x))/m) #acceleration
-
+            evalTimeInput = self.ODEINTevalTimeInput
+            settings = SolverSettings(solver="odeint",
+                                      firstStep=float(self.ODEINTfirstStepSizeInput.text()),
+                                      minStep=float(self.ODEINTminStepSizeInput.text()),
+                                      maxStep=float(self.ODEINTmaxStepSizeInput.text()),
+                                      evalTime=float(evalTimeInput.text()))
         elif solverSelected == "solve_ivp":
-            methodSelected = self.IVPSolverInput.currentText()
-
-            firstStepSize = float(self.solveIVPfirstStepSizeInput.text())
-            if int(firstStepSize) == 0:
-                firstStepSize = None
-
-            maxStepSize = float(self.solveIVPmaxStepSizeInput.text())
-            if int(maxStepSize) == 0:
-                maxStepSize = inf
-
-            evalTime = float(self.solveIVPevalTimeInput.text())
-            if int(evalTime) == 0:
-                evalTime = 10
-                self.solveIVPevalTimeInput.setText("10")
-
-            t = (0, evalTime)
-            sol = solve_ivp(dSdx, y0=S0, t_span=t, method=methodSelected, first_step=firstStepSize, max_step=maxStepSize)
-            sol_x = sol.y[0] #horizontal position
-            sol_v = sol.y[1] #velocity
-            sol_a = ((-b*sol_v + k*(-sol_x))/m) #acceleration 
-            t = sol.t
-
-        #Energy calcs:
-        kineticEnergy = .5 * m * sol_v**2
-        potentialEnergy = .5 * k * sol_x**2
-        totalEnergy = kineticEnergy + potentialEnergy
-
-        #Frequency and settling time calcs
-        floatNaturalFrequency = (1 / (2 * pi)) * sqrt(k / m)
-        floatDampedNaturalFrequency = floatNaturalFrequency * sqrt(1 - b**2)
-        tau = 1/(b * floatNaturalFrequency)
-        floatSettlingTime = 4 * tau
-
-        self.positionLine1.setData(t, sol_x)
-        self.velocityLine1.setData(t, sol_v)
-        self.accelerationLine1.setData(t, sol_a)
-        self.energyLine1.setData(t, kineticEnergy, pen='g', name='Kinetic Energy')
-        self.energyLine2.setData(t, potentialEnergy, pen='r', name='Potential Energy')
-        self.energyLine3.setData(t, totalEnergy, pen='b', name='Total Energy')
-
-        naturalFrequency = "{:.5f}".format(floatNaturalFrequency)
-        dampedNaturalFrequency = "{:.5f}".format(floatDampedNaturalFrequency)
-        settlingTime = "{:.5f}".format(floatSettlingTime)
+            evalTimeInput = self.solveIVPevalTimeInput
+            settings = SolverSettings(solver="solve_ivp",
+                                      method=self.IVPSolverInput.currentText(),
+                                      firstStep=float(self.solveIVPfirstStepSizeInput.text()),
+                                      maxStep=float(self.solveIVPmaxStepSizeInput.text()),
+                                      evalTime=float(evalTimeInput.text()))
+        elif solverSelected == "analytic":
+            evalTimeInput = self.analyticEvalTimeInput
+            settings = SolverSettings(solver="analytic",
+                                      evalTime=float(evalTimeInput.text()),
+                                      numPoints=int(float(self.analyticNumPointsInput.text())))
+            self.analyticNumPointsInput.setText(str(settings.numPoints))
+        elif solverSelected == "auto":
+            evalTimeInput = self.autoEvalTimeInput
+            settings = SolverSettings(solver="auto",
+                                      evalTime=float(evalTimeInput.text()),
+                                      accuracy=float(self.autoAccuracyInput.text()))
+            self.autoAccuracyInput.setText("{:g}".format(settings.accuracy))
+        elif solverSelected == "propagator":
+            evalTimeInput = self.propagatorEvalTimeInput
+            settings = SolverSettings(solver="propagator",
+                                      evalTime=float(evalTimeInput.text()),
+                                      numPoints=int(float(self.propagatorNumPointsInput.text())))
+            self.propagatorNumPointsInput.setText(str(settings.numPoints))
+
+        settings.compiled = self.compiledCheckBox.isChecked()
+        settings.sampling = self.samplingComboBox.currentText()
+        samplingTolerance = float(self.samplingToleranceInput.text())
+        settings.samplingTolerance = samplingTolerance if samplingTolerance > 0 else DEFAULT_SAMPLING_TOLERANCE
+        self.samplingToleranceInput.setText("{:g}".format(settings.samplingTolerance))
+
+        #Show the fallback evaluation time if the input was not usable
+        if float(evalTimeInput.text()) != settings.evalTime:
+            evalTimeInput.setText("{:g}".format(settings.evalTime))
+        return settings
+
+    def scheduleLiveSolve(self):
+        #Debounced: start() on an active timer restarts it, so a burst of changes gives one solve
+        if self.liveCheckBox.isChecked():
+            self.liveTimer.start(LIVE_INTERVAL_MS)
+
+    def startLiveSolve(self):
+        if self.liveWorker is not None:
+            #The running solve is now stale; its result is dropped and a new solve starts when it finishes
+            self.liveWorker.cancel()
+            self.livePending = True
+            return
+        try:
+            parameters = self.currentParameters()
+            settings = self.solverSettings()
+            forcing = self.currentForcing()
+            forceLaw = self.currentForceLaw()
+        except ValueError:
+            return
+
+        self.liveRequest += 1
+        request = self.liveRequest
+        self.livePending = False
+        self.liveWorker = Worker(self.resultCache.simulate, settings=settings, forcing=forcing, forceLaw=forceLaw,
+                                 **parameters)
+        self.liveWorker.signals.result.connect(lambda result: self.liveSolveFinished(request, result))
+        self.liveWorker.signals.finished.connect(self.liveWorkerDone)
+        QThreadPool.globalInstance().start(self.liveWorker)
+
+    def liveSolveFinished(self, request, result):
+        if request == self.liveRequest:
+            self.showResult(result)
+
+    def liveWorkerDone(self):
+        self.liveWorker = None
+        if self.livePending:
+            self.startLiveSolve()
+
+    def currentParameters(self):
+        return {"m": float(self.massInput.text()),
+                "k": float(self.springInput.text()),
+                "b": float(self.damperInput.text()),
+                "x0": float(self.xPosInput.text()),
+                "v0": float(self.velocityInput.text())}
+
+    def ODEsolver(self):
+        #The Run button. The animation is only rebuilt from a run that succeeded, a failed one leaves the
+        #graphs and the animation of the previous run in place.
+        try:
+            m, k, b, x0, v0 = self.currentParameters().values()
+            settings = self.solverSettings()
+            result = self.resultCache.simulate(m, k, b, x0, v0, settings, self.currentForcing(), self.currentForceLaw())
+        except (ValueError, RuntimeError) as error:
+            #ValueError: unreadable inputs, sampled forcing without samples, or an exact linear solver asked
+            #for a nonlinear force law. RuntimeError: the integration failed, e.g. in a stick-slip phase.
+            QMessageBox.warning(self, "Run", str(error))
+            return None
+        self.showResult(result)
+        self.createAnimationWidget()
+        return result
+
+    def showResult(self, result):
+        t = result.t
+        traces = {self.positionGraph: [(self.positionLine1, result.x)],
+                  self.velocityGraph: [(self.velocityLine1, result.v)],
+                  self.accelerationGraph: [(self.accelerationLine1, result.a)],
+                  self.energyGraph: [(self.energyLine1, result.kineticEnergy),
+                                     (self.energyLine2, result.potentialEnergy),
+                                     (self.energyLine3, result.totalEnergy)]}
+        for graph, lines in traces.items():
+            self.lodPyramids[graph] = [(line, EnvelopePyramid(t, y)) for line, y in lines]
+            self.refreshLOD(graph)
+
+        naturalFrequency = "{:.5f}".format(result.naturalFrequency)
+        dampedNaturalFrequency = "{:.5f}".format(result.dampedNaturalFrequency)
+        events = result.events
+        #Forced and nonlinear runs have no events, and no closed form to compare with
+        unavailable = "n/a (forced)" if getattr(result, "forcing", None) is not None else "n/a (nonlinear)"
         self.natFrequencyOutput.setText(str(naturalFrequency))
         self.dampedNatFrequencyOutput.setText(str(dampedNaturalFrequency))
-        self.settlingTimeOutput.setText(str(settlingTime))
-
-        self.horizontalPositions = sol.T[0]
-        return sol
-    
-app = QApplication(sys.argv)
-window = MainWindow()
-window.show()
-sys.exit(app.exec_())
+        if events is None:
+            self.settlingTimeOutput.setText(unavailable)
+            self.extremaMarkers.setData([], [])
+            self.zeroCrossingMarkers.setData([], [])
+            self.settlingLine.hide()
+        else:
+            settlingTime = "{:.5f}".format(events.settlingTime) if events.settlingTime is not None else "not settled"
+            self.settlingTimeOutput.setText(str(settlingTime))
+            extremaTimes, extremaPositions = zip(*[events.select(kind) for kind in ["maximum", "minimum"]])
+            self.extremaMarkers.setData(concatenate(extremaTimes), concatenate(extremaPositions))
+            self.zeroCrossingMarkers.setData(*events.select("zero crossing"))
+            self.settlingLine.setVisible(events.settlingTime is not None)
+            self.settlingLine.setValue(events.settlingTime or 0)
+        self.samplesOutput.setText("{} (error {:.1e})".format(len(t), result.samplingError()))
+
+        #Error of the numerical solvers against the closed form solution. "auto" runs come back with the
+        #solve_ivp settings that were chosen, they are reported in the auto group box.
+        errorOutputs = {"odeint": self.odeintErrorOutput, "solve_ivp": self.solveIVPErrorOutput,
+                        "propagator": self.propagatorErrorOutput}
+        if self.solverComboBox.currentText() == "auto" and result.settings.solver == "solve_ivp":
+            self.autoMethodOutput.setText("{} (rtol {:.1e})".format(result.settings.method, result.settings.rtol))
+            self.autoStiffnessOutput.setText("{:.3g}".format(float(stiffnessRatio(result.m, result.k, result.b))))
+            errorOutputs["solve_ivp"] = self.autoErrorOutput
+        if result.settings.solver in errorOutputs and events is None:
+            #The closed form is the free response of the linear system
+            errorOutputs[result.settings.solver].setText(unavailable)
+        elif result.settings.solver in errorOutputs:
+            xError, vError = result.analyticError()
+            errorOutputs[result.settings.solver].setText("{:.3e}".format(xError))
+
+        self.horizontalPositions = result.x
+        self.solutionTime = t
+        self.result = result
+        self.updateCacheStats()
+
+    def refreshLOD(self, graph):
+        #Serves about one envelope bin per pixel of the visible range to each line of the graph
+        viewBox = graph.getViewBox()
+        xMin, xMax = viewBox.viewRange()[0]
+        pixels = max(1, int(viewBox.width()))
+        for line, pyramid in self.lodPyramids[graph]:
+            line.setData(*pyramid.view(xMin, xMax, pixels))
+
+    def saveResultButtonPressed(self):
+        if getattr(self, "result", None) is None:
+            return
+        path = QFileDialog.getSaveFileName(self, "Save Run", "", "Result store (directory)")[0]
+        if path:
+            saveRun(path, self.result)
+
+    def openResultButtonPressed(self):
+        path = QFileDialog.getExistingDirectory(self, "Open Result Store")
+        if not path:
+            return
+        try:
+            store = ResultStore(path)
+        except (OSError, ValueError, KeyError) as error:
+            QMessageBox.warning(self, "Open Result Store", "Could not open {}:\n{}".format(path, error))
+            return
+        index = 0
+        if len(store) > 1:
+            #Sweeps are browsed one run at a time, only that run is read from the memory mapped columns
+            index, accepted = QInputDialog.getInt(self, "Open Result Store", "Run (0 - {}):".format(len(store) - 1),
+                                                  0, 0, len(store) - 1)
+            if not accepted:
+                return
+        parameters = store.parameters(index)
+        self.massInput.setText(str(parameters["m"]))
+        self.springInput.setText(str(parameters["k"]))
+        self.damperInput.setText(str(parameters["b"]))
+        self.xPosInput.setText(str(parameters["x0"]))
+        self.velocityInput.setText(str(parameters["v0"]))
+        result = store.result(index)
+        self.showForcing(getattr(result, "forcing", None))
+        self.showForceLaw(getattr(result, "forceLaw", None))
+        self.showResult(result)
+        self.createAnimationWidget()
+
+    def updateCacheStats(self):
+        stats = self.resultCache.stats()
+        self.cacheStatsLabel.setText("Cache: {} runs, {:.1f} MB, {} hits / {} misses".format(
+            stats["entries"], stats["bytes"] / 1024**2, stats["hits"], stats["misses"]))
+
+    def clearCacheButtonPressed(self):
+        self.resultCache.clear()
+        self.updateCacheStats()
+
+    def closeEvent(self, event):
+        if self.persistCacheCheckBox.isChecked():
+            self.resultCache.save()
+        elif os.path.exists(RESULT_CACHE_PATH):
+            os.remove(RESULT_CACHE_PATH)
+        super().closeEvent(event)
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    window = MainWindow()
+    window.show()
+    sys.exit(app.exec_())
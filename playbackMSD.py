@@ -0,0 +1,118 @@
+#Frame precomputation and the playback clock for the animation, kept free of Qt so they can also drive
+#offscreen rendering. A FrameTrack resamples a solver trajectory once onto a uniform frame grid; playback
+#then only has to turn the PlaybackClock's time into a frame index, which is O(1) however long the run is.
+import time as systemTime
+from numpy import asarray, arange, floor, searchsorted, rint, interp
+
+#Pixels per metre and the pixel position of x = 0 in the animation scene
+PIXELS_PER_METRE = 100
+ZERO_OFFSET = 300
+#Scene geometry in scene pixels; shared by the Qt canvas and the offscreen renderer
+SCENE_SIZE = 600
+WALL_X = 90
+WALL_WIDTH = 10
+MASS_SIZE = 100
+MASS_Y = 300
+SPRING_Y = MASS_Y + 30
+DAMPER_Y = MASS_Y + 70
+SPRING_COILS = 10
+DAMPER_LEAD = 20
+DAMPER_LENGTH = 60
+
+def hermiteInterpolate(t, x, v, times):
+    #Cubic Hermite interpolation using the solver's velocities as slopes. Exact for cubics and much
+    #closer to the real motion than straight lines when the solver output is sparse (solve_ivp).
+    #x and v may be (N, T) blocks of N trajectories, the frames then run along the last axis.
+    t = asarray(t, dtype=float)
+    i = searchsorted(t, times, side="right") - 1
+    i = i.clip(0, t.shape[0] - 2)
+    h = t[i + 1] - t[i]
+    s = (times - t[i]) / h
+    h00 = (1 + 2*s) * (1 - s)**2
+    h10 = s * (1 - s)**2
+    h01 = s**2 * (3 - 2*s)
+    h11 = s**2 * (s - 1)
+    return h00 * x[..., i] + h10 * h * v[..., i] + h01 * x[..., i + 1] + h11 * h * v[..., i + 1]
+
+
+class FrameTrack:
+    #Positions of the animated mass for every frame at `fps` frames per second. x (and optionally v)
+    #are the solver output on the time grid t; frame n shows the state at t[0] + n / fps. For a chain x
+    #and v are (N, T) blocks, offset may be one value per mass, and positions is (N, frames).
+    def __init__(self, t, x, v=None, fps=60, scale=PIXELS_PER_METRE, offset=ZERO_OFFSET):
+        t = asarray(t, dtype=float)
+        x = asarray(x, dtype=float)
+        self.fps = float(fps)
+        self.startTime = t[0]
+        self.duration = t[-1] - t[0]
+        self.frameCount = int(floor(self.duration * self.fps + 1e-9)) + 1
+        self.frameTimes = self.startTime + arange(self.frameCount) / self.fps
+        if v is not None and t.shape[0] > 1:
+            self.displacements = hermiteInterpolate(t, x, asarray(v, dtype=float), self.frameTimes)
+        elif x.ndim == 1:
+            self.displacements = interp(self.frameTimes, t, x)
+        else:
+            self.displacements = asarray([interp(self.frameTimes, t, row) for row in x])
+        self.positions = rint(self.displacements * scale + offset).astype(int)
+
+    def __len__(self):
+        return self.frameCount
+
+    def frameIndex(self, time):
+        #Frame shown at `time` seconds into the playback, clamped to the track
+        index = int(time * self.fps + 1e-9)
+        return min(max(index, 0), self.frameCount - 1)
+
+    def positionAt(self, time):
+        return self.positions[..., self.frameIndex(time)]
+
+
+class PlaybackClock:
+    #Simulated time shown by the animation, derived from a monotonic wall clock: a 60 s run takes 60 s
+    #at speed 1 however late the display ticks are, late ticks just skip frames. One clock is shared by
+    #everything that shows the playback position, so they cannot drift apart.
+    def __init__(self, duration=0.0, speed=1.0, now=systemTime.monotonic):
+        self.duration = float(duration)
+        self.speed = float(speed)
+        self.now = now
+        self.anchorTime = 0.0 #playback time at anchorWall
+        self.anchorWall = None #wall time when playback (re)started, None while paused
+
+    def time(self):
+        if self.anchorWall is None:
+            return self.anchorTime
+        return min(self.anchorTime + self.speed * (self.now() - self.anchorWall), self.duration)
+
+    def isRunning(self):
+        return self.anchorWall is not None
+
+    def isFinished(self):
+        return self.time() >= self.duration
+
+    def start(self):
+        #Starts from the beginning again once the end has been reached
+        if self.isFinished():
+            self.anchorTime = 0.0
+        else:
+            self.anchorTime = self.time()
+        self.anchorWall = self.now()
+
+    def pause(self):
+        self.anchorTime = self.time()
+        self.anchorWall = None
+
+    def seek(self, time):
+        self.anchorTime = min(max(float(time), 0.0), self.duration)
+        if self.anchorWall is not None:
+            self.anchorWall = self.now()
+
+    def setSpeed(self, speed):
+        #Re-anchored so a speed change never makes the playback time jump
+        self.anchorTime = self.time()
+        if self.anchorWall is not None:
+            self.anchorWall = self.now()
+        self.speed = float(speed)
+
+    def setDuration(self, duration):
+        self.duration = float(duration)
+        self.anchorTime = min(self.anchorTime, self.duration)
@@ -0,0 +1,192 @@
+#Command line batch runs without Qt, for scripts, CI and cluster jobs. Takes the same inputs as the GUI,
+#either as single values, lists or ranges that are crossed into a parameter grid, or as a CSV/JSON job
+#file with one run per row. Runs with equal solver settings are solved together by sweepMSD.
+#Writes summary.csv and summary.json (system attributes, resonance, metrics, the error against the closed
+#form and the sampling error of the output grid for every run) and the trajectories as storeMSD stores
+#results_<group>, one per group of solver settings.
+#Usage: python runMSD.py --m 0.5:2:4 --k 25 --b 0,0.1,0.5 --x0 1 --solver solve_ivp --method BDF --output out [--workers N]
+#       python runMSD.py --jobs jobs.csv --output out
+import argparse
+import csv
+import json
+import os
+import sys
+from numpy import asarray, linspace, abs as npabs, isfinite, nan
+from solveMSD import (SolverSettings, SOLVERS, IVP_METHODS, DEFAULT_EVAL_TIME, DEFAULT_NUM_POINTS, DEFAULT_ACCURACY,
+                      analyticSolution, systemAttributes, samplingError)
+from batchMSD import BatchResult, parameterGrid, METRICS, ANALYTIC_CHUNK_SIZE
+from sweepMSD import runSweep, batchMethod, DEFAULT_CHUNK_SIZE
+from storeMSD import saveSweep
+from frequencyMSD import resonance
+from forceLawMSD import (ForceLaw, SPRING_LAWS, DAMPER_LAWS, FRICTION_LAWS, DEFAULT_NONLINEARITY, DEFAULT_FRICTION_FORCE,
+                         DEFAULT_SMOOTHING)
+
+PARAMETERS = ["m", "k", "b", "x0", "v0"]
+#Job file columns that override the solver settings given on the command line
+SETTINGS_COLUMNS = {"solver": str, "method": str, "firstStep": float, "minStep": float, "maxStep": float,
+                    "evalTime": float, "numPoints": int, "accuracy": float}
+
+def parseValues(text):
+    #"1.5" -> one value, "1,2,5" -> a list, "0.1:10:50" -> 50 values from 0.1 to 10
+    if ":" in text:
+        start, stop, count = text.split(":")
+        return linspace(float(start), float(stop), int(count))
+    return asarray([float(value) for value in text.split(",")])
+
+def readJobs(path):
+    #List of dicts with the five parameters and optional settings columns, from a .csv or .json file.
+    #JSON may be a list of objects or an object with a "jobs" list.
+    with open(path, newline="") as file:
+        if path.lower().endswith(".json"):
+            jobs = json.load(file)
+            jobs = jobs["jobs"] if isinstance(jobs, dict) else jobs
+        else:
+            jobs = [{key.strip(): value.strip() for key, value in row.items() if value is not None and value.strip() != ""}
+                    for row in csv.DictReader(file)]
+    for number, job in enumerate(jobs, 1):
+        missing = [name for name in PARAMETERS if name not in job]
+        if missing:
+            raise ValueError("Job {} in {} is missing {}".format(number, path, ", ".join(missing)))
+    return jobs
+
+def groupJobs(jobs, defaults):
+    #Groups the jobs by their solver settings: {settings key: (SolverSettings, [job indices])}
+    groups = {}
+    for index, job in enumerate(jobs):
+        options = defaults.asDict()
+        options.update({key: cast(job[key]) for key, cast in SETTINGS_COLUMNS.items() if key in job})
+        settings = SolverSettings(**options)
+        key = tuple(sorted(settings.asDict().items()))
+        groups.setdefault(key, (settings, []))[1].append(index)
+    return list(groups.values())
+
+
+def summarize(result, settings, rows):
+    #One summary dict per parameter row of a single-settings SweepResult. The attributes, resonance and
+    #closed form errors are those of the linear system; with a nonlinear force law the errors are null.
+    batch = BatchResult(result.m, result.k, result.b, result.x0, result.v0, result.t, result.x[0], result.v[0],
+                        batchMethod(settings), result.forceLaw)
+    metrics = {name: metric(batch) for name, metric in METRICS.items()}
+    #Undefined attributes (no damping, no oscillation) are nan and become nulls
+    naturalFrequency, dampedNaturalFrequency, attributeSettlingTime = systemAttributes(batch.m, batch.k, batch.b)
+    resonanceFrequency, peakGain, _, bandwidth = resonance(batch.m, batch.k, batch.b)
+    positionError = []
+    velocityError = []
+    outputSamplingError = []
+    for start in range(0, len(batch), ANALYTIC_CHUNK_SIZE):
+        chunk = slice(start, start + ANALYTIC_CHUNK_SIZE)
+        if batch.forceLaw is not None:
+            positionError.extend([nan] * batch.x[chunk].shape[0])
+            velocityError.extend([nan] * batch.x[chunk].shape[0])
+        else:
+            exactX, exactV, _ = analyticSolution(batch.m[chunk], batch.k[chunk], batch.b[chunk], batch.x0[chunk], batch.v0[chunk], batch.t)
+            positionError.extend(npabs(batch.x[chunk] - exactX).max(axis=1))
+            velocityError.extend(npabs(batch.v[chunk] - exactV).max(axis=1))
+        outputSamplingError.extend(samplingError(batch.t, batch.x[chunk], batch.v[chunk]))
+
+    def number(value):
+        #nan and inf are written as empty CSV cells and JSON nulls
+        return float(value) if isfinite(value) else None
+
+    summaries = []
+    for row in range(len(batch)):
+        summary = {name: float(getattr(batch, name)[row]) for name in PARAMETERS}
+        summary.update(solver=settings.solver, method=settings.method if settings.solver == "solve_ivp" else "",
+                       row=row, naturalFrequency=number(naturalFrequency[row]),
+                       dampedNaturalFrequency=number(dampedNaturalFrequency[row]),
+                       attributeSettlingTime=number(attributeSettlingTime[row]),
+                       resonanceFrequency=number(resonanceFrequency[row]), peakGain=number(peakGain[row]),
+                       bandwidth=number(bandwidth[row]))
+        summary.update({name: number(values[row]) for name, values in metrics.items()})
+        summary.update(maxPositionError=number(positionError[row]), maxVelocityError=number(velocityError[row]),
+                       samplingError=number(outputSamplingError[row]), solved=bool(rows[row]))
+        summaries.append(summary)
+    return summaries
+
+def runJobs(jobs, defaults, outputDir, workers=None, chunkSize=DEFAULT_CHUNK_SIZE, saveTrajectories=True, progress=None,
+            forceLaw=None):
+    #Solves the jobs, all with the same optional forceLaw, and writes the summaries and trajectories to
+    #outputDir. Returns the summaries in job order.
+    os.makedirs(outputDir, exist_ok=True)
+    summaries = [None] * len(jobs)
+    groups = groupJobs(jobs, defaults)
+    for groupIndex, (settings, indices) in enumerate(groups):
+        m, k, b, x0, v0 = [asarray([float(jobs[index][name]) for index in indices]) for name in PARAMETERS]
+        def groupProgress(done, total):
+            if progress is not None:
+                progress(groupIndex, len(groups), done, total)
+        with runSweep(m, k, b, x0, v0, [settings], workers=workers, chunkSize=chunkSize, progress=groupProgress,
+                      forceLaw=forceLaw) as result:
+            resultsFile = "results_{:03d}".format(groupIndex) if saveTrajectories else ""
+            if saveTrajectories:
+                saveSweep(os.path.join(outputDir, resultsFile), result)
+            for index, summary in zip(indices, summarize(result, settings, result.rowsCompleted(0))):
+                summary.update(job=index, resultsFile=resultsFile)
+                summaries[index] = summary
+
+    with open(os.path.join(outputDir, "summary.json"), "w") as file:
+        json.dump(summaries, file, indent=1)
+    with open(os.path.join(outputDir, "summary.csv"), "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(summaries[0].keys()) if summaries else ["job"])
+        writer.writeheader()
+        writer.writerows(summaries)
+    return summaries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless mass-spring-damper runs over a parameter grid or a job file")
+    parser.add_argument("--m", default="1.25", help="mass (kg): a value, a list a,b,c or a range start:stop:count")
+    parser.add_argument("--k", default="25", help="spring constant (N/m), same forms as --m")
+    parser.add_argument("--b", default="0.1", help="damping, same forms as --m")
+    parser.add_argument("--x0", default="1", help="initial position (m), same forms as --m")
+    parser.add_argument("--v0", default="0", help="initial velocity (m/s), same forms as --m")
+    parser.add_argument("--jobs", help="CSV or JSON job file with columns m, k, b, x0, v0 and optionally "
+                                       + ", ".join(SETTINGS_COLUMNS) + "; replaces the grid options")
+    parser.add_argument("--solver", choices=SOLVERS, default="odeint")
+    parser.add_argument("--method", choices=IVP_METHODS, default="RK45", help="solve_ivp method")
+    parser.add_argument("--first-step", type=float, default=0, help="h0 / first_step, 0 lets the solver choose")
+    parser.add_argument("--min-step", type=float, default=0, help="hmin (odeint)")
+    parser.add_argument("--max-step", type=float, default=0, help="hmax / max_step, 0 for no limit")
+    parser.add_argument("--eval-time", type=float, default=DEFAULT_EVAL_TIME, help="simulated seconds")
+    parser.add_argument("--num-points", type=int, default=DEFAULT_NUM_POINTS, help="output samples per run")
+    parser.add_argument("--accuracy", type=float, default=DEFAULT_ACCURACY, help="target accuracy of --solver auto")
+    parser.add_argument("--spring", choices=SPRING_LAWS, default="linear", help="spring law, the cubic ones are Duffing springs")
+    parser.add_argument("--nonlinearity", type=float, default=DEFAULT_NONLINEARITY, help="cubic coefficient of the spring (1/m^2)")
+    parser.add_argument("--damper", choices=DAMPER_LAWS, default="linear", help="quadratic: drag b*v*|v|")
+    parser.add_argument("--friction", choices=[law for law in FRICTION_LAWS if law != "stick-slip"], default="none",
+                        help="Coulomb friction, smoothed by tanh (stick-slip is solved one run at a time, not in batches)")
+    parser.add_argument("--friction-force", type=float, default=DEFAULT_FRICTION_FORCE, help="Coulomb friction force (N)")
+    parser.add_argument("--smoothing", type=float, default=DEFAULT_SMOOTHING, help="velocity scale of smooth friction (m/s)")
+    parser.add_argument("--workers", type=int, default=None, help="solver processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="runs per worker task")
+    parser.add_argument("--summary-only", action="store_true", help="do not write the trajectories")
+    parser.add_argument("--output", required=True, help="output directory")
+    args = parser.parse_args(argv)
+
+    try:
+        defaults = SolverSettings(solver=args.solver, method=args.method, firstStep=args.first_step,
+                                  minStep=args.min_step, maxStep=args.max_step, evalTime=args.eval_time,
+                                  numPoints=args.num_points, accuracy=args.accuracy)
+        forceLaw = ForceLaw(args.spring, args.nonlinearity, args.damper, args.friction, args.friction_force, args.smoothing)
+        if args.jobs:
+            jobs = readJobs(args.jobs)
+        else:
+            grid = parameterGrid(*[parseValues(getattr(args, name)) for name in PARAMETERS])
+            jobs = [dict(zip(PARAMETERS, values)) for values in zip(*grid)]
+    except ValueError as error:
+        parser.error(str(error))
+
+    def progress(group, groups, done, total):
+        sys.stderr.write("\rsettings group {}/{}: {}/{} chunks".format(group + 1, groups, done, total))
+        if done == total:
+            sys.stderr.write("\n")
+
+    try:
+        summaries = runJobs(jobs, defaults, args.output, workers=args.workers, chunkSize=args.chunk_size,
+                            saveTrajectories=not args.summary_only, progress=progress, forceLaw=forceLaw)
+    except ValueError as error:
+        parser.error(str(error))
+    print("Solved {} runs, results in {}".format(len(summaries), args.output))
+
+if __name__ == '__main__':
+    main()
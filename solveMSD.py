@@ -0,0 +1,840 @@
+#Headless simulation core for the mass-spring-damper system. This module only depends on numpy
+#(scipy.integrate is imported when a numerical solver is first used) so that batch workers and
+#scripts can use it without paying for PyQt5, pyqtgraph or matplotlib. numba is optional and only
+#imported when a compiled right hand side is asked for.
+from importlib.util import find_spec
+from numpy import (array, empty_like, asarray, broadcast_arrays, empty, exp, cos, sin, sqrt, log, pi, inf, nan, linspace,
+                   where, errstate, concatenate, ceil, floor, diff, unique, einsum, zeros, flatnonzero, searchsorted, sign,
+                   arange, argsort, arctan2, abs as npabs)
+from numpy.fft import rfft, irfft
+
+SOLVERS = ["odeint", "solve_ivp", "analytic", "auto", "propagator"]
+IVP_METHODS = ["RK45", "RK23", "DOP853", "Radau", "BDF"]
+#solve_ivp methods that use the Jacobian
+IMPLICIT_METHODS = ["Radau", "BDF"]
+NUMBA_AVAILABLE = find_spec("numba") is not None
+DEFAULT_EVAL_TIME = 10
+DEFAULT_NUM_POINTS = 1000
+#"fixed" samples numPoints evenly, "adaptive" sizes the output grid from the dynamics (see adaptiveTimeGrid)
+SAMPLING_MODES = ["fixed", "adaptive"]
+#Largest error of the straight lines drawn between adaptive samples, relative to the amplitude
+DEFAULT_SAMPLING_TOLERANCE = 1e-3
+#Adaptive grids have at least MIN_ADAPTIVE_POINTS over the run and never more than MAX_ADAPTIVE_POINTS
+MIN_ADAPTIVE_POINTS = 100
+MAX_ADAPTIVE_POINTS = 1000000
+#odeint's step limit per output interval (its default is 500). The coarse tail of an adaptive grid can
+#span many periods of a motion that has already died out, which LSODA still resolves step by step.
+ODEINT_MAX_STEPS = 100000
+#Stick-slip runs give up after this many sliding and sticking phases, a guard against endless chatter
+MAX_STICK_SLIP_PHASES = 100000
+#Target error of the "auto" solver, relative to the amplitude of the motion
+DEFAULT_ACCURACY = 1e-6
+#"auto" uses an implicit method once the fastest decay rate is this many times the slowest and an
+#explicit method would need more than STIFF_STEP_COUNT steps just to stay stable
+STIFFNESS_THRESHOLD = 50
+STIFF_STEP_COUNT = 300
+#The settling time is the time the motion enters this band (a fraction of the peak |x|) for good
+SETTLING_BAND = 0.02
+EVENT_KINDS = ["zero crossing", "maximum", "minimum"]
+#Events once the amplitude sqrt(x^2 + m*v^2/k) has decayed below this fraction of the initial one are
+#sign changes of the integration error, not of the motion, and are dropped
+EVENT_FLOOR = 1e-6
+
+#Damping ratios closer to 1 than this are treated as critically damped. Outside this band the
+#under/overdamped formulas divide by sqrt(|zeta^2 - 1|), which loses precision as it approaches 0
+CRITICAL_TOLERANCE = 1e-8
+
+def analyticSolution(m, k, b, x0, v0, t):
+    #Closed form solution of m*x'' + b*x' + k*x = 0, the same system dSdx integrates.
+    #m, k, b, x0 and v0 may be scalars or arrays (they are broadcast together), t is a 1D time grid.
+    #Returns x, v and a with shape (parameter shape) + (len(t),)
+    m, k, b, x0, v0 = broadcast_arrays(*[asarray(value, dtype=float) for value in (m, k, b, x0, v0)])
+    shape = m.shape
+    m, k, b, x0, v0 = [value.reshape(-1, 1) for value in (m, k, b, x0, v0)]
+    t = asarray(t, dtype=float).reshape(1, -1)
+
+    x = empty((m.shape[0], t.shape[1]))
+    v = empty((m.shape[0], t.shape[1]))
+
+    naturalFrequency = sqrt(k / m) #rad/s
+    sigma = b / (2 * m) #decay rate, zeta * naturalFrequency
+    zeta = sigma / naturalFrequency
+
+    underdamped = (zeta < 1 - CRITICAL_TOLERANCE)[:, 0]
+    overdamped = (zeta > 1 + CRITICAL_TOLERANCE)[:, 0]
+    critical = ~(underdamped | overdamped)
+
+    if underdamped.any():
+        i = underdamped
+        wn, s, X0, V0 = naturalFrequency[i], sigma[i], x0[i], v0[i]
+        wd = wn * sqrt(1 - zeta[i]**2)
+        decay = exp(-s * t)
+        c = cos(wd * t)
+        sn = sin(wd * t)
+        x[i] = decay * (X0 * c + (V0 + s * X0) / wd * sn)
+        v[i] = decay * (V0 * c - (s * V0 + wn**2 * X0) / wd * sn)
+
+    if critical.any():
+        i = critical
+        wn, X0, V0 = naturalFrequency[i], x0[i], v0[i]
+        decay = exp(-wn * t)
+        B = V0 + wn * X0
+        x[i] = decay * (X0 + B * t)
+        v[i] = decay * (V0 - wn * B * t)
+
+    if overdamped.any():
+        i = overdamped
+        wn, s, X0, V0 = naturalFrequency[i], sigma[i], x0[i], v0[i]
+        #r2 is computed directly, r1 from r1*r2 = wn^2 to avoid cancellation when zeta is large
+        r2 = -s - sqrt(s**2 - wn**2)
+        r1 = wn**2 / r2
+        C1 = (V0 - r2 * X0) / (r1 - r2)
+        C2 = (r1 * X0 - V0) / (r1 - r2)
+        e1 = exp(r1 * t)
+        e2 = exp(r2 * t)
+        x[i] = C1 * e1 + C2 * e2
+        v[i] = C1 * r1 * e1 + C2 * r2 * e2
+
+    a = (-b*v + k*(-x))/m
+
+    outputShape = shape + (t.shape[1],)
+    return x.reshape(outputShape), v.reshape(outputShape), a.reshape(outputShape)
+
+def maxAbsoluteError(t, sol_x, sol_v, m, k, b, x0, v0):
+    #Largest deviation of a numerical solution from the closed form at the solver's own time points
+    exact_x, exact_v, _ = analyticSolution(m, k, b, x0, v0, t)
+    return float(npabs(sol_x - exact_x).max()), float(npabs(sol_v - exact_v).max())
+
+def makeDerivative(m, k, b, compiled=False, forcing=None):
+    #Right hand side of the state equation S' = f(t, S), S = (x, v). S may also be a (2, n) block of
+    #states, as solve_ivp passes with vectorized=True. A plain list is returned because the solvers
+    #convert the result to an array anyway, building one here only adds a copy per call. compiled uses
+    #the numba version when numba is installed and falls back to this one otherwise. An active
+    #forcingMSD.Forcing adds forcing.scalar(t); the compiled version is free response only.
+    if forcing is not None and forcing.isActive():
+        force = forcing.scalar
+        def forcedDerivative(t, S):
+            x, v = S
+            return [v,
+                    (force(t) - b*v + k*(-x))/m]
+        return forcedDerivative
+    if compiled and NUMBA_AVAILABLE:
+        return compiledDerivative(m, k, b)
+    def dSdx(t, S):
+        x, v = S
+        return [v,
+                (-b*v + k*(-x))/m]
+    return dSdx
+
+def stateMatrix(m, k, b):
+    #The constant Jacobian of dSdx
+    return array([[0.0, 1.0],
+                  [-k/m, -b/m]])
+
+def propagator(m, k, b, dt):
+    #expm(A dt) of the state matrix for every parameter set, shape (N, 2, 2): one exact step of dt
+    from scipy.linalg import expm
+    m, k, b = [value.ravel() for value in broadcast_arrays(*[asarray(value, dtype=float) for value in (m, k, b)])]
+    A = zeros((m.shape[0], 2, 2))
+    A[:, 0, 1] = 1.0
+    A[:, 1, 0] = -k / m
+    A[:, 1, 1] = -b / m
+    return expm(A * dt)
+
+def uniformRuns(t):
+    #(start, stop) index pairs of the evenly spaced stretches of t, stop inclusive. A linspace is one run,
+    #an adaptive grid one per piece.
+    steps = diff(t)
+    if steps.shape[0] == 0:
+        return []
+    breaks = flatnonzero(npabs(diff(steps)) > 1e-9 * steps.max()) + 1
+    edges = concatenate([[0], breaks, [steps.shape[0]]])
+    return [(int(start), int(stop)) for start, stop in zip(edges[:-1], edges[1:])]
+
+def propagate(m, k, b, x0, v0, t):
+    #Exact solution on t by matrix exponential stepping; the system is linear and time invariant, so
+    #every step of dt is the same matrix P = expm(A dt). Each uniform run of t costs one expm and
+    #log2(run length) batched products: with the first n states known, P^n maps them onto the next n.
+    #Shapes as analyticSolution: (parameter shape) + (len(t),).
+    m, k, b, x0, v0 = broadcast_arrays(*[asarray(value, dtype=float) for value in (m, k, b, x0, v0)])
+    shape = m.shape
+    t = asarray(t, dtype=float)
+    states = empty((m.size, 2, t.shape[0]))
+    states[:, 0, 0] = x0.ravel()
+    states[:, 1, 0] = v0.ravel()
+    for start, stop in uniformRuns(t):
+        step = propagator(m, k, b, (t[stop] - t[start]) / (stop - start)) #P^known
+        known = 1
+        count = stop - start + 1
+        while known < count:
+            n = min(known, count - known)
+            states[:, :, start + known:start + known + n] = einsum("nij,njt->nit", step, states[:, :, start:start + n])
+            step = einsum("nij,njk->nik", step, step)
+            known += n
+    outputShape = shape + (t.shape[0],)
+    return states[:, 0].reshape(outputShape), states[:, 1].reshape(outputShape)
+
+def fftConvolve(kernels, signal):
+    #Linear convolutions of each kernel with one signal through real FFTs, O(n log n). The signal is
+    #transformed once. Returns the first len(signal) values of each.
+    size = kernels[0].shape[0] + signal.shape[0] - 1
+    length = 1 << (size - 1).bit_length()
+    signalSpectrum = rfft(signal, length)
+    return [irfft(rfft(kernel, length) * signalSpectrum, length)[:signal.shape[0]] for kernel in kernels]
+
+def forcedResponse(m, k, b, forcing, t):
+    #Response from rest (x = v = 0) to the forcing, for the linear solvers. Steps and impulses use the
+    #closed form from their onset and are exact on any grid. Other inputs are taken as linear between
+    #the points of the evenly spaced grid t (first order hold); the exact discrete system is then
+    #S[n+1] = P S[n] + G0 F[n] + G1 F[n+1], with P, G0 and G1 from one augmented expm. Its solution from
+    #rest is S[n] = sum over j of K[n - j] F[j] - P^n G1 F[0] with the kernel K[i] = P^(i-1) G0 + P^i G1,
+    #one convolution per component, done by FFT.
+    x = zeros(t.shape)
+    v = zeros(t.shape)
+    after = t >= forcing.start
+    if forcing.kind == "step":
+        F = forcing.amplitude
+        tau = t[after] - forcing.start
+        if k > 0:
+            #Free response about the new equilibrium F / k
+            stepX, stepV, _ = analyticSolution(m, k, b, -F / k, 0, tau)
+            x[after] = F / k + stepX
+            v[after] = stepV
+        elif b > 0:
+            #No spring: the velocity relaxes to F / b
+            v[after] = F / b * (1 - exp(-b * tau / m))
+            x[after] = F / b * (tau - m / b * (1 - exp(-b * tau / m)))
+        else:
+            v[after] = F * tau / m
+            x[after] = F * tau**2 / (2 * m)
+    elif forcing.kind == "impulse":
+        x[after], v[after], _ = analyticSolution(m, k, b, 0, forcing.amplitude / m, t[after] - forcing.start)
+    elif t.shape[0] > 1:
+        if len(uniformRuns(t)) > 1:
+            raise ValueError("The linear solvers need an evenly spaced grid for this forcing")
+        from scipy.linalg import expm
+        h = t[1] - t[0]
+        augmented = zeros((4, 4))
+        augmented[:2, :2] = stateMatrix(m, k, b) * h
+        augmented[1, 2] = h / m
+        augmented[2, 3] = 1.0
+        exponential = expm(augmented)
+        gamma1 = exponential[:2, 3]
+        gamma0 = exponential[:2, 2] - gamma1
+        F = forcing(t)
+        holdX, holdV = propagate(m, k, b, gamma1[0], gamma1[1], t) #P^i G1
+        kernelX, kernelV = holdX.copy(), holdV.copy()
+        leadX, leadV = propagate(m, k, b, gamma0[0], gamma0[1], t[:-1]) #P^i G0
+        kernelX[1:] += leadX
+        kernelV[1:] += leadV
+        convolvedX, convolvedV = fftConvolve([kernelX, kernelV], F)
+        x = convolvedX - holdX * F[0]
+        v = convolvedV - holdV * F[0]
+    return x, v
+
+def makeJacobian(m, k, b):
+    #Jacobian callable for odeint's Dfun
+    jacobian = stateMatrix(m, k, b)
+    def Dfun(t, S):
+        return jacobian
+    return Dfun
+
+def _stateDerivative(S, m, k, b):
+    #Kernel of the compiled right hand side, written out element by element for numba
+    dS = empty_like(S)
+    dS[0] = S[1]
+    dS[1] = (-b*S[1] + k*(-S[0]))/m
+    return dS
+
+#_stateDerivative compiled by numba, built on first use (and cached on disk by numba)
+_compiledKernel = []
+
+def compiledDerivative(m, k, b):
+    #makeDerivative's right hand side as a numba nopython function. Raises ImportError without numba.
+    if not _compiledKernel:
+        from numba import njit
+        _compiledKernel.append(njit(cache=True)(_stateDerivative))
+    kernel = _compiledKernel[0]
+    m, k, b = float(m), float(k), float(b)
+    def dSdx(t, S):
+        return kernel(S, m, k, b)
+    return dSdx
+
+def acceleration(m, k, b, x, v):
+    return (-b*v + k*(-x))/m
+
+def energies(m, k, x, v):
+    kineticEnergy = .5 * m * v**2
+    potentialEnergy = .5 * k * x**2
+    totalEnergy = kineticEnergy + potentialEnergy
+    return kineticEnergy, potentialEnergy, totalEnergy
+
+def systemAttributes(m, k, b):
+    #Natural frequency (Hz), damped natural frequency (Hz) and the 4 tau settling time (s), with b the damping
+    #coefficient like everywhere else, so the damping ratio is zeta = b / (2 sqrt(m k)). tau is 1 / |Re(s)| of the
+    #slower eigenvalue. Undefined attributes are nan rather than warnings: every one of them without m > 0 and
+    #k > 0, the damped frequency from critical damping up (no oscillation) and the settling time without damping.
+    #Works elementwise on arrays, scalars give numpy scalars.
+    m, k, b = broadcast_arrays(*[asarray(value, dtype=float) for value in (m, k, b)])
+    defined = (m > 0) & (k > 0)
+    safeM, safeK = where(defined, m, 1.0), where(defined, k, 1.0)
+    omega = sqrt(safeK / safeM)
+    zeta = b / (2 * sqrt(safeM * safeK))
+    oscillating = zeta < 1
+    naturalFrequency = where(defined, omega / (2 * pi), nan)
+    dampedNaturalFrequency = where(defined & oscillating, naturalFrequency * sqrt(where(oscillating, 1 - zeta**2, 0.0)), nan)
+    #zeta - sqrt(zeta^2 - 1) written without the cancellation of heavily overdamped systems
+    decayRate = where(oscillating, zeta * omega, omega / (zeta + sqrt(where(oscillating, 1.0, zeta**2 - 1))))
+    settlingTime = where(defined & (b > 0), 4 / where(decayRate > 0, decayRate, 1.0), nan)
+    return naturalFrequency[()], dampedNaturalFrequency[()], settlingTime[()]
+
+
+def systemEigenvalues(m, k, b):
+    #Eigenvalues of the state matrix [[0, 1], [-k/m, -b/m]], i.e. the roots of m*s^2 + b*s + k
+    m, k, b = [asarray(value, dtype=float) for value in (m, k, b)]
+    sigma = b / (2 * m)
+    root = sqrt(asarray(sigma**2 - k / m, dtype=complex))
+    return -sigma + root, -sigma - root
+
+def stiffnessRatio(m, k, b):
+    #Fastest over slowest decay rate; 1 for underdamped and undamped systems, where both are equal
+    slow, fast = [npabs(eigenvalue.real) for eigenvalue in systemEigenvalues(m, k, b)]
+    with errstate(divide="ignore", invalid="ignore"):
+        return where(fast > 0, fast / slow, 1.0)
+
+def adaptiveTimeGrid(m, k, b, evalTime, tolerance=DEFAULT_SAMPLING_TOLERANCE):
+    #Output times sized from the eigenvalues instead of a fixed count. Linear interpolation between
+    #samples h apart is off by about h^2 |x''| / 8, so a mode exp(lambda t) needs h = sqrt(8 tolerance) / |lambda|,
+    #but only until it has decayed below tolerance, after ln(1 / tolerance) / Re(-lambda). The grid is
+    #piecewise uniform: fine while the fast modes last, coarser once only slow ones are left. m, k, b may
+    #be arrays, the grid then suits all of them.
+    spacings = []
+    lifetimes = []
+    for eigenvalue in systemEigenvalues(m, k, b):
+        eigenvalue = eigenvalue.ravel()
+        speed = npabs(eigenvalue)
+        rate = -eigenvalue.real
+        with errstate(divide="ignore"):
+            spacings.extend(where(speed > 0, sqrt(8 * tolerance) / speed, inf))
+            lifetimes.extend(where(rate > 0, log(2 / tolerance) / rate, inf))
+    spacings = asarray(spacings)
+    lifetimes = asarray(lifetimes)
+    coarsest = evalTime / (MIN_ADAPTIVE_POINTS - 1)
+
+    edges = unique(concatenate([[0.0, evalTime], lifetimes[lifetimes < evalTime]]))
+    counts = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        alive = lifetimes > start
+        spacing = min(coarsest, spacings[alive].min()) if alive.any() else coarsest
+        counts.append(max(1, int(ceil((end - start) / spacing))))
+    if sum(counts) + 1 > MAX_ADAPTIVE_POINTS:
+        #Thinned evenly; samplingError() shows what that costs
+        scale = (MAX_ADAPTIVE_POINTS - 1) / sum(counts)
+        counts = [max(1, int(count * scale)) for count in counts]
+    pieces = [linspace(start, end, count, endpoint=False) for start, end, count in zip(edges[:-1], edges[1:], counts)]
+    return concatenate(pieces + [[evalTime]])
+
+def samplingError(t, x, v):
+    #Largest error of linear interpolation between the samples relative to the peak |x|, estimated from
+    #the cubic Hermite midpoint: the two differ by h (v[i] - v[i + 1]) / 8 on each interval. x and v may be
+    #(N, T) blocks, the estimate is then per row.
+    x = asarray(x, dtype=float)
+    v = asarray(v, dtype=float)
+    chordError = npabs(diff(t) * diff(v, axis=-1)).max(axis=-1) / 8
+    peak = npabs(x).max(axis=-1)
+    with errstate(divide="ignore", invalid="ignore"):
+        return where(peak > 0, chordError / peak, 0.0)
+
+def autoSettings(m, k, b, x0, v0, settings=None):
+    #Concrete solve_ivp settings for solver="auto". Explicit Runge-Kutta unless the eigenvalues are stiff,
+    #then an implicit method; tolerances are derived from settings.accuracy. m, k, b, x0, v0 may be arrays,
+    #the settings then suit the stiffest and most oscillatory of them.
+    settings = settings if settings is not None else SolverSettings(solver="auto")
+    m, k, b, x0, v0 = broadcast_arrays(*[asarray(value, dtype=float) for value in (m, k, b, x0, v0)])
+    fastRate = npabs(systemEigenvalues(m, k, b)[1].real).max()
+    #Explicit Runge-Kutta steps are stable up to about h = 3 / fastRate
+    stabilitySteps = fastRate * settings.evalTime / 3
+    stiff = (stiffnessRatio(m, k, b).max() > STIFFNESS_THRESHOLD
+             and (stabilitySteps > STIFF_STEP_COUNT or settings.accuracy >= 1e-4))
+    naturalFrequency = sqrt(k / m)
+    #The global error grows with every oscillation, so the local tolerance is shared out over the periods,
+    #with a further factor of 4 because the error controllers only estimate the local error
+    periods = (npabs(systemEigenvalues(m, k, b)[0].imag) * settings.evalTime / (2 * pi)).max()
+    rtol = max(0.25 * settings.accuracy / max(1.0, periods), 1e-12)
+    amplitude = sqrt(x0**2 + (v0 / naturalFrequency)**2)
+    amplitude = amplitude[amplitude > 0].min() if (amplitude > 0).any() else 1.0
+    atol = rtol * amplitude * min(1.0, naturalFrequency.min())
+    if stiff:
+        method = "Radau" if settings.accuracy < 1e-4 else "BDF"
+    else:
+        method = "DOP853" if rtol < 1e-5 else "RK45"
+    return SolverSettings(solver="solve_ivp", method=method, firstStep=settings.firstStep, maxStep=settings.maxStep,
+                          evalTime=settings.evalTime, numPoints=settings.numPoints, rtol=rtol, atol=atol,
+                          accuracy=settings.accuracy, compiled=settings.compiled, sampling=settings.sampling,
+                          samplingTolerance=settings.samplingTolerance)
+
+
+class SolverSettings:
+    #The options collected by the "ODE Options" tab. Step sizes and tolerances of 0 leave the value to
+    #the solver, an evaluation time of 0 falls back to DEFAULT_EVAL_TIME. accuracy is only used by
+    #solver="auto", which picks the method, rtol and atol itself (see autoSettings). sampling="adaptive"
+    #replaces the numPoints grid (and solve_ivp's own steps) by adaptiveTimeGrid with samplingTolerance.
+    def __init__(self, solver="odeint", method="RK45", firstStep=0, minStep=0, maxStep=0,
+                 evalTime=DEFAULT_EVAL_TIME, numPoints=DEFAULT_NUM_POINTS, rtol=0, atol=0, accuracy=DEFAULT_ACCURACY,
+                 compiled=False, sampling="fixed", samplingTolerance=DEFAULT_SAMPLING_TOLERANCE):
+        if solver not in SOLVERS:
+            raise ValueError("Unknown solver '{}', expected one of {}".format(solver, SOLVERS))
+        if method not in IVP_METHODS:
+            raise ValueError("Unknown solve_ivp method '{}', expected one of {}".format(method, IVP_METHODS))
+        if sampling not in SAMPLING_MODES:
+            raise ValueError("Unknown sampling '{}', expected one of {}".format(sampling, SAMPLING_MODES))
+        self.solver = solver
+        self.method = method
+        self.firstStep = float(firstStep)
+        self.minStep = float(minStep)
+        self.maxStep = float(maxStep)
+        self.evalTime = float(evalTime) if float(evalTime) > 0 else DEFAULT_EVAL_TIME
+        self.numPoints = int(numPoints) if int(numPoints) >= 2 else DEFAULT_NUM_POINTS
+        self.rtol = float(rtol)
+        self.atol = float(atol)
+        self.accuracy = float(accuracy) if float(accuracy) > 0 else DEFAULT_ACCURACY
+        self.compiled = bool(compiled) #numba right hand side, if numba is installed
+        self.sampling = sampling
+        self.samplingTolerance = float(samplingTolerance) if float(samplingTolerance) > 0 else DEFAULT_SAMPLING_TOLERANCE
+
+    def timeGrid(self, m=None, k=None, b=None, forcing=None):
+        #Output times. Adaptive grids need the system (m, k, b); grids shared by many systems, like those
+        #of sweeps and batches, are always the fixed numPoints grid. A forcing does not decay, so forced
+        #adaptive grids are evenly spaced, fine enough for the fastest mode and for the input.
+        if self.sampling == "adaptive" and m is not None:
+            if forcing is not None and forcing.isActive():
+                fastest = max(npabs(eigenvalue).max() for eigenvalue in systemEigenvalues(m, k, b))
+                spacing = min(sqrt(8 * self.samplingTolerance) / fastest if fastest > 0 else inf,
+                              forcing.spacing(self.samplingTolerance), self.evalTime / (MIN_ADAPTIVE_POINTS - 1))
+                return linspace(0, self.evalTime, min(MAX_ADAPTIVE_POINTS, int(ceil(self.evalTime / spacing)) + 1))
+            return adaptiveTimeGrid(m, k, b, self.evalTime, self.samplingTolerance)
+        return linspace(0, self.evalTime, self.numPoints)
+
+    def tolerances(self):
+        #rtol/atol keyword arguments for odeint and solve_ivp, only the ones that were set
+        return {name: value for name, value in (("rtol", self.rtol), ("atol", self.atol)) if value > 0}
+
+    def odeintOptions(self, m, k, b, jacobian=None):
+        #Keyword arguments for odeint, including the analytic Jacobian (a callable like makeJacobian's,
+        #built for the linear system unless given)
+        return dict(tfirst=True, Dfun=jacobian if jacobian is not None else makeJacobian(m, k, b), h0=self.firstStep,
+                    hmin=self.minStep, hmax=self.maxStep, mxstep=ODEINT_MAX_STEPS, **self.tolerances())
+
+    def solveIVPOptions(self, m, k, b, jacobian=None):
+        #Keyword arguments for solve_ivp. The Jacobian (the constant state matrix unless a callable is
+        #given) is only passed to the implicit methods, the explicit ones have no use for it. With the
+        #exact Jacobian solve_ivp never evaluates blocks of states, so vectorized=True would only add a
+        #reshape to every call and is left off.
+        options = dict(method=self.method, first_step=self.firstStep if self.firstStep > 0 else None,
+                       max_step=self.maxStep if self.maxStep > 0 else inf, **self.tolerances())
+        if self.method in IMPLICIT_METHODS:
+            options["jac"] = jacobian if jacobian is not None else stateMatrix(m, k, b)
+        return options
+
+    def asDict(self):
+        return {"solver": self.solver, "method": self.method, "firstStep": self.firstStep,
+                "minStep": self.minStep, "maxStep": self.maxStep, "evalTime": self.evalTime,
+                "numPoints": self.numPoints, "rtol": self.rtol, "atol": self.atol, "accuracy": self.accuracy,
+                "compiled": self.compiled, "sampling": self.sampling, "samplingTolerance": self.samplingTolerance}
+
+    def __repr__(self):
+        return "SolverSettings({})".format(", ".join("{}={!r}".format(key, value) for key, value in self.asDict().items()))
+
+
+def zeroCrossingEvent(t, S):
+    return S[0]
+
+def extremumEvent(t, S):
+    return S[1]
+
+EVENT_FUNCTIONS = [zeroCrossingEvent, extremumEvent]
+
+
+class EventTable:
+    #Zero crossings and extrema of x in time order, located by solve_ivp's event root finding during the
+    #integration or taken from the closed form rather than by scanning the sampled output, so they fall
+    #between samples where they belong. peak is the largest |x| of the run (x0 or an extremum). settlingTime is the time |x| enters
+    #band * peak for good, None if the run ends before the motion is known to stay inside.
+    def __init__(self, t, kind, x, v, peak, settlingTime, band=SETTLING_BAND):
+        self.t = asarray(t, dtype=float)
+        self.kind = list(kind)
+        self.x = asarray(x, dtype=float)
+        self.v = asarray(v, dtype=float)
+        self.peak = peak
+        self.settlingTime = settlingTime
+        self.band = band
+
+    def __len__(self):
+        return self.t.shape[0]
+
+    def select(self, kind):
+        #Times and positions of one kind of event
+        mask = array([eventKind == kind for eventKind in self.kind], dtype=bool)
+        return self.t[mask], self.x[mask]
+
+    def rows(self):
+        return [{"t": float(t), "kind": kind, "x": float(x), "v": float(v)}
+                for t, kind, x, v in zip(self.t, self.kind, self.x, self.v)]
+
+
+def amplitude(m, k, x, v):
+    #sqrt(2E/k): the largest |x| the motion can reach from state (x, v). Without a spring only |x| is left.
+    return sqrt(x**2 + m * v**2 / k) if k > 0 else abs(x)
+
+def eventTable(sol, m, k, x0, v0, band=SETTLING_BAND):
+    #EventTable from a solve_ivp solution integrated with events=EVENT_FUNCTIONS and dense_output=True
+    zeroTimes, extremumTimes = sol.t_events
+    zeroStates, extremumStates = sol.y_events
+    states = concatenate([zeroStates.reshape(-1, 2), extremumStates.reshape(-1, 2)])
+    kinds = ["zero crossing"] * zeroTimes.shape[0] + ["maximum" if position > 0 else "minimum"
+                                                      for position in extremumStates.reshape(-1, 2)[:, 0]]
+    return collectEvents(concatenate([zeroTimes, extremumTimes]), kinds, states[:, 0], states[:, 1],
+                         lambda time: sol.sol(time)[0], sol.t[0], sol.t[-1], sol.y[:, -1], m, k, x0, v0, band)
+
+def collectEvents(t, kinds, x, v, position, tStart, tEnd, endState, m, k, x0, v0, band=SETTLING_BAND):
+    #EventTable from events in any order. Events at the start time (v0 = 0 is a root of the extremum
+    #event) and below EVENT_FLOOR are dropped. position(time) is x along the run, for the settling time.
+    t, x, v = asarray(t, dtype=float), asarray(x, dtype=float), asarray(v, dtype=float)
+    eventFloor = EVENT_FLOOR * amplitude(m, k, x0, v0)
+    keep = flatnonzero((t > tStart) & (amplitude(m, k, x, v) > eventFloor))
+    order = keep[argsort(t[keep], kind="stable")]
+    t, x, v = t[order], x[order], v[order]
+    kinds = [kinds[i] for i in order]
+
+    extremum = array([kind != "zero crossing" for kind in kinds], dtype=bool)
+    peak = float(max(abs(x0), npabs(x[extremum]).max(initial=0.0)))
+    settling = settlingTime(position, tStart, tEnd, endState, m, k, x0, t, t[extremum], x[extremum], peak, band)
+    return EventTable(t, kinds, x, v, peak, settling, band)
+
+def settlingTime(position, tStart, tEnd, endState, m, k, x0, eventTimes, extremumTimes, extrema, peak, band=SETTLING_BAND):
+    #|x| can only leave the band around the start or an extremum. After the last of those outside the
+    #band x is monotonic up to the next event, so the band edge is bracketed there and found with brentq.
+    #The energy never grows, so the motion stays inside for good once sqrt(2E/k) is inside the band at
+    #the end of the run; otherwise the run is too short to tell and None is returned.
+    limit = band * peak
+    if peak == 0:
+        return 0.0
+    if k <= 0 or amplitude(m, k, *endState) > limit:
+        return None
+    outside = extremumTimes[npabs(extrema) > limit]
+    if outside.shape[0]:
+        start = outside[-1]
+    elif abs(x0) > limit:
+        start = tStart
+    else:
+        return float(tStart)
+    later = eventTimes[eventTimes > start]
+    end = later[0] if later.shape[0] else tEnd
+    from scipy.optimize import brentq
+    return float(brentq(lambda time: abs(position(time)) - limit, start, end))
+
+def oscillationRoots(wd, P, Q, evalTime):
+    #Times in (0, evalTime] where P*cos(wd*t) + Q*sin(wd*t) = R*cos(wd*t - phi) is zero: every half period
+    phase = arctan2(Q, P) + pi / 2
+    n = arange(ceil(-phase / pi), floor((wd * evalTime - phase) / pi) + 1)
+    return (phase + n * pi) / wd
+
+def closedFormEventTimes(m, k, b, x0, v0, evalTime):
+    #Zero crossings of x and of v (the extrema) of the free motion in (0, evalTime], in the regimes of
+    #analyticSolution: an underdamped motion crosses every half period, without oscillation x and v
+    #have at most one root each
+    wn = sqrt(k / m)
+    s = b / (2 * m)
+    zeta = s / wn
+    if zeta < 1 - CRITICAL_TOLERANCE:
+        wd = wn * sqrt(1 - zeta**2)
+        return (oscillationRoots(wd, x0, (v0 + s * x0) / wd, evalTime),
+                oscillationRoots(wd, v0, -(s * v0 + wn**2 * x0) / wd, evalTime))
+    if zeta > 1 + CRITICAL_TOLERANCE:
+        r2 = -s - sqrt(s**2 - wn**2)
+        r1 = wn**2 / r2
+        C1 = (v0 - r2 * x0) / (r1 - r2)
+        C2 = (r1 * x0 - v0) / (r1 - r2)
+        #C1*e^(r1 t) + C2*e^(r2 t) = 0 at e^((r1 - r2) t) = -C2/C1, and likewise for v
+        ratios = [-C2 / C1 if C1 != 0 else 0.0, -C2 * r2 / (C1 * r1) if C1 != 0 else 0.0]
+        roots = [log(ratio) / (r1 - r2) if ratio > 0 else -1.0 for ratio in ratios]
+    else:
+        B = v0 + wn * x0
+        #x = e^(-wn t)*(x0 + B t) and v = e^(-wn t)*(v0 - wn B t)
+        roots = [-x0 / B, v0 / (wn * B)] if B != 0 else [-1.0, -1.0]
+    return tuple(array([root] if 0 < root <= evalTime else [], dtype=float) for root in roots)
+
+def detectEvents(m, k, b, x0, v0, evalTime, band=SETTLING_BAND):
+    #Event table for runs whose solver has no event support (odeint, the closed form, the propagator),
+    #from the closed form event times. Without a spring there is no closed form event list, a tight
+    #DOP853 solve_ivp pass keeps only the events and the dense output instead.
+    if m <= 0 or k <= 0:
+        from scipy.integrate import solve_ivp
+        sol = solve_ivp(makeDerivative(m, k, b), y0=(x0, v0), t_span=(0, evalTime), method="DOP853",
+                        rtol=1e-10, atol=1e-12 * max(abs(x0), abs(v0), 1e-300), events=EVENT_FUNCTIONS, dense_output=True)
+        return eventTable(sol, m, k, x0, v0, band)
+    zeroTimes, extremumTimes = closedFormEventTimes(m, k, b, x0, v0, evalTime)
+    t = concatenate([zeroTimes, extremumTimes, [evalTime]])
+    x, v, _ = analyticSolution(m, k, b, x0, v0, t)
+    kinds = ["zero crossing"] * zeroTimes.shape[0] + ["maximum" if position > 0 else "minimum"
+                                                      for position in x[zeroTimes.shape[0]:-1]]
+    position = lambda time: analyticSolution(m, k, b, x0, v0, [time])[0][0]
+    return collectEvents(t[:-1], kinds, x[:-1], v[:-1], position, 0.0, evalTime, (x[-1], v[-1]), m, k, x0, v0, band)
+
+class SimulationResult:
+    #Trajectory and system attributes of one run. solverStats holds the work counters reported by the
+    #solver (nfev, njev, steps), empty for the closed form. events is the EventTable, found during the
+    #integration for solve_ivp and from the closed form on first access for the other solvers; forced
+    #runs have none, their zero crossings and settling are not those of the free response, and neither
+    #have runs with a nonlinear forceLaw, which the linear event pass cannot follow.
+    def __init__(self, m, k, b, x0, v0, settings, t, x, v, solverStats=None, events=None, forcing=None, forceLaw=None):
+        self.m, self.k, self.b, self.x0, self.v0 = m, k, b, x0, v0
+        self.settings = settings
+        self.forcing = forcing
+        self.forceLaw = forceLaw
+        self.solverStats = solverStats if solverStats is not None else {}
+        self._events = events
+        self.t = t
+        self.x = x #horizontal position
+        self.v = v #velocity
+        if forceLaw is not None:
+            self.a = forceLaw.acceleration(m, k, b, x, v, forcing(t) if forcing is not None else 0.0)
+            self.kineticEnergy = .5 * m * v**2
+            self.potentialEnergy = forceLaw.potentialEnergy(k, x)
+            self.totalEnergy = self.kineticEnergy + self.potentialEnergy
+        else:
+            self.a = acceleration(m, k, b, x, v)
+            if forcing is not None:
+                self.a = self.a + forcing(t) / m
+            self.kineticEnergy, self.potentialEnergy, self.totalEnergy = energies(m, k, x, v)
+        self.naturalFrequency, self.dampedNaturalFrequency, self.settlingTime = systemAttributes(m, k, b)
+
+    def analyticError(self):
+        #Max position and velocity error against the closed form solution
+        return maxAbsoluteError(self.t, self.x, self.v, self.m, self.k, self.b, self.x0, self.v0)
+
+    def samplingError(self):
+        #How far straight lines between the output samples stray from the motion, relative to the peak
+        return float(samplingError(self.t, self.x, self.v))
+
+    @property
+    def events(self):
+        #Results read back from a store or an older cache have no _events yet
+        if getattr(self, "forcing", None) is not None or getattr(self, "forceLaw", None) is not None:
+            return None
+        if getattr(self, "_events", None) is None:
+            self._events = detectEvents(self.m, self.k, self.b, self.x0, self.v0, float(self.t[-1]))
+        return self._events
+
+
+def pieceEdges(t, forcing):
+    #End times of the pieces a forced run is integrated in, the last one is the end of the grid
+    breakpoints = forcing.breakpoints() if forcing is not None else []
+    return sorted(set(time for time in breakpoints if t[0] < time < t[-1])) + [t[-1]]
+
+def integratePiecewise(m, k, b, x0, v0, t, settings, forcing=None, forceLaw=None):
+    #odeint or solve_ivp for forced and nonlinear runs. A forcing is integrated piece by piece between its
+    #breakpoints so no step straddles a jump of the input; impulses are applied as velocity jumps between
+    #pieces. A forceLaw (forceLawMSD.ForceLaw) replaces the linear right hand side and Jacobian by the
+    #ones it generates. Returns x and v on the grid t and the summed solver counters.
+    if forceLaw is not None:
+        dSdx = forceLaw.derivative(m, k, b, settings.compiled, forcing)
+        jacobian = forceLaw.jacobian(m, k, b)
+    else:
+        dSdx = makeDerivative(m, k, b, forcing=forcing)
+        jacobian = None
+    kicks = dict(forcing.kicks()) if forcing is not None else {}
+    x = empty(t.shape)
+    v = empty(t.shape)
+    solverStats = {"nfev": 0, "njev": 0, "steps": 0}
+    S = (x0, v0)
+    start = t[0]
+    first = 0 #first grid index not filled yet
+    for edge in pieceEdges(t, forcing):
+        if start in kicks:
+            S = (S[0], S[1] + kicks[start] / m)
+        last = t.shape[0] if edge == t[-1] else int(searchsorted(t, edge))
+        times = unique(concatenate([[start], t[first:last], [edge]]))
+        if settings.solver == "odeint":
+            from scipy.integrate import odeint
+            sol, info = odeint(dSdx, y0=S, t=times, full_output=True, **settings.odeintOptions(m, k, b, jacobian))
+            pieceX, pieceV = sol.T
+            solverStats["nfev"] += int(info["nfe"][-1])
+            solverStats["njev"] += int(info["nje"][-1])
+            solverStats["steps"] += int(info["nst"][-1])
+        else:
+            from scipy.integrate import solve_ivp
+            #The grid is read off the dense output, like t_eval would, so sol.t keeps the solver's own steps
+            sol = solve_ivp(dSdx, y0=S, t_span=(start, edge), dense_output=True, **settings.solveIVPOptions(m, k, b, jacobian))
+            if not sol.success:
+                raise RuntimeError("solve_ivp failed: {}".format(sol.message))
+            pieceX, pieceV = sol.sol(times)
+            solverStats["nfev"] += int(sol.nfev)
+            solverStats["njev"] += int(sol.njev)
+            solverStats["steps"] += int(sol.t.shape[0] - 1)
+        positions = searchsorted(times, t[first:last])
+        x[first:last] = pieceX[positions]
+        v[first:last] = pieceV[positions]
+        S = (pieceX[-1], pieceV[-1])
+        start = edge
+        first = last
+    return x, v, solverStats
+
+def stickRelease(k, position, start, end, t, forcing, forceLaw):
+    #First time after start (up to end) at which the forcing pulls a mass stuck at position free, and the
+    #direction it slides off in; (end, 0) if it stays stuck. The forcing is checked on the output grid
+    #and the crossing refined with brentq, so pulls shorter than a grid step can be missed.
+    if forcing is None:
+        return end, 0.0
+    spring = forceLaw.springForce(k, position)
+    candidates = t[(t > start) & (t <= end)]
+    if candidates.shape[0] == 0:
+        return end, 0.0
+    exceeded = flatnonzero(npabs(forcing(candidates) - spring) > forceLaw.frictionForce)
+    if exceeded.shape[0] == 0:
+        return end, 0.0
+    index = exceeded[0]
+    before = candidates[index - 1] if index > 0 else start
+    from scipy.optimize import brentq
+    release = brentq(lambda time: abs(forcing.scalar(time) - spring) - forceLaw.frictionForce, before, candidates[index])
+    return float(release), float(sign(forcing.scalar(candidates[index]) - spring))
+
+def integrateStickSlip(m, k, b, x0, v0, t, settings, forcing, forceLaw):
+    #Exact Coulomb friction. The mass slides with friction opposing its motion until v reaches 0, located
+    #by a terminal solve_ivp event; it then sticks while the spring and the forcing stay within
+    #frictionForce and slides off in the direction of the net force once they exceed it. Each sliding
+    #phase is smooth, so no step crosses the jump of sign(v). Phases are integrated with solve_ivp for
+    #the event location, with LSODA when the settings ask for odeint. Forcing breakpoints and impulses are
+    #handled as in integratePiecewise. Returns x and v on the grid t and the summed solver counters.
+    from scipy.integrate import solve_ivp
+    force = forcing.scalar if forcing is not None else (lambda time: 0.0)
+    kicks = dict(forcing.kicks()) if forcing is not None else {}
+    derivatives = {direction: forceLaw.derivative(m, k, b, settings.compiled, forcing, direction) for direction in (-1.0, 1.0)}
+    options = settings.solveIVPOptions(m, k, b, forceLaw.jacobian(m, k, b))
+    if settings.solver == "odeint":
+        options.update(method="LSODA", jac=forceLaw.jacobian(m, k, b))
+    events = {}
+    for direction in (-1.0, 1.0):
+        def stopped(time, S):
+            return S[1]
+        stopped.terminal = True
+        stopped.direction = -direction
+        events[direction] = stopped
+
+    x = empty(t.shape)
+    v = empty(t.shape)
+    solverStats = {"nfev": 0, "njev": 0, "steps": 0}
+    position, velocity = float(x0), float(v0)
+    time = t[0]
+    first = 0 #first grid index not filled yet
+    phases = 0
+    edges = pieceEdges(t, forcing)
+    def covered(end):
+        #Grid points up to end; a point on a piece edge belongs to the next piece, after its impulse
+        return t.shape[0] if end == t[-1] else int(searchsorted(t, end, side="left" if end in edges else "right"))
+
+    for edge in edges:
+        if time in kicks:
+            velocity += kicks[time] / m
+        while time < edge:
+            phases += 1
+            if phases > MAX_STICK_SLIP_PHASES:
+                raise RuntimeError("Stick-slip run did not finish within {} phases".format(MAX_STICK_SLIP_PHASES))
+            direction = float(sign(velocity))
+            if velocity == 0:
+                #At rest the damper is idle and friction holds the mass up to frictionForce
+                net = force(time) - forceLaw.springForce(k, position)
+                direction = float(sign(net))
+                if abs(net) <= forceLaw.frictionForce:
+                    time, direction = stickRelease(k, position, time, edge, t, forcing, forceLaw)
+                    last = covered(time)
+                    x[first:last] = position
+                    v[first:last] = 0.0
+                    first = last
+                    if direction == 0:
+                        continue
+            sol = solve_ivp(derivatives[direction], y0=(position, velocity), t_span=(time, edge),
+                            events=events[direction], dense_output=True, **options)
+            if sol.status < 0:
+                raise RuntimeError("solve_ivp failed in a stick-slip phase: {}".format(sol.message))
+            solverStats["nfev"] += int(sol.nfev)
+            solverStats["njev"] += int(sol.njev)
+            solverStats["steps"] += int(sol.t.shape[0] - 1)
+            time = float(sol.t[-1])
+            last = covered(time)
+            x[first:last], v[first:last] = sol.sol(t[first:last])
+            first = last
+            if sol.status == 1:
+                position, velocity = float(sol.y_events[0][0][0]), 0.0
+            else:
+                position, velocity = float(sol.y[0, -1]), float(sol.y[1, -1])
+    return x, v, solverStats
+
+def simulate(m, k, b, x0, v0, settings=None, forcing=None, forceLaw=None):
+    #forcing: an optional forcingMSD.Forcing driving the mass, see integratePiecewise and forcedResponse.
+    #forceLaw: an optional forceLawMSD.ForceLaw; nonlinear laws are integrated by odeint or solve_ivp
+    #(integratePiecewise, integrateStickSlip) on the fixed numPoints grid, as adaptive grids are sized
+    #from the linear dynamics. "auto" chooses the method for the law linearized at rest.
+    settings = settings if settings is not None else SolverSettings()
+    forcing = forcing if forcing is not None and forcing.isActive() else None
+    forceLaw = forceLaw if forceLaw is not None and not forceLaw.isLinear() else None
+    if forceLaw is not None and settings.solver in ("analytic", "propagator"):
+        raise ValueError("The {} solver is exact for the linear system only, use odeint, solve_ivp or auto "
+                         "with a nonlinear force law".format(settings.solver))
+    if settings.solver == "auto":
+        linearK, linearB = forceLaw.linearization(k, b) if forceLaw is not None else (k, b)
+        settings = autoSettings(m, linearK, linearB, x0, v0, settings)
+    S0 = (x0, v0)
+    events = None
+
+    if forceLaw is not None:
+        t = settings.timeGrid()
+        integrate = integrateStickSlip if forceLaw.isStickSlip() else integratePiecewise
+        sol_x, sol_v, solverStats = integrate(m, k, b, x0, v0, t, settings, forcing, forceLaw)
+
+    elif forcing is not None and settings.solver in ("odeint", "solve_ivp"):
+        t = settings.timeGrid(m, k, b, forcing)
+        sol_x, sol_v, solverStats = integratePiecewise(m, k, b, x0, v0, t, settings, forcing)
+
+    elif settings.solver == "odeint":
+        from scipy.integrate import odeint
+        t = settings.timeGrid(m, k, b)
+        sol, info = odeint(makeDerivative(m, k, b, settings.compiled), y0=S0, t=t, full_output=True,
+                           **settings.odeintOptions(m, k, b))
+        sol_x = sol.T[0]
+        sol_v = sol.T[1]
+        solverStats = {"nfev": int(info["nfe"][-1]), "njev": int(info["nje"][-1]), "steps": int(info["nst"][-1])}
+
+    elif settings.solver == "solve_ivp":
+        from scipy.integrate import solve_ivp
+        sol = solve_ivp(makeDerivative(m, k, b, settings.compiled), y0=S0, t_span=(0, settings.evalTime),
+                        events=EVENT_FUNCTIONS, dense_output=True, **settings.solveIVPOptions(m, k, b))
+        if not sol.success:
+            raise RuntimeError("solve_ivp failed: {}".format(sol.message))
+        sol_x = sol.y[0]
+        sol_v = sol.y[1]
+        t = sol.t
+        solverStats = {"nfev": int(sol.nfev), "njev": int(sol.njev), "steps": int(t.shape[0] - 1)}
+        if settings.sampling == "adaptive":
+            #Resampled from the dense output instead of returning the solver's own steps
+            t = settings.timeGrid(m, k, b)
+            sol_x, sol_v = sol.sol(t)
+        events = eventTable(sol, m, k, x0, v0)
+
+    elif settings.solver == "analytic":
+        t = settings.timeGrid(m, k, b, forcing)
+        sol_x, sol_v, _ = analyticSolution(m, k, b, x0, v0, t)
+        solverStats = {}
+
+    elif settings.solver == "propagator":
+        t = settings.timeGrid(m, k, b, forcing)
+        sol_x, sol_v = propagate(m, k, b, x0, v0, t)
+        solverStats = {"nfev": 0, "njev": 0, "steps": int(t.shape[0] - 1)} #no right hand side evaluations
+
+    if forcing is not None and settings.solver in ("analytic", "propagator"):
+        #Linear system: the forced response from rest adds to the free response
+        forcedX, forcedV = forcedResponse(m, k, b, forcing, t)
+        sol_x = sol_x + forcedX
+        sol_v = sol_v + forcedV
+
+    return SimulationResult(m, k, b, x0, v0, settings, t, sol_x, sol_v, solverStats, events, forcing, forceLaw)
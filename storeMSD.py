@@ -0,0 +1,185 @@
+#Columnar on-disk storage of results. A store is a directory holding one .npy file per column plus
+#metadata.json (kind, parameters, solver settings, column shapes). Columns are written through
+#memory maps and reopened with mmap_mode="r", so a sweep larger than memory can be browsed row by row:
+#indexing a column only reads the pages it touches. A forced run also keeps its forcing, the samples of
+#a sampled one as the columns forcingTimes and forcingValues, and runs and sweeps with a nonlinear force
+#law keep the law. Headless like solveMSD.
+import json
+import os
+from numpy import asarray, load
+from numpy.lib.format import open_memmap
+from solveMSD import SolverSettings, SimulationResult, systemAttributes
+from forcingMSD import Forcing
+from forceLawMSD import ForceLaw
+from streamMSD import streamSimulation, sampleSpacing, DEFAULT_WINDOW_SIZE
+
+STORE_VERSION = 1
+METADATA_FILE = "metadata.json"
+RUN_COLUMNS = ["t", "x", "v", "a", "kineticEnergy", "potentialEnergy", "totalEnergy"]
+PARAMETERS = ["m", "k", "b", "x0", "v0"]
+
+class StoreWriter:
+    #Creates the columns of a new store. metadata.json is written last, on close(), so a store
+    #whose writing was interrupted is not mistaken for a complete one.
+    def __init__(self, path, kind, metadata=None):
+        self.path = path
+        self.metadata = dict(metadata or {}, kind=kind, version=STORE_VERSION, columns={})
+        self.arrays = {}
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, METADATA_FILE)):
+            os.remove(os.path.join(path, METADATA_FILE))
+
+    def column(self, name, shape, dtype=float):
+        #Writable memory map for the column, filled by the caller
+        array = open_memmap(os.path.join(self.path, name + ".npy"), mode="w+", dtype=dtype, shape=tuple(shape))
+        self.arrays[name] = array
+        self.metadata["columns"][name] = {"shape": list(array.shape), "dtype": array.dtype.str}
+        return array
+
+    def write(self, name, values):
+        values = asarray(values)
+        self.column(name, values.shape, values.dtype)[...] = values
+
+    def close(self):
+        for array in self.arrays.values():
+            array.flush()
+        self.arrays = {}
+        temporaryPath = os.path.join(self.path, METADATA_FILE + ".tmp")
+        with open(temporaryPath, "w") as file:
+            json.dump(self.metadata, file, indent=1)
+        os.replace(temporaryPath, os.path.join(self.path, METADATA_FILE))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, *exc):
+        if excType is None:
+            self.close()
+
+
+def saveRun(path, result):
+    #One SimulationResult, all of its columns
+    metadata = {"parameters": {name: float(getattr(result, name)) for name in PARAMETERS},
+                "settings": result.settings.asDict(), "length": int(result.t.shape[0])}
+    forcing = getattr(result, "forcing", None)
+    if forcing is not None:
+        metadata["forcing"] = forcing.asDict()
+    if getattr(result, "forceLaw", None) is not None:
+        metadata["forceLaw"] = result.forceLaw.asDict()
+    with StoreWriter(path, "run", metadata) as writer:
+        for name in RUN_COLUMNS:
+            writer.write(name, getattr(result, name))
+        if forcing is not None and forcing.kind == "sampled":
+            writer.write("forcingTimes", forcing.times)
+            writer.write("forcingValues", forcing.values)
+
+def saveStream(path, m, k, b, x0, v0, settings=None, dt=None, windowSize=DEFAULT_WINDOW_SIZE):
+    #Integrates with streamSimulation straight into a run store, one window in memory at a time
+    settings = settings if settings is not None else SolverSettings()
+    dt, totalSamples = sampleSpacing(settings, dt)
+    metadata = {"parameters": {"m": m, "k": k, "b": b, "x0": x0, "v0": v0}, "settings": settings.asDict(),
+                "length": totalSamples, "dt": dt}
+    with StoreWriter(path, "run", metadata) as writer:
+        columns = [writer.column(name, (totalSamples,)) for name in RUN_COLUMNS]
+        start = 0
+        for chunk in streamSimulation(m, k, b, x0, v0, settings, dt, windowSize):
+            for name, column in zip(RUN_COLUMNS, columns):
+                column[start:start + len(chunk)] = getattr(chunk, name)
+            start += len(chunk)
+
+def saveSweep(path, sweep):
+    #A SweepResult: x and v as (settings, N, T) blocks, the parameter columns and the chunk completion
+    #mask. Acceleration and energies are derived on readback to keep the store small.
+    metadata = {"settingsList": [settings.asDict() for settings in sweep.settingsList],
+                "chunkSize": sweep.chunkSize, "cancelled": bool(sweep.cancelled)}
+    if getattr(sweep, "forceLaw", None) is not None:
+        metadata["forceLaw"] = sweep.forceLaw.asDict()
+    with StoreWriter(path, "sweep", metadata) as writer:
+        writer.write("t", sweep.t)
+        for name in PARAMETERS:
+            writer.write(name, getattr(sweep, name))
+        writer.write("completed", sweep.completed)
+        for name in ["x", "v"]:
+            values = getattr(sweep, name)
+            column = writer.column(name, values.shape)
+            for settingsIndex in range(values.shape[0]):
+                column[settingsIndex] = values[settingsIndex]
+
+
+class ResultStore:
+    #Read-only view of a store. Columns are memory maps, loaded on first access.
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, METADATA_FILE)) as file:
+            self.metadata = json.load(file)
+        if self.metadata.get("version", 0) > STORE_VERSION:
+            raise ValueError("{} was written by a newer version (store version {})".format(path, self.metadata["version"]))
+        self.kind = self.metadata["kind"]
+        self._columns = {}
+
+    @property
+    def columns(self):
+        return list(self.metadata["columns"])
+
+    def __getitem__(self, name):
+        if name not in self.metadata["columns"]:
+            raise KeyError("{} has no column '{}'".format(self.path, name))
+        if name not in self._columns:
+            self._columns[name] = load(os.path.join(self.path, name + ".npy"), mmap_mode="r")
+        return self._columns[name]
+
+    def __len__(self):
+        #Number of runs: 1 for a run store, settings x parameter sets for a sweep
+        if self.kind == "run":
+            return 1
+        return len(self.metadata["settingsList"]) * self["m"].shape[0]
+
+    def parameters(self, index=0):
+        if self.kind == "run":
+            return dict(self.metadata["parameters"])
+        row = index % self["m"].shape[0]
+        return {name: float(self[name][row]) for name in PARAMETERS}
+
+    def forcing(self):
+        #The Forcing of a forced run store, None for free response runs and sweeps
+        options = self.metadata.get("forcing")
+        if options is None:
+            return None
+        if options["kind"] == "sampled":
+            return Forcing(times=asarray(self["forcingTimes"]), values=asarray(self["forcingValues"]), **options)
+        return Forcing(**options)
+
+    def forceLaw(self):
+        #The nonlinear ForceLaw of the run or sweep, None for the linear system
+        options = self.metadata.get("forceLaw")
+        return ForceLaw(**options) if options is not None else None
+
+    def settings(self, index=0):
+        if self.kind == "run":
+            return SolverSettings(**self.metadata["settings"])
+        return SolverSettings(**self.metadata["settingsList"][index // self["m"].shape[0]])
+
+    def result(self, index=0):
+        #SimulationResult of run `index`; for a sweep runs are numbered settings-major. Only that run's
+        #rows are read from disk. Stored derived columns are used as they are.
+        parameters = self.parameters(index)
+        settings = self.settings(index)
+        if self.kind == "run":
+            result = SimulationResult.__new__(SimulationResult)
+            result.m, result.k, result.b, result.x0, result.v0 = [parameters[name] for name in PARAMETERS]
+            result.settings = settings
+            result.forcing = self.forcing()
+            result.forceLaw = self.forceLaw()
+            result.solverStats = {}
+            for name in RUN_COLUMNS:
+                setattr(result, name, self[name])
+            result.naturalFrequency, result.dampedNaturalFrequency, result.settlingTime = systemAttributes(result.m, result.k, result.b)
+            return result
+        settingsIndex, row = divmod(index, self["m"].shape[0])
+        return SimulationResult(*[parameters[name] for name in PARAMETERS], settings, self["t"],
+                                asarray(self["x"][settingsIndex, row]), asarray(self["v"][settingsIndex, row]),
+                                forceLaw=self.forceLaw())
+
+
+def openStore(path):
+    return ResultStore(path)
@@ -0,0 +1,130 @@
+#Streaming integration for long evaluation times. streamSimulation integrates one time window at a
+#time, starting each window from the state at the end of the previous one, and yields the samples
+#as SimulationChunks so consumers never hold more than one window in memory.
+from numpy import arange, array, column_stack, savetxt, inf, abs as npabs
+from solveMSD import (SolverSettings, autoSettings, analyticSolution, propagate, makeDerivative, acceleration, energies,
+                      amplitude)
+
+DEFAULT_WINDOW_SIZE = 10000
+
+class SimulationChunk:
+    #Uniformly spaced samples of one window, with the same attribute names as SimulationResult
+    def __init__(self, m, k, b, t, x, v):
+        self.m, self.k, self.b = m, k, b
+        self.t = t
+        self.x = x
+        self.v = v
+        self.a = acceleration(m, k, b, x, v)
+        self.kineticEnergy, self.potentialEnergy, self.totalEnergy = energies(m, k, x, v)
+
+    def __len__(self):
+        return self.t.shape[0]
+
+
+def sampleSpacing(settings, dt=None):
+    #Sample spacing and total number of samples streamSimulation produces for these settings
+    dt = dt if dt is not None else settings.evalTime / (settings.numPoints - 1)
+    return dt, int(round(settings.evalTime / dt)) + 1
+
+def streamSimulation(m, k, b, x0, v0, settings=None, dt=None, windowSize=DEFAULT_WINDOW_SIZE):
+    #Yields SimulationChunks covering 0 to settings.evalTime with sample spacing dt, windowSize samples
+    #per chunk (the last one may be shorter). dt defaults to the spacing of settings.timeGrid().
+    settings = settings if settings is not None else SolverSettings()
+    if settings.solver == "auto":
+        settings = autoSettings(m, k, b, x0, v0, settings)
+    dt, totalSamples = sampleSpacing(settings, dt)
+    windowSize = max(2, int(windowSize))
+
+    if settings.solver == "odeint":
+        from scipy.integrate import odeint
+        dSdx = makeDerivative(m, k, b, settings.compiled)
+        options = settings.odeintOptions(m, k, b)
+        def advance(S, t):
+            sol = odeint(dSdx, y0=S, t=t, **options)
+            return sol.T[0], sol.T[1]
+    elif settings.solver == "solve_ivp":
+        from scipy.integrate import solve_ivp
+        dSdx = makeDerivative(m, k, b, settings.compiled)
+        options = settings.solveIVPOptions(m, k, b)
+        def advance(S, t):
+            sol = solve_ivp(dSdx, y0=S, t_span=(t[0], t[-1]), t_eval=t, **options)
+            return sol.y[0], sol.y[1]
+    elif settings.solver == "propagator":
+        #Windows are evenly spaced, so each one is a single run of exact expm(A dt) steps
+        def advance(S, t):
+            return propagate(m, k, b, S[0], S[1], t)
+    else:
+        #The closed form restarted from each window's initial state is exact, so no error builds up
+        def advance(S, t):
+            x, v, _ = analyticSolution(m, k, b, S[0], S[1], t - t[0])
+            return x, v
+
+    S = (x0, v0)
+    start = 0
+    while start < totalSamples:
+        stop = min(start + windowSize, totalSamples)
+        #One extra sample at the end of each window carries the state into the next window
+        carry = 1 if stop < totalSamples else 0
+        t = arange(start, stop + carry) * dt
+        if t.shape[0] == 1:
+            x, v = array([S[0]]), array([S[1]])
+        else:
+            x, v = advance(S, t)
+        S = (x[-1], v[-1])
+        yield SimulationChunk(m, k, b, t[:stop - start], x[:stop - start], v[:stop - start])
+        start = stop
+
+
+class StreamSummary:
+    #Incremental analyzer: feed it chunks with update() to track peaks, the final energy and the last
+    #time the position was outside a band around 0, all in constant memory. finalAmplitude is
+    #sqrt(x^2 + m*v^2/k) at the end of the run, the largest |x| the motion can still reach (inf without a spring).
+    def __init__(self, band=0.02):
+        self.band = band
+        self.samples = 0
+        self.peakPosition = 0.0
+        self.peakVelocity = 0.0
+        self.peakAcceleration = 0.0
+        self.initialEnergy = None
+        self.finalEnergy = None
+        self.endTime = None
+        self.lastOutsideBand = None
+        self.finalAmplitude = None
+
+    def update(self, chunk):
+        if self.initialEnergy is None:
+            self.initialEnergy = float(chunk.totalEnergy[0])
+        self.samples += len(chunk)
+        self.peakPosition = max(self.peakPosition, float(npabs(chunk.x).max()))
+        self.peakVelocity = max(self.peakVelocity, float(npabs(chunk.v).max()))
+        self.peakAcceleration = max(self.peakAcceleration, float(npabs(chunk.a).max()))
+        self.finalEnergy = float(chunk.totalEnergy[-1])
+        self.endTime = float(chunk.t[-1])
+        self.finalAmplitude = float(amplitude(chunk.m, chunk.k, chunk.x[-1], chunk.v[-1])) if chunk.k > 0 else inf
+        #The band is relative to the running peak. That is exact for the whole run: a new peak is outside
+        #its own band, so it replaces every lastOutsideBand found against a lower one.
+        outside = (npabs(chunk.x) > self.band * self.peakPosition).nonzero()[0]
+        if outside.size:
+            self.lastOutsideBand = float(chunk.t[outside[-1]])
+        return chunk
+
+    def settlingTime(self):
+        #None unless the motion is known to stay inside the band after the run, like
+        #solveMSD.settlingTime: a last sample inside the band may just be a zero crossing
+        if self.lastOutsideBand is None:
+            return 0.0
+        if self.finalAmplitude > self.band * self.peakPosition:
+            return None
+        return self.lastOutsideBand
+
+
+def writeCSV(chunks, path):
+    #Streams chunks to a CSV file, one row per sample. Returns the number of rows written.
+    rows = 0
+    with open(path, "w") as file:
+        file.write("t,x,v,a,kineticEnergy,potentialEnergy,totalEnergy\n")
+        for chunk in chunks:
+            savetxt(file, column_stack([chunk.t, chunk.x, chunk.v, chunk.a, chunk.kineticEnergy,
+                                        chunk.potentialEnergy, chunk.totalEnergy]), delimiter=",", fmt="%.10g")
+            rows += len(chunk)
+    return rows
@@ -0,0 +1,152 @@
+#Multi-core parameter sweeps. The grid of parameter sets is crossed with a list of SolverSettings
+#(e.g. one per solve_ivp method), split into chunks and solved by batchMSD in a process pool.
+#Workers write straight into shared memory, so nothing but chunk indices travels between processes.
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from numpy import ndarray, zeros, asarray
+from solveMSD import SolverSettings
+from batchMSD import batchSolve, broadcastParameters
+
+DEFAULT_CHUNK_SIZE = 512
+
+def batchMethod(settings):
+    #The batchSolve method that matches a SolverSettings
+    if settings.solver == "solve_ivp":
+        return settings.method
+    return settings.solver
+
+
+class SweepResult:
+    #x and v are (number of settings, N, T) arrays backed by shared memory. completed[s, c] tells
+    #whether chunk c of settings s was solved; rows of unfinished chunks are left at 0. forceLaw is the
+    #sweep's nonlinear force law, None for the linear system.
+    def __init__(self, m, k, b, x0, v0, t, settingsList, chunkSize, sharedBlock, completed, cancelled, forceLaw=None):
+        self.m, self.k, self.b, self.x0, self.v0 = m, k, b, x0, v0
+        self.forceLaw = forceLaw
+        self.t = t
+        self.settingsList = settingsList
+        self.chunkSize = chunkSize
+        self.completed = completed
+        self.cancelled = cancelled
+        self._sharedBlock = sharedBlock
+        shape = (len(settingsList), m.shape[0], t.shape[0])
+        self.x = ndarray(shape, dtype=float, buffer=sharedBlock.buf)
+        self.v = ndarray(shape, dtype=float, buffer=sharedBlock.buf, offset=self.x.nbytes)
+
+    def rowsCompleted(self, settingsIndex):
+        #Boolean mask of the parameter rows that were solved with settingsList[settingsIndex]
+        mask = zeros(self.m.shape[0], dtype=bool)
+        for chunk, done in enumerate(self.completed[settingsIndex]):
+            mask[chunk * self.chunkSize:(chunk + 1) * self.chunkSize] = done
+        return mask
+
+    def release(self):
+        #Frees the shared memory. x and v must not be used afterwards, copy them first if needed.
+        if self._sharedBlock is not None:
+            self.x = self.v = None
+            self._sharedBlock.close()
+            self._sharedBlock.unlink()
+            self._sharedBlock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+#Worker process state, set once per process by _initWorker so each task only carries indices
+_worker = {}
+
+def _initWorker(blockName, shape, parameters, t, settingsList, forceLaw=None):
+    block = shared_memory.SharedMemory(name=blockName)
+    x = ndarray(shape, dtype=float, buffer=block.buf)
+    v = ndarray(shape, dtype=float, buffer=block.buf, offset=x.nbytes)
+    _worker.update(block=block, x=x, v=v, parameters=parameters, t=t, settingsList=settingsList, forceLaw=forceLaw)
+
+def _solveChunk(settingsIndex, start, stop):
+    settings = _worker["settingsList"][settingsIndex]
+    m, k, b, x0, v0 = [value[start:stop] for value in _worker["parameters"]]
+    out = (_worker["x"][settingsIndex, start:stop], _worker["v"][settingsIndex, start:stop])
+    batchSolve(m, k, b, x0, v0, t=_worker["t"], method=batchMethod(settings), settings=settings, out=out,
+               forceLaw=_worker["forceLaw"])
+    return settingsIndex, start
+
+
+class SweepRunner:
+    #Runs one sweep. progress(done, total) is called from the thread running run() as chunks finish;
+    #cancel() may be called from any thread and stops scheduling new chunks. forceLaw is an optional
+    #nonlinear forceLawMSD.ForceLaw shared by every run of the sweep.
+    def __init__(self, m, k, b, x0, v0, settingsList=None, t=None, workers=None, chunkSize=DEFAULT_CHUNK_SIZE, progress=None,
+                 forceLaw=None):
+        self.m, self.k, self.b, self.x0, self.v0 = broadcastParameters(m, k, b, x0, v0)
+        self.settingsList = list(settingsList) if settingsList is not None else [SolverSettings(solver="analytic")]
+        #All settings share one output grid so results can be compared cell by cell
+        self.t = asarray(t, dtype=float) if t is not None else self.settingsList[0].timeGrid()
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.chunkSize = max(1, int(chunkSize))
+        self.progress = progress
+        #A linear law is the linear system: kept as None so the runs, summaries and stores stay linear
+        self.forceLaw = forceLaw if forceLaw is not None and not forceLaw.isLinear() else None
+        self._cancelEvent = threading.Event()
+
+    def cancel(self):
+        self._cancelEvent.set()
+
+    def chunks(self):
+        N = self.m.shape[0]
+        return [(s, start, min(start + self.chunkSize, N))
+                for s in range(len(self.settingsList)) for start in range(0, N, self.chunkSize)]
+
+    def run(self):
+        shape = (len(self.settingsList), self.m.shape[0], self.t.shape[0])
+        nbytes = 2 * 8 * shape[0] * shape[1] * shape[2]
+        block = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        chunks = self.chunks()
+        chunksPerSettings = -(-self.m.shape[0] // self.chunkSize)
+        completed = zeros((len(self.settingsList), chunksPerSettings), dtype=bool)
+        parameters = (self.m, self.k, self.b, self.x0, self.v0)
+        initArgs = (block.name, shape, parameters, self.t, self.settingsList, self.forceLaw)
+
+        def finished(settingsIndex, start):
+            completed[settingsIndex, start // self.chunkSize] = True
+            if self.progress is not None:
+                self.progress(int(completed.sum()), len(chunks))
+
+        try:
+            if self.workers <= 1:
+                #Solve in this process against the same shared block, no pool needed
+                _initWorker(*initArgs)
+                try:
+                    for chunk in chunks:
+                        if self._cancelEvent.is_set():
+                            break
+                        finished(*_solveChunk(*chunk))
+                finally:
+                    workerBlock = _worker.pop("block")
+                    _worker.clear()
+                    workerBlock.close()
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers, initializer=_initWorker, initargs=initArgs) as pool:
+                    futures = [pool.submit(_solveChunk, *chunk) for chunk in chunks]
+                    for future in as_completed(futures):
+                        if self._cancelEvent.is_set():
+                            #Chunks already running finish, everything still queued is dropped
+                            for pending in futures:
+                                pending.cancel()
+                            break
+                        finished(*future.result())
+        except BaseException:
+            block.close()
+            block.unlink()
+            raise
+
+        return SweepResult(self.m, self.k, self.b, self.x0, self.v0, self.t, self.settingsList, self.chunkSize,
+                           block, completed, self._cancelEvent.is_set(), self.forceLaw)
+
+
+def runSweep(m, k, b, x0, v0, settingsList=None, t=None, workers=None, chunkSize=DEFAULT_CHUNK_SIZE, progress=None,
+             forceLaw=None):
+    return SweepRunner(m, k, b, x0, v0, settingsList, t, workers, chunkSize, progress, forceLaw).run()
@@ -0,0 +1,4 @@
+#The modules live at the top of the repository rather than in a package, so the tests import them from there
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
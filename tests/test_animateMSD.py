@@ -0,0 +1,27 @@
+#The animation canvas paints the mass where the frame track puts it
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QApplication
+from animateMSD import AnimationWidget
+from playbackMSD import MASS_SIZE, MASS_Y
+from solveMSD import SolverSettings, simulate
+
+app = QApplication.instance() or QApplication([])
+
+def massColumns(widget):
+    #Columns of the pure red pixels across the middle of the mass
+    image = widget.grab().toImage()
+    row = MASS_Y + MASS_SIZE // 2
+    red = QColor(255, 0, 0).rgb()
+    return [column for column in range(image.width()) if image.pixel(column, row) == red]
+
+def test_seeking_moves_the_painted_mass():
+    result = simulate(1.25, 25, 0.1, 1.0, 0.0, SolverSettings("analytic"))
+    widget = AnimationWidget(1.25, 25, 0.1, 1.0, 0.0, result.t, result.x, result.v, events=result.events)
+    #x = 1, -0.97 and -0.81 m
+    for time in [0.0, 0.7, 2.0]:
+        widget.seek(time)
+        columns = massColumns(widget)
+        assert columns[0] == widget.massPosition
+        assert len(columns) == MASS_SIZE
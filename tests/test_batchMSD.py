@@ -0,0 +1,27 @@
+#Batches solve every row of a parameter grid as the single mass solver would solve it on its own
+import pytest
+from numpy import abs as npabs, isnan
+from batchMSD import batchSolve, parameterGrid, settlingTime
+from solveMSD import SolverSettings, simulate
+
+#Under, critically and overdamped rows on one shared grid
+GRID = parameterGrid([0.5, 1.0], [4.0, 25.0], [0.1, 4.0, 30.0], 1.0, [0.0, -2.0])
+SETTINGS = SolverSettings(evalTime=5, numPoints=400, rtol=1e-10, atol=1e-12)
+
+@pytest.mark.parametrize("method", ["analytic", "odeint", "DOP853", "propagator"])
+def test_every_row_matches_its_own_run(method):
+    batch = batchSolve(*GRID, method=method, settings=SETTINGS)
+    assert batch.x.shape == (len(GRID[0]), SETTINGS.numPoints)
+    for row, (m, k, b, x0, v0) in enumerate(zip(*GRID)):
+        single = simulate(m, k, b, x0, v0, SolverSettings("analytic", evalTime=5, numPoints=400))
+        assert npabs(batch.x[row] - single.x).max() < 1e-6, (m, k, b, v0)
+
+def test_settling_time_needs_the_envelope_inside_the_band():
+    #After 10 s this lightly damped run still swings at about 0.37 of x0, but its last sample lands next to
+    #a zero crossing, well inside the 2% band
+    unsettled = batchSolve(0.5, 25, 0.1, 1.0, 0.0)
+    assert abs(unsettled.x[0, -1]) < 0.02
+    assert isnan(settlingTime(unsettled)[0])
+    settled = batchSolve(1.25, 25, 2.0, 1.0, 0.0, method="odeint")
+    events = simulate(1.25, 25, 2.0, 1.0, 0.0, SolverSettings("analytic")).events
+    assert settlingTime(settled)[0] == pytest.approx(events.settlingTime, abs=0.01)
@@ -0,0 +1,23 @@
+#The LRU result cache and its keys
+from cacheMSD import ResultCache, cacheKey, resultBytes
+from forceLawMSD import ForceLaw
+from forcingMSD import Forcing
+from solveMSD import SolverSettings, simulate
+
+def test_least_recently_used_run_is_evicted():
+    settings = SolverSettings("analytic", numPoints=100)
+    runs = {k: simulate(1.0, k, 0.1, 1.0, 0.0, settings) for k in (10, 20, 30)}
+    cache = ResultCache(maxBytes=2 * resultBytes(runs[10]))
+    for k in (10, 20):
+        cache.put(cacheKey(1.0, k, 0.1, 1.0, 0.0, settings), runs[k])
+    assert cache.simulate(1.0, 10, 0.1, 1.0, 0.0, settings) is runs[10]
+    cache.put(cacheKey(1.0, 30, 0.1, 1.0, 0.0, settings), runs[30])
+    assert cacheKey(1.0, 20, 0.1, 1.0, 0.0, settings) not in cache
+    assert cache.stats()["hits"] == 1 and cache.stats()["evictions"] == 1
+
+def test_key_keeps_the_grid_of_forced_and_nonlinear_runs():
+    coarse, fine = SolverSettings("solve_ivp", numPoints=100), SolverSettings("solve_ivp", numPoints=200)
+    #A free linear solve_ivp run returns the solver's own steps whatever numPoints is
+    assert cacheKey(1, 25, 0.1, 1, 0, coarse) == cacheKey(1, 25, 0.1, 1, 0, fine)
+    for forcing, forceLaw in [(Forcing("step"), None), (None, ForceLaw("hardening"))]:
+        assert cacheKey(1, 25, 0.1, 1, 0, coarse, forcing, forceLaw) != cacheKey(1, 25, 0.1, 1, 0, fine, forcing, forceLaw)
@@ -0,0 +1,28 @@
+#Chains: one mass is the single mass system, and the modal solution agrees with integrating the chain
+import pytest
+from numpy import zeros, linspace, abs as npabs
+from chainMSD import Chain, uniformChain, simulateChain
+from solveMSD import SolverSettings, analyticSolution
+
+def test_single_mass_chain():
+    result = simulateChain(uniformChain(1, 1.25, 25, 0.1), 1.0, 0.5, settings=SolverSettings(evalTime=5, numPoints=501))
+    x, v, _ = analyticSolution(1.25, 25, 0.1, 1.0, 0.5, result.t)
+    assert npabs(result.x[0] - x).max() < 1e-12
+    assert npabs(result.v[0] - v).max() < 1e-12
+
+@pytest.mark.parametrize("fixedEnd", [False, True])
+def test_modal_solution_matches_integration(fixedEnd):
+    chain = uniformChain(12, 0.5, 40, 0.2, fixedEnd=fixedEnd)
+    x0 = zeros(12)
+    x0[0] = 0.1
+    v0 = linspace(-0.2, 0.2, 12)
+    settings = SolverSettings(evalTime=5, numPoints=200, rtol=1e-10, atol=1e-12)
+    modal = simulateChain(chain, x0, v0, "modal", settings)
+    integrated = simulateChain(chain, x0, v0, "DOP853", settings)
+    assert npabs(modal.x - integrated.x).max() < 1e-7
+
+def test_non_proportional_damping_is_integrated():
+    chain = Chain([1.0, 2.0], [10.0, 10.0], [0.5, 3.0])
+    with pytest.raises(ValueError):
+        simulateChain(chain, [0.1, 0.0], 0.0)
+    assert simulateChain(chain, [0.1, 0.0], 0.0, "RK45").x.shape == (2, 1000)
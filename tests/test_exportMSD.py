@@ -0,0 +1,42 @@
+#Exported frames decode to exactly what the renderer drew
+import os
+import zlib
+import pytest
+from numpy import array, frombuffer, uint8
+from exportMSD import FrameRenderer, PALETTE, exportAnimation
+from playbackMSD import FrameTrack
+from solveMSD import SolverSettings, simulate
+
+@pytest.fixture(scope="module")
+def run():
+    result = simulate(1.25, 25, 0.1, 1.0, 0.0, SolverSettings(evalTime=1))
+    return result.t, result.x, result.v
+
+def test_png_frames(tmp_path, run):
+    t, x, v = run
+    frameCount = exportAnimation(t, x, str(tmp_path), v=v, fps=5, scale=0.25, workers=1)
+    positions = FrameTrack(t, x, v, fps=5).positions
+    renderer = FrameRenderer(0.25)
+    for index in range(frameCount):
+        with open(os.path.join(str(tmp_path), "frame_{:05d}.png".format(index)), "rb") as file:
+            data = file.read()
+        #A single IDAT chunk of unfiltered rows of palette indices
+        start = data.index(b"IDAT") + 4
+        length = int.from_bytes(data[start - 8:start - 4], "big")
+        rows = frombuffer(zlib.decompress(data[start:start + length]), dtype=uint8).reshape(renderer.size, -1)
+        assert (rows[:, 0] == 0).all()
+        assert (rows[:, 1:] == renderer.render(positions[index])).all()
+
+def test_gif_frames(tmp_path, run):
+    Image = pytest.importorskip("PIL.Image")
+    t, x, v = run
+    path = os.path.join(str(tmp_path), "run.gif")
+    frameCount = exportAnimation(t, x, path, v=v, fps=10, scale=0.25, workers=2)
+    positions = FrameTrack(t, x, v, fps=10).positions
+    renderer = FrameRenderer(0.25)
+    palette = array(PALETTE, dtype=uint8)
+    with Image.open(path) as image:
+        assert image.n_frames == frameCount
+        for index in range(frameCount):
+            image.seek(index)
+            assert (array(image.convert("RGB")) == palette[renderer.render(positions[index])]).all(), index
@@ -0,0 +1,34 @@
+#Nonlinear force laws: generated right hand sides and Jacobians, and exact Coulomb friction
+import math
+import pytest
+from numpy import array, abs as npabs
+from forceLawMSD import ForceLaw
+from solveMSD import SolverSettings, NUMBA_AVAILABLE, simulate
+
+m, k, b = 1.25, 25, 0.1
+LAWS = [ForceLaw("hardening", 2.0), ForceLaw("softening", 0.2), ForceLaw(damper="quadratic"),
+        ForceLaw(friction="smooth", frictionForce=1.0, smoothing=0.01)]
+
+@pytest.mark.parametrize("forceLaw", LAWS, ids=repr)
+def test_generated_functions_match_the_law(forceLaw):
+    derivatives = [forceLaw.derivative(m, k, b)]
+    if NUMBA_AVAILABLE:
+        derivatives.append(forceLaw.derivative(m, k, b, compiled=True))
+    for dSdx in derivatives:
+        assert dSdx(0.0, array([0.3, -0.7]))[1] == pytest.approx(float(forceLaw.acceleration(m, k, b, 0.3, -0.7)), rel=1e-12)
+    #Jacobian against central differences of the acceleration
+    x, v, h = 0.4, 0.3, 1e-6
+    dadx = (forceLaw.acceleration(m, k, b, x + h, v) - forceLaw.acceleration(m, k, b, x - h, v)) / (2 * h)
+    dadv = (forceLaw.acceleration(m, k, b, x, v + h) - forceLaw.acceleration(m, k, b, x, v - h)) / (2 * h)
+    (_, _), (dx, dv) = forceLaw.jacobian(m, k, b)(0.0, (x, v))
+    assert dx == pytest.approx(float(dadx), rel=1e-6)
+    assert dv == pytest.approx(float(dadv), rel=1e-6)
+
+def test_coulomb_friction_stops_the_mass():
+    #Every half period the amplitude drops by 2 Ff / k = 0.16: 1, 0.84, ..., 0.04 after six of them, where the
+    #spring force k |x| = 1 N can no longer overcome the 2 N of friction
+    result = simulate(1.25, 25, 0.0, 1.0, 0.0, SolverSettings("solve_ivp", method="DOP853", rtol=1e-10, atol=1e-12),
+                      forceLaw=ForceLaw(friction="stick-slip", frictionForce=2.0))
+    stopped = result.t > 6 * math.pi * math.sqrt(1.25 / 25) + 1e-6
+    assert npabs(result.x[stopped] - 0.04).max() < 1e-8
+    assert npabs(result.v[stopped]).max() == 0
@@ -0,0 +1,18 @@
+#Forced runs: every solver must give the same response to the same input
+import pytest
+from numpy import abs as npabs
+from forcingMSD import Forcing
+from solveMSD import SolverSettings, simulate
+
+m, k, b, x0, v0 = 1.25, 25, 0.5, 0.2, 0.0
+
+#The first order hold of the linear solvers is exact for steps and impulses, second order in dt otherwise
+@pytest.mark.parametrize("forcing, tolerance", [(Forcing("step", 2.0, start=1.0), 1e-8),
+                                                (Forcing("impulse", 0.5, start=2.5), 1e-8),
+                                                (Forcing("sinusoid", 3.0, frequency=2.0), 2e-4)])
+def test_solvers_agree_on_the_forced_response(forcing, tolerance):
+    expected = simulate(m, k, b, x0, v0, SolverSettings("odeint", rtol=1e-11, atol=1e-13), forcing=forcing)
+    for solver in ["analytic", "propagator", "solve_ivp"]:
+        result = simulate(m, k, b, x0, v0, SolverSettings(solver, rtol=1e-9, atol=1e-11), forcing=forcing)
+        assert npabs(result.x - expected.x).max() < tolerance, solver
+        assert result.events is None
@@ -0,0 +1,23 @@
+#The closed form frequency response against a scan of |H| and against a forced simulation
+import pytest
+from numpy import linspace, abs as npabs
+from forcingMSD import Forcing
+from frequencyMSD import resonance, transferFunction
+from solveMSD import SolverSettings, simulate
+
+m, k, b = 1.25, 25, 2.0
+
+def test_resonance_is_the_peak_of_the_magnitude():
+    frequencies = linspace(0.01, 3, 300001)
+    gain = npabs(transferFunction(m, k, b, frequencies))
+    resonanceFrequency, peakGain, _, _ = resonance(m, k, b)
+    assert resonanceFrequency == pytest.approx(frequencies[gain.argmax()], abs=1e-4)
+    assert peakGain == pytest.approx(gain.max(), rel=1e-8)
+
+def test_steady_state_amplitude_is_the_gain():
+    #After 30 s the transient, decaying at b / 2m = 0.8 1/s, is gone
+    frequency, force = 0.6, 3.0
+    result = simulate(m, k, b, 0.0, 0.0, SolverSettings("analytic", evalTime=40, numPoints=40001),
+                      forcing=Forcing("sinusoid", force, frequency=frequency))
+    steadyState = npabs(result.x[result.t > 30]).max()
+    assert steadyState == pytest.approx(force * npabs(transferFunction(m, k, b, [frequency])[0]), rel=1e-4)
@@ -0,0 +1,18 @@
+#The sweep tab reports unreadable inputs instead of raising out of the Run button's slot
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtWidgets import QApplication
+import heatmapMSD
+from heatmapMSD import SweepWidget
+
+app = QApplication.instance() or QApplication([])
+
+def test_unreadable_solver_settings_show_a_warning(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(heatmapMSD.QMessageBox, "warning", lambda parent, title, text: warnings.append(text))
+    def solverSettings():
+        return float("")
+    sweep = SweepWidget(lambda: {"m": 1.0, "k": 25.0, "b": 0.1, "x0": 1.0, "v0": 0.0}, solverSettings)
+    sweep.startSweep()
+    assert len(warnings) == 1 and "float" in warnings[0]
+    assert sweep.workers == [] and sweep.runButton.isEnabled()
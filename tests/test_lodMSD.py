@@ -0,0 +1,18 @@
+#Envelope pyramids serve about one min/max pair per pixel and keep every extreme of the trace
+from numpy import linspace, sin
+from lodMSD import EnvelopePyramid
+
+def test_view_is_bounded_by_the_width_and_keeps_the_extremes():
+    t = linspace(0, 100, 1000001)
+    y = sin(7 * t) * (1 + t / 100)
+    pyramid = EnvelopePyramid(t, y)
+    for tMin, tMax in [(0, 100), (40, 41), (99.5, 100)]:
+        x, shown = pyramid.view(tMin, tMax, 800)
+        assert x.shape[0] < 10 * 800
+        inside = (t >= tMin) & (t <= tMax)
+        assert shown.max() >= y[inside].max() and shown.min() <= y[inside].min()
+
+def test_short_traces_are_drawn_as_they_are():
+    t = linspace(0, 1, 500)
+    x, y = EnvelopePyramid(t, t**2).view(0, 1, 800)
+    assert (x == t).all() and (y == t**2).all()
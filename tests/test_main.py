@@ -0,0 +1,48 @@
+#Slots of the main window, driven offscreen
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+import pytest
+from PyQt5.QtTest import QTest
+from PyQt5.QtWidgets import QApplication, QPushButton
+import main
+
+app = QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def window(monkeypatch, tmp_path):
+    #Warnings are collected instead of opening a blocking dialog, and the result cache stays out of $HOME
+    monkeypatch.setattr(main, "RESULT_CACHE_PATH", str(tmp_path / "resultCache.pkl"))
+    window = main.MainWindow()
+    window.warnings = []
+    monkeypatch.setattr(main.QMessageBox, "warning", lambda parent, title, text: window.warnings.append(text))
+    yield window
+    window.liveTimer.stop()
+    window.close()
+
+def test_slider_changes_restart_the_live_timer(window):
+    window.liveCheckBox.setChecked(True)
+    QTest.qWait(main.LIVE_INTERVAL_MS * 4 // 5)
+    remaining = window.liveTimer.remainingTime()
+    window.massSlider.setValue(window.massSlider.value() + 1)
+    assert window.liveTimer.remainingTime() > remaining
+
+def runButton(window):
+    return next(button for button in window.systemAttributesGroupBox.findChildren(QPushButton) if button.text() == "Run")
+
+def test_sampled_forcing_without_samples_only_warns(window):
+    #Run must stop at the warning: no animation of a run that did not happen
+    window.forcingComboBox.setCurrentText("sampled")
+    runButton(window).click()
+    assert window.warnings == ["Load the forcing samples first"]
+    assert window.animation is None
+    window.forcingComboBox.setCurrentText("none")
+    runButton(window).click()
+    assert window.animation is not None and len(window.warnings) == 1
+
+def test_failed_integration_only_warns(window, monkeypatch):
+    def simulate(*args):
+        raise RuntimeError("Stick-slip run did not finish within 100000 phases")
+    monkeypatch.setattr(window.resultCache, "simulate", simulate)
+    runButton(window).click()
+    assert window.warnings == ["Stick-slip run did not finish within 100000 phases"]
+    assert window.animation is None
@@ -0,0 +1,28 @@
+#Precomputed animation frames and the playback clock they are shown by
+from numpy import abs as npabs
+from playbackMSD import FrameTrack, PlaybackClock
+from solveMSD import SolverSettings, simulate, analyticSolution
+
+def test_frames_follow_sparse_solver_output():
+    #solve_ivp's own steps are far apart; Hermite interpolation with the velocities still lands on the motion
+    m, k, b, x0, v0 = 1.25, 25, 0.5, 1.0, 0.0
+    result = simulate(m, k, b, x0, v0, SolverSettings("solve_ivp", method="DOP853", rtol=1e-9, atol=1e-11))
+    track = FrameTrack(result.t, result.x, result.v, fps=60)
+    assert len(track) == 601
+    exact, _, _ = analyticSolution(m, k, b, x0, v0, track.frameTimes)
+    assert npabs(track.displacements - exact).max() < 5e-4
+    assert track.frameIndex(2.5) == 150 and track.frameIndex(99) == 600
+
+def test_clock_follows_wall_time_through_speed_changes_and_seeks():
+    wall = [100.0]
+    clock = PlaybackClock(duration=10, now=lambda: wall[0])
+    clock.start()
+    wall[0] += 2
+    clock.setSpeed(0.5)
+    wall[0] += 2
+    assert clock.time() == 3.0
+    clock.seek(9)
+    wall[0] += 4
+    assert clock.time() == 10 and clock.isFinished()
+    clock.start()
+    assert clock.time() == 0.0
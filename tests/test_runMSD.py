@@ -0,0 +1,25 @@
+#Command line runs end to end: summaries and stores of linear and nonlinear sweeps
+import json
+import os
+from runMSD import main
+from storeMSD import ResultStore
+
+def runCLI(outputDir, *options):
+    main(["--m", "1,2", "--k", "25", "--b", "0.1", "--solver", "solve_ivp", "--method", "RK45", "--workers", "1",
+          "--output", str(outputDir)] + list(options))
+    with open(os.path.join(str(outputDir), "summary.json")) as file:
+        return json.load(file)
+
+def test_linear_sweep_reports_errors(tmp_path):
+    #The default (linear) force law must leave the sweep linear: errors against the closed form, no law stored
+    summaries = runCLI(tmp_path)
+    assert all(isinstance(summary["maxPositionError"], float) for summary in summaries)
+    assert all(summary["maxPositionError"] < 0.1 for summary in summaries)
+    store = ResultStore(os.path.join(str(tmp_path), "results_000"))
+    assert store.forceLaw() is None
+    assert store.result(0).events is not None
+
+def test_nonlinear_sweep_has_no_closed_form_errors(tmp_path):
+    summaries = runCLI(tmp_path, "--spring", "hardening", "--nonlinearity", "2")
+    assert all(summary["maxPositionError"] is None for summary in summaries)
+    assert ResultStore(os.path.join(str(tmp_path), "results_000")).forceLaw().spring == "hardening"
@@ -0,0 +1,94 @@
+#The single mass solvers of solveMSD against the closed form solution
+import math
+import warnings
+import pytest
+from numpy import array, abs as npabs, isnan
+from solveMSD import SolverSettings, NUMBA_AVAILABLE, simulate, systemAttributes, makeDerivative, analyticSolution
+
+#(m, k, b, x0, v0) in each damping regime
+REGIMES = {"underdamped": (1.25, 25, 0.1, 1.0, 0.0),
+           "critical": (1.0, 4.0, 4.0, 1.0, -5.0),
+           "overdamped": (1.0, 25, 30, -1.0, 40.0),
+           "undamped": (1.0, 25, 0.0, 0.0, 2.0)}
+
+@pytest.mark.parametrize("regime", list(REGIMES))
+def test_analytic_solver_matches_odeint(regime):
+    m, k, b, x0, v0 = REGIMES[regime]
+    exact = simulate(m, k, b, x0, v0, SolverSettings("analytic"))
+    integrated = simulate(m, k, b, x0, v0, SolverSettings("odeint", rtol=1e-11, atol=1e-13))
+    assert npabs(exact.x - integrated.x).max() < 1e-7
+    assert npabs(exact.v - integrated.v).max() < 1e-6
+    assert exact.analyticError() == (0, 0)
+
+def test_system_attributes_use_the_damping_coefficient():
+    #zeta = b / (2 sqrt(m k)): m = 1, k = 25 is critically damped at b = 10
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        naturalFrequency, dampedFrequency, settlingTime = systemAttributes(1.0, 25, 2.0)
+        assert naturalFrequency == pytest.approx(5 / (2 * math.pi))
+        assert dampedFrequency == pytest.approx(math.sqrt(25 - 1) / (2 * math.pi))
+        assert settlingTime == pytest.approx(4.0)
+        undamped = systemAttributes(1.0, 25, 0.0)
+        overdamped = systemAttributes(1.0, 25, 30.0)
+    assert undamped[1] == undamped[0] and isnan(undamped[2])
+    assert isnan(overdamped[1])
+    #The slower decay rate of the overdamped roots -15 +- sqrt(200)
+    assert overdamped[2] == pytest.approx(4 / (15 - math.sqrt(200)))
+
+@pytest.mark.parametrize("m, k, b, method", [(1.25, 25, 0.1, "DOP853"), (1.0, 1e6, 2e4, "Radau")])
+def test_auto_solver_picks_the_method_and_meets_its_accuracy(m, k, b, method):
+    result = simulate(m, k, b, 1.0, 0.0, SolverSettings("auto", accuracy=1e-6))
+    assert result.settings.method == method
+    assert result.analyticError()[0] < 1e-6
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_failed_solve_ivp_run_raises():
+    #Negative damping blows up faster than the steps can follow
+    with pytest.raises(RuntimeError, match="solve_ivp failed"):
+        simulate(1.0, 25, -1000, 1.0, 0.0, SolverSettings("solve_ivp"))
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason="numba is not installed")
+def test_compiled_right_hand_side_matches_python():
+    python, compiled = makeDerivative(1.25, 25, 0.1), makeDerivative(1.25, 25, 0.1, compiled=True)
+    for S in [(0.3, -0.7), (-1.2, 0.05)]:
+        assert list(compiled(0.0, array(S))) == pytest.approx(python(0.0, S), rel=1e-15)
+
+@pytest.mark.parametrize("method", ["Radau", "BDF"])
+def test_implicit_methods_use_the_exact_jacobian(method):
+    #The constant state matrix is handed over once, no finite difference Jacobians are evaluated
+    m, k, b, x0, v0 = REGIMES["overdamped"]
+    result = simulate(m, k, b, x0, v0, SolverSettings("solve_ivp", method=method, rtol=1e-8, atol=1e-10))
+    assert result.solverStats["njev"] == 0
+    assert result.analyticError()[0] < 1e-5
+
+@pytest.mark.parametrize("regime", list(REGIMES))
+def test_closed_form_events_match_located_events(regime):
+    #Closed form runs take their events from the closed form, solve_ivp runs locate them while integrating
+    m, k, b, x0, v0 = REGIMES[regime]
+    exact = simulate(m, k, b, x0, v0, SolverSettings("analytic")).events
+    located = simulate(m, k, b, x0, v0, SolverSettings("solve_ivp", method="DOP853", rtol=1e-11, atol=1e-13)).events
+    assert exact.kind == located.kind
+    assert npabs(exact.t - located.t).max(initial=0.0) < 1e-6
+    assert exact.peak == pytest.approx(located.peak, rel=1e-8)
+    if located.settlingTime is None:
+        assert exact.settlingTime is None
+    else:
+        assert exact.settlingTime == pytest.approx(located.settlingTime, rel=1e-6)
+
+@pytest.mark.parametrize("solver", ["analytic", "odeint", "solve_ivp", "propagator"])
+def test_adaptive_grid_meets_the_sampling_tolerance(solver):
+    m, k, b, x0, v0 = 1.25, 25, 2.0, 1.0, 0.0
+    result = simulate(m, k, b, x0, v0, SolverSettings(solver, evalTime=100, sampling="adaptive", samplingTolerance=1e-3))
+    #Sparse once the motion has died out: a fixed grid needs about 5000 points for the same error
+    assert len(result.t) < 1000
+    midpoints = (result.t[1:] + result.t[:-1]) / 2
+    exact, _, _ = analyticSolution(m, k, b, x0, v0, midpoints)
+    assert npabs((result.x[1:] + result.x[:-1]) / 2 - exact).max() < 1.5e-3
+
+@pytest.mark.parametrize("regime", list(REGIMES))
+def test_propagator_is_exact_on_fixed_and_adaptive_grids(regime):
+    #Adaptive grids are several uniform runs, each stepped with its own expm(A dt)
+    m, k, b, x0, v0 = REGIMES[regime]
+    for sampling in ["fixed", "adaptive"]:
+        result = simulate(m, k, b, x0, v0, SolverSettings("propagator", evalTime=20, sampling=sampling))
+        assert max(result.analyticError()) < 1e-10 * max(1, abs(v0)), sampling
@@ -0,0 +1,24 @@
+#Run stores give back the saved columns as memory maps
+import os
+from numpy import array_equal, memmap, abs as npabs
+from solveMSD import SolverSettings, simulate
+from storeMSD import RUN_COLUMNS, ResultStore, saveRun, saveStream
+
+def test_saved_run_reads_back(tmp_path):
+    result = simulate(1.25, 25, 0.1, 1.0, 0.0, SolverSettings("solve_ivp", method="Radau"))
+    path = os.path.join(str(tmp_path), "run")
+    saveRun(path, result)
+    store = ResultStore(path)
+    assert isinstance(store["x"], memmap)
+    assert store.parameters() == {"m": 1.25, "k": 25, "b": 0.1, "x0": 1.0, "v0": 0.0}
+    assert store.settings().asDict() == result.settings.asDict()
+    loaded = store.result()
+    for name in RUN_COLUMNS:
+        assert array_equal(getattr(loaded, name), getattr(result, name)), name
+
+def test_streamed_store_is_the_whole_run(tmp_path):
+    path = os.path.join(str(tmp_path), "stream")
+    settings = SolverSettings("analytic", evalTime=20, numPoints=20001)
+    saveStream(path, 1.25, 25, 0.1, 1.0, 0.0, settings, windowSize=3000)
+    whole = simulate(1.25, 25, 0.1, 1.0, 0.0, settings)
+    assert npabs(ResultStore(path)["x"] - whole.x).max() < 1e-12
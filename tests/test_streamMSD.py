@@ -0,0 +1,26 @@
+#Streamed windows join up into the full run, and the summary only calls a run settled when it is
+import pytest
+from numpy import concatenate, abs as npabs
+from solveMSD import SolverSettings, simulate
+from streamMSD import StreamSummary, streamSimulation
+
+def summarize(m, k, b, solver="analytic"):
+    summary = StreamSummary()
+    chunks = [summary.update(chunk) for chunk in streamSimulation(m, k, b, 1.0, 0.0, SolverSettings(solver), windowSize=300)]
+    return summary, chunks
+
+def test_windows_join_into_the_whole_run():
+    _, chunks = summarize(1.25, 25, 0.5, "odeint")
+    whole = simulate(1.25, 25, 0.5, 1.0, 0.0, SolverSettings("analytic"))
+    assert npabs(concatenate([chunk.x for chunk in chunks]) - whole.x).max() < 1e-6
+
+def test_zero_crossing_at_the_end_is_not_settled():
+    #Still swinging at about 0.37 after 10 s, with the last sample next to a zero crossing
+    summary, chunks = summarize(0.5, 25, 0.1)
+    assert abs(chunks[-1].x[-1]) < 0.02 * summary.peakPosition
+    assert summary.settlingTime() is None
+
+def test_settling_time_of_a_settled_run():
+    summary, _ = summarize(1.25, 25, 2.0)
+    events = simulate(1.25, 25, 2.0, 1.0, 0.0, SolverSettings("analytic")).events
+    assert summary.settlingTime() == pytest.approx(events.settlingTime, abs=0.01)
@@ -0,0 +1,17 @@
+#Process pool sweeps write every chunk of every settings block into the shared result
+from numpy import array_equal
+from batchMSD import batchSolve, parameterGrid
+from solveMSD import SolverSettings
+from sweepMSD import runSweep
+
+def test_pool_sweep_matches_one_batch():
+    grid = parameterGrid([0.5, 1.0, 2.0], [10.0, 25.0], [0.1, 1.0], 1.0, 0.0)
+    settingsList = [SolverSettings("analytic", numPoints=200), SolverSettings("propagator", numPoints=200)]
+    progress = []
+    with runSweep(*grid, settingsList=settingsList, workers=2, chunkSize=5,
+                  progress=lambda done, total: progress.append((done, total))) as result:
+        assert result.completed.all() and not result.cancelled
+        assert progress[-1] == (6, 6)
+        for index, settings in enumerate(settingsList):
+            batch = batchSolve(*grid, t=result.t, method=settings.solver)
+            assert array_equal(result.x[index], batch.x)
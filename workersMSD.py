@@ -0,0 +1,39 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+class WorkerSignals(QObject):
+    #QRunnable is not a QObject, so its signals live here. They are emitted from the pool thread and
+    #delivered to slots on the GUI thread through queued connections.
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+
+class Worker(QRunnable):
+    #Runs function(*args, **kwargs) on a QThreadPool thread and emits its return value.
+    #A cancelled worker that has not started yet returns immediately, one that is already running
+    #finishes but does not emit its result.
+    def __init__(self, function, *args, **kwargs):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        if self.cancelled:
+            self.signals.finished.emit()
+            return
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as error:
+            if not self.cancelled:
+                self.signals.error.emit("{}: {}".format(type(error).__name__, error))
+        else:
+            if not self.cancelled:
+                self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()